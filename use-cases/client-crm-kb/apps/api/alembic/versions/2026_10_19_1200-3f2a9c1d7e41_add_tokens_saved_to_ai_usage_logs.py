@@ -0,0 +1,33 @@
+"""Add tokens_saved to ai_usage_logs
+
+Revision ID: 3f2a9c1d7e41
+Revises:
+Create Date: 2026-10-19 12:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "3f2a9c1d7e41"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "ai_usage_logs",
+        sa.Column(
+            "tokens_saved",
+            sa.Integer(),
+            nullable=False,
+            server_default="0",
+            comment="Estimated tokens avoided by response caching or result compaction",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("ai_usage_logs", "tokens_saved")
@@ -0,0 +1,86 @@
+"""Add full-text and trigram search indexes for the KB
+
+Revision ID: 8b4e6d2a9f15
+Revises: 3f2a9c1d7e41
+Create Date: 2026-10-19 13:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "8b4e6d2a9f15"
+down_revision = "3f2a9c1d7e41"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Generated tsvector columns (kept in sync by Postgres on every write)
+    op.execute(
+        """
+        ALTER TABLE client_rules
+        ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', coalesce(description, ''))) STORED
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE patterns
+        ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+        ) STORED
+        """
+    )
+
+    op.create_index(
+        "idx_rules_search_vector",
+        "client_rules",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "idx_patterns_search_vector",
+        "patterns",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+    # Trigram indexes back ILIKE '%q%' for substrings and CJK text, which
+    # the english text-search parser does not split into words
+    op.create_index(
+        "idx_rules_description_trgm",
+        "client_rules",
+        ["description"],
+        postgresql_using="gin",
+        postgresql_ops={"description": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "idx_patterns_name_trgm",
+        "patterns",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "idx_patterns_description_trgm",
+        "patterns",
+        ["description"],
+        postgresql_using="gin",
+        postgresql_ops={"description": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_patterns_description_trgm", table_name="patterns")
+    op.drop_index("idx_patterns_name_trgm", table_name="patterns")
+    op.drop_index("idx_rules_description_trgm", table_name="client_rules")
+    op.drop_index("idx_patterns_search_vector", table_name="patterns")
+    op.drop_index("idx_rules_search_vector", table_name="client_rules")
+    op.drop_column("patterns", "search_vector")
+    op.drop_column("client_rules", "search_vector")
+    # pg_trgm is left installed; other objects may depend on it
@@ -0,0 +1,75 @@
+"""Add kb_embeddings for hybrid KB retrieval
+
+Revision ID: c71d3e5b8a20
+Revises: 8b4e6d2a9f15
+Create Date: 2026-10-19 14:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "c71d3e5b8a20"
+down_revision = "8b4e6d2a9f15"
+branch_labels = None
+depends_on = None
+
+# Must match app.kb.embedder.EMBEDDING_DIM
+EMBEDDING_DIM = 256
+
+
+def _pgvector_available() -> bool:
+    return (
+        op.get_bind()
+        .execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'vector'"))
+        .scalar()
+        is not None
+    )
+
+
+def upgrade() -> None:
+    # pgvector is optional: stock Postgres images do not ship it.  Without
+    # it embeddings are stored as REAL[] and searched in process (see
+    # app.kb.embeddings).
+    pgvector = _pgvector_available()
+    if pgvector:
+        op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    op.create_table(
+        "kb_embeddings",
+        sa.Column("entity_type", sa.String(20), nullable=False),
+        sa.Column("entity_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("client_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column(
+            "content_hash",
+            sa.String(32),
+            nullable=False,
+            comment="md5 of the embedded text; a mismatch marks the row for re-embedding",
+        ),
+        sa.Column("embedded_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("entity_type", "entity_id"),
+    )
+    op.create_index("ix_kb_embeddings_client_id", "kb_embeddings", ["client_id"])
+    if not pgvector:
+        op.add_column(
+            "kb_embeddings",
+            sa.Column("embedding", postgresql.ARRAY(sa.REAL()), nullable=False),
+        )
+        return
+
+    op.execute(
+        f"ALTER TABLE kb_embeddings ADD COLUMN embedding vector({EMBEDDING_DIM}) NOT NULL"
+    )
+    op.create_index(
+        "idx_kb_embeddings_hnsw",
+        "kb_embeddings",
+        ["embedding"],
+        postgresql_using="hnsw",
+        postgresql_ops={"embedding": "vector_cosine_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("kb_embeddings")
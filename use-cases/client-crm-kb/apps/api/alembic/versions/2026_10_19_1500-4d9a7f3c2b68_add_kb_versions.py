@@ -0,0 +1,92 @@
+"""Add kb_versions with triggers on brand profiles, rules and patterns
+
+Revision ID: 4d9a7f3c2b68
+Revises: c71d3e5b8a20
+Create Date: 2026-10-19 15:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "4d9a7f3c2b68"
+down_revision = "c71d3e5b8a20"
+branch_labels = None
+depends_on = None
+
+_TABLES = ("brand_profiles", "client_rules", "patterns")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "kb_versions",
+        sa.Column(
+            "key",
+            sa.String(64),
+            primary_key=True,
+            comment="Client id, or 'shared' for global and segment patterns",
+        ),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+    # Bumps the version of every KB a changed row belongs to.  Global and
+    # segment patterns (or any row without a client) belong to 'shared'.
+    # Updates that change nothing but updated_at are ignored.
+    op.execute(
+        """
+        CREATE FUNCTION kb_version_key(tbl text, r jsonb) RETURNS text AS $$
+            SELECT CASE
+                WHEN tbl = 'patterns'
+                     AND (r->>'scope' IN ('global', 'segment') OR r->>'client_id' IS NULL)
+                    THEN 'shared'
+                ELSE r->>'client_id'
+            END
+        $$ LANGUAGE sql IMMUTABLE
+        """
+    )
+    op.execute(
+        """
+        CREATE FUNCTION bump_kb_version() RETURNS trigger AS $$
+        DECLARE
+            old_key text;
+            new_key text;
+        BEGIN
+            IF TG_OP = 'UPDATE'
+               AND to_jsonb(NEW) - 'updated_at' = to_jsonb(OLD) - 'updated_at' THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                old_key := kb_version_key(TG_TABLE_NAME, to_jsonb(OLD));
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                new_key := kb_version_key(TG_TABLE_NAME, to_jsonb(NEW));
+            END IF;
+
+            INSERT INTO kb_versions (key, version)
+            SELECT DISTINCT k, 1 FROM unnest(ARRAY[old_key, new_key]) AS k
+            WHERE k IS NOT NULL
+            ON CONFLICT (key) DO UPDATE
+                SET version = kb_versions.version + 1, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in _TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table}_kb_version
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION bump_kb_version()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in _TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_kb_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_kb_version()")
+    op.execute("DROP FUNCTION IF EXISTS kb_version_key(text, jsonb)")
+    op.drop_table("kb_versions")
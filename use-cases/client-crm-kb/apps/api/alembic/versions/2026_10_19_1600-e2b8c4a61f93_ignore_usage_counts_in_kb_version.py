@@ -0,0 +1,54 @@
+"""Ignore usage counter updates in the kb_versions trigger
+
+Revision ID: e2b8c4a61f93
+Revises: 4d9a7f3c2b68
+Create Date: 2026-10-19 16:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "e2b8c4a61f93"
+down_revision = "4d9a7f3c2b68"
+branch_labels = None
+depends_on = None
+
+_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_kb_version() RETURNS trigger AS $$
+DECLARE
+    old_key text;
+    new_key text;
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND to_jsonb(NEW) - {ignored} = to_jsonb(OLD) - {ignored} THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        old_key := kb_version_key(TG_TABLE_NAME, to_jsonb(OLD));
+    END IF;
+    IF TG_OP <> 'DELETE' THEN
+        new_key := kb_version_key(TG_TABLE_NAME, to_jsonb(NEW));
+    END IF;
+
+    INSERT INTO kb_versions (key, version)
+    SELECT DISTINCT k, 1 FROM unnest(ARRAY[old_key, new_key]) AS k
+    WHERE k IS NOT NULL
+    ON CONFLICT (key) DO UPDATE
+        SET version = kb_versions.version + 1, updated_at = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def upgrade() -> None:
+    # Usage counters are flushed in batches every few seconds; bumping the
+    # KB version on each flush would keep the KB context cache cold
+    op.execute(
+        _FUNCTION.format(ignored="ARRAY['updated_at', 'usage_count', 'last_used_at']")
+    )
+
+
+def downgrade() -> None:
+    op.execute(_FUNCTION.format(ignored="'updated_at'"))
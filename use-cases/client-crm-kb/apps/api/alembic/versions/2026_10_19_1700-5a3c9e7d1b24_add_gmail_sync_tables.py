@@ -0,0 +1,71 @@
+"""Add gmail_sync_state and gmail_processed_messages
+
+Revision ID: 5a3c9e7d1b24
+Revises: e2b8c4a61f93
+Create Date: 2026-10-19 17:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "5a3c9e7d1b24"
+down_revision = "e2b8c4a61f93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "gmail_sync_state",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=True),
+        sa.Column(
+            "history_id",
+            sa.BigInteger(),
+            nullable=True,
+            comment="Gmail historyId the next incremental sync starts from",
+        ),
+        sa.Column("last_sync_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("total_synced", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+    op.create_table(
+        "gmail_processed_messages",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("gmail_message_id", sa.String(64), nullable=False),
+        sa.Column("thread_id", sa.String(64), nullable=True),
+        sa.Column("subject", sa.Text(), nullable=True),
+        sa.Column("from_email", sa.String(255), nullable=True),
+        sa.Column("email_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "client_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("clients.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column(
+            "feedback_event_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("feedback_events.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("sentiment", sa.String(10), nullable=True),
+        sa.Column("topics", postgresql.ARRAY(sa.Text()), nullable=True),
+        sa.Column("processed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("gmail_message_id", name="gmail_processed_messages_gmail_message_id_key"),
+    )
+    op.create_index(
+        "ix_gmail_processed_messages_client_id", "gmail_processed_messages", ["client_id"]
+    )
+    op.create_index(
+        "ix_gmail_processed_messages_processed_at", "gmail_processed_messages", ["processed_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("gmail_processed_messages")
+    op.drop_table("gmail_sync_state")
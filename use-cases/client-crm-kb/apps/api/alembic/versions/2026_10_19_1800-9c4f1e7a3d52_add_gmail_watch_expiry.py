@@ -0,0 +1,27 @@
+"""Add watch_expires_at to gmail_sync_state
+
+Revision ID: 9c4f1e7a3d52
+Revises: 5a3c9e7d1b24
+Create Date: 2026-10-19 18:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "9c4f1e7a3d52"
+down_revision = "5a3c9e7d1b24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "gmail_sync_state",
+        sa.Column("watch_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("gmail_sync_state", "watch_expires_at")
@@ -0,0 +1,53 @@
+"""Bump a contact_index version on contact, client and project writes
+
+Revision ID: 7e1b5d9c3a86
+Revises: 9c4f1e7a3d52
+Create Date: 2026-10-19 19:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "7e1b5d9c3a86"
+down_revision = "9c4f1e7a3d52"
+branch_labels = None
+depends_on = None
+
+# Columns the Gmail contact index is built from, per table
+_TRIGGERS = {
+    "contacts": "email, client_id, deleted_at",
+    "clients": "name, website_url, deleted_at",
+    "projects": "client_id, name, status",
+}
+
+
+def upgrade() -> None:
+    # Statement-level: a bulk write bumps the version once
+    op.execute(
+        """
+        CREATE FUNCTION bump_contact_index_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO kb_versions (key, version) VALUES ('contact_index', 1)
+            ON CONFLICT (key) DO UPDATE
+                SET version = kb_versions.version + 1, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table, columns in _TRIGGERS.items():
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table}_contact_index
+            AFTER INSERT OR DELETE OR UPDATE OF {columns} ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_contact_index_version()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_contact_index ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_contact_index_version()")
+    op.execute("DELETE FROM kb_versions WHERE key = 'contact_index'")
@@ -0,0 +1,32 @@
+"""Add analysis_source to feedback_events
+
+Revision ID: b3d8f2a6c914
+Revises: 7e1b5d9c3a86
+Create Date: 2026-10-19 20:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "b3d8f2a6c914"
+down_revision = "7e1b5d9c3a86"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "feedback_events",
+        sa.Column(
+            "analysis_source",
+            sa.String(10),
+            nullable=True,
+            comment="'local' (pre-classifier) or 'claude'; NULL for older rows",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("feedback_events", "analysis_source")
@@ -0,0 +1,33 @@
+"""Add suggested_rules to feedback_events
+
+Revision ID: d6a2c8e4f157
+Revises: b3d8f2a6c914
+Create Date: 2026-10-19 21:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "d6a2c8e4f157"
+down_revision = "b3d8f2a6c914"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "feedback_events",
+        sa.Column(
+            "suggested_rules",
+            postgresql.JSONB(),
+            nullable=True,
+            comment="Cached rule suggestions; NULL until generated",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("feedback_events", "suggested_rules")
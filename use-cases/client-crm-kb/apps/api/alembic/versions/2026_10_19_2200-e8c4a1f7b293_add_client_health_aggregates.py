@@ -0,0 +1,50 @@
+"""Add client_health_aggregates
+
+Revision ID: e8c4a1f7b293
+Revises: d6a2c8e4f157
+Create Date: 2026-10-19 22:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "e8c4a1f7b293"
+down_revision = "d6a2c8e4f157"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows are created on first use and rebuilt by the daily sweep, so the
+    # table starts empty.
+    op.create_table(
+        "client_health_aggregates",
+        sa.Column(
+            "client_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("clients.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "window_start",
+            sa.Date(),
+            nullable=False,
+            comment="Sentiment counts cover feedback dated on or after this day",
+        ),
+        sa.Column("positive", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("negative", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("neutral", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("critical", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("major", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("delayed_milestones", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("latest_feedback", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("latest_project", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("client_health_aggregates")
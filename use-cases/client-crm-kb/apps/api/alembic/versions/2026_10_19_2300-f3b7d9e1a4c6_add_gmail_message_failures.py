@@ -0,0 +1,38 @@
+"""Record failed Gmail messages
+
+Revision ID: f3b7d9e1a4c6
+Revises: e8c4a1f7b293
+Create Date: 2026-10-19 23:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "f3b7d9e1a4c6"
+down_revision = "e8c4a1f7b293"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Failed messages get a row too, so they no longer hold the history
+    # cursor back; syncs retry them until GMAIL_SYNC_MAX_ATTEMPTS.
+    op.add_column(
+        "gmail_processed_messages",
+        sa.Column("error", sa.Text(), nullable=True),
+    )
+    op.add_column(
+        "gmail_processed_messages",
+        sa.Column(
+            "failed_attempts", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+
+
+def downgrade() -> None:
+    # Failed rows would read as ingested without the error column
+    op.execute("DELETE FROM gmail_processed_messages WHERE error IS NOT NULL")
+    op.drop_column("gmail_processed_messages", "failed_attempts")
+    op.drop_column("gmail_processed_messages", "error")
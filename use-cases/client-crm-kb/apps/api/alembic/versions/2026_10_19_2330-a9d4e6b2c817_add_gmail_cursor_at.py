@@ -0,0 +1,29 @@
+"""Add gmail_sync_state.cursor_at
+
+Revision ID: a9d4e6b2c817
+Revises: f3b7d9e1a4c6
+Create Date: 2026-10-19 23:30:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "a9d4e6b2c817"
+down_revision = "f3b7d9e1a4c6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "gmail_sync_state",
+        sa.Column("cursor_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    # Until the next complete sync, the last sync time is the best bound
+    op.execute("UPDATE gmail_sync_state SET cursor_at = last_sync_at")
+
+
+def downgrade() -> None:
+    op.drop_column("gmail_sync_state", "cursor_at")
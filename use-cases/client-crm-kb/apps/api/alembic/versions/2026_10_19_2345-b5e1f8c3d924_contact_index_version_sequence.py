@@ -0,0 +1,120 @@
+"""Stamp the contact index with a sequence instead of a kb_versions row
+
+Revision ID: b5e1f8c3d924
+Revises: a9d4e6b2c817
+Create Date: 2026-10-19 23:45:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "b5e1f8c3d924"
+down_revision = "a9d4e6b2c817"
+branch_labels = None
+depends_on = None
+
+_ACTIVE = "('planning', 'in_progress')"
+
+# table -> event -> WHEN condition: only changes the Gmail contact index
+# reads (see app.gmail.contacts) advance its version
+_TRIGGERS = {
+    "contacts": {
+        "INSERT": "NEW.email IS NOT NULL AND NEW.deleted_at IS NULL",
+        "UPDATE OF email, client_id, deleted_at": (
+            "OLD.email IS DISTINCT FROM NEW.email"
+            " OR OLD.client_id IS DISTINCT FROM NEW.client_id"
+            " OR OLD.deleted_at IS DISTINCT FROM NEW.deleted_at"
+        ),
+        "DELETE": "OLD.email IS NOT NULL AND OLD.deleted_at IS NULL",
+    },
+    "clients": {
+        "INSERT": "NEW.deleted_at IS NULL",
+        "UPDATE OF name, website_url, deleted_at": (
+            "OLD.name IS DISTINCT FROM NEW.name"
+            " OR OLD.website_url IS DISTINCT FROM NEW.website_url"
+            " OR OLD.deleted_at IS DISTINCT FROM NEW.deleted_at"
+        ),
+        "DELETE": "OLD.deleted_at IS NULL",
+    },
+    "projects": {
+        "INSERT": f"NEW.status IN {_ACTIVE}",
+        "UPDATE OF client_id, name, status": (
+            f"(OLD.status IN {_ACTIVE} OR NEW.status IN {_ACTIVE})"
+            " AND (OLD.client_id IS DISTINCT FROM NEW.client_id"
+            " OR OLD.name IS DISTINCT FROM NEW.name"
+            " OR OLD.status IS DISTINCT FROM NEW.status)"
+        ),
+        "DELETE": f"OLD.status IN {_ACTIVE}",
+    },
+}
+
+_OLD_COLUMNS = {
+    "contacts": "email, client_id, deleted_at",
+    "clients": "name, website_url, deleted_at",
+    "projects": "client_id, name, status",
+}
+
+
+def _trigger_name(table: str, event: str) -> str:
+    return f"trg_{table}_contact_index_{event.split()[0].lower()}"
+
+
+def upgrade() -> None:
+    # The kb_versions row was updated by every write transaction on these
+    # tables and held its row lock until commit, serialising unrelated
+    # writers.  nextval() takes no lock that outlives the call.
+    for table in _TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_contact_index ON {table}")
+    op.execute("DELETE FROM kb_versions WHERE key = 'contact_index'")
+    op.execute("CREATE SEQUENCE contact_index_version")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_contact_index_version() RETURNS trigger AS $$
+        BEGIN
+            PERFORM nextval('contact_index_version');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    # Deferred to commit, so a rebuild started while the writing transaction
+    # is open is not stamped with its version
+    for table, events in _TRIGGERS.items():
+        for event, condition in events.items():
+            op.execute(
+                f"""
+                CREATE CONSTRAINT TRIGGER {_trigger_name(table, event)}
+                AFTER {event} ON {table}
+                DEFERRABLE INITIALLY DEFERRED
+                FOR EACH ROW WHEN ({condition})
+                EXECUTE FUNCTION bump_contact_index_version()
+                """
+            )
+
+
+def downgrade() -> None:
+    for table, events in _TRIGGERS.items():
+        for event in events:
+            op.execute(f"DROP TRIGGER IF EXISTS {_trigger_name(table, event)} ON {table}")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_contact_index_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO kb_versions (key, version) VALUES ('contact_index', 1)
+            ON CONFLICT (key) DO UPDATE
+                SET version = kb_versions.version + 1, updated_at = now();
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute("DROP SEQUENCE IF EXISTS contact_index_version")
+    for table, columns in _OLD_COLUMNS.items():
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_{table}_contact_index
+            AFTER INSERT OR DELETE OR UPDATE OF {columns} ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_contact_index_version()
+            """
+        )
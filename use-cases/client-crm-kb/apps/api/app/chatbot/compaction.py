@@ -0,0 +1,301 @@
+"""
+Token-budget-aware compaction of chatbot tool results.
+
+Tool results are appended to ``messages`` and re-sent on every later
+round, so their size is paid for again and again.  :class:`ToolResultCompactor`
+keeps that cost down in three ways:
+
+1. **Projection** -- each result is reduced to the fields Claude needs
+   (ids nobody can use, timestamps and empty values are dropped).
+2. **Per-result cap** -- a result larger than ``CHAT_TOOL_RESULT_TOKEN_CAP``
+   has its lists cut to fit, with a ``_more`` cursor Claude can pass to
+   the ``get_more_results`` tool to page through the rest (this turn only).
+3. **Summarising consumed results** -- before each Claude call, results
+   from earlier rounds (already seen and acted on) are replaced by a short
+   summary that keeps ids, names and counts.
+
+The estimated input tokens this avoids are added to the request's usage
+scope (``tokens_saved``) and end up in the orchestration usage log.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Optional
+
+from app.config import settings
+from app.orchestration.usage import current_scope
+
+MORE_RESULTS_TOOL = "get_more_results"
+
+MORE_RESULTS_TOOL_DEFINITION = {
+    "name": MORE_RESULTS_TOOL,
+    "description": (
+        "Fetch the next page of a tool result that was cut short. Pass the "
+        "cursor from the result's _more field. Cursors are only valid within "
+        "the current reply."
+    ),
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "cursor": {"type": "string", "description": "The _more.cursor value"},
+        },
+        "required": ["cursor"],
+    },
+}
+
+# Rough chars-per-token ratio used for budget estimates
+_CHARS_PER_TOKEN = 4
+
+_SUMMARY_PREFIX = "[Summary of an earlier result"
+_SUMMARY_ITEM_KEYS = ("id", "name", "status")
+_SUMMARY_MAX_ITEMS = 10
+_SUMMARY_MAX_VALUE_CHARS = 80
+
+
+def _estimate(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN
+
+
+def _dumps(data: Any) -> str:
+    return json.dumps(data, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+# ---------------------------------------------------------------------------
+# Projection
+# ---------------------------------------------------------------------------
+
+
+def _drop_empty(data: Any) -> Any:
+    """Recursively drop None, empty strings and empty collections."""
+    if isinstance(data, dict):
+        return {
+            k: _drop_empty(v) for k, v in data.items() if v not in (None, "", [], {})
+        }
+    if isinstance(data, list):
+        return [_drop_empty(v) for v in data]
+    return data
+
+
+def _without(*keys: str) -> Callable[[dict], dict]:
+    def project(item: dict) -> dict:
+        return {k: v for k, v in item.items() if k not in keys}
+    return project
+
+
+def _date_only(key: str) -> Callable[[dict], dict]:
+    def project(item: dict) -> dict:
+        if isinstance(item.get(key), str):
+            item = {**item, key: item[key][:10]}
+        return item
+    return project
+
+
+def _each(*steps: Callable[[dict], dict]) -> Callable[[Any], Any]:
+    """Apply ``steps`` to every dict in a list result."""
+    def project(data: Any) -> Any:
+        if not isinstance(data, list):
+            return data
+        out = []
+        for item in data:
+            if isinstance(item, dict):
+                for step in steps:
+                    item = step(item)
+            out.append(item)
+        return out
+    return project
+
+
+def _project_client_details(data: Any) -> Any:
+    if not isinstance(data, dict):
+        return data
+    return {
+        **data,
+        "contacts": [_without("id")(c) for c in data.get("contacts") or []],
+    }
+
+
+# Per-tool projections.  Ids are kept wherever another tool takes them as
+# input (clients, and projects for create_feedback); feedback, contact and
+# rule ids are not.
+_PROJECTIONS: dict[str, Callable[[Any], Any]] = {
+    "get_client_details": _project_client_details,
+    "get_feedback": _each(_without("id"), _date_only("created_at")),
+    "list_projects": _each(_date_only("created_at")),
+    "get_rules": _each(_without("id")),
+}
+
+
+def project(tool_name: str, data: Any) -> Any:
+    """Reduce a tool result to the fields Claude needs."""
+    projection = _PROJECTIONS.get(tool_name)
+    if projection is not None:
+        data = projection(data)
+    return _drop_empty(data)
+
+
+# ---------------------------------------------------------------------------
+# Summaries
+# ---------------------------------------------------------------------------
+
+
+def _summarise_value(value: Any) -> Any:
+    if isinstance(value, list):
+        items = [
+            {k: v[k] for k in _SUMMARY_ITEM_KEYS if k in v}
+            if isinstance(v, dict) else v
+            for v in value[:_SUMMARY_MAX_ITEMS]
+        ]
+        items = [i for i in items if i not in ({}, None)]
+        summary: dict[str, Any] = {"count": len(value)}
+        if items:
+            summary["items"] = items
+        return summary
+    if isinstance(value, dict):
+        # Paging cursors are dropped -- they expire with the turn
+        return {k: _summarise_value(v) for k, v in value.items() if k != "_more"}
+    if isinstance(value, str) and len(value) > _SUMMARY_MAX_VALUE_CHARS:
+        return value[:_SUMMARY_MAX_VALUE_CHARS] + "..."
+    return value
+
+
+def summarise(tool_name: str, content: str) -> str:
+    """Compact summary of an already-consumed tool result."""
+    try:
+        data = json.loads(content)
+    except ValueError:
+        data = content
+    return (
+        f"{_SUMMARY_PREFIX} from {tool_name}; call it again for full details] "
+        + _dumps(_summarise_value(data))
+    )
+
+
+# ---------------------------------------------------------------------------
+# Compactor
+# ---------------------------------------------------------------------------
+
+
+class ToolResultCompactor:
+    """Compacts one chat turn's tool results and tracks the tokens saved."""
+
+    __slots__ = ("_cap", "_tools", "_raw_tokens", "_pages", "_accounted")
+
+    def __init__(self, token_cap: Optional[int] = None) -> None:
+        self._cap = token_cap or settings.CHAT_TOOL_RESULT_TOKEN_CAP
+        self._tools: dict[str, str] = {}          # tool_use_id -> tool name
+        self._raw_tokens: dict[str, int] = {}     # tool_use_id -> raw size
+        self._pages: dict[str, list[Any]] = {}    # cursor -> remaining items
+        self._accounted = 0
+
+    # -- Results ------------------------------------------------------------
+
+    def compact(self, tool_use_id: str, tool_name: str, raw_result: str) -> str:
+        """Project and cap a raw tool result for sending to Claude."""
+        self._tools[tool_use_id] = tool_name
+        self._raw_tokens[tool_use_id] = _estimate(raw_result)
+        try:
+            data = json.loads(raw_result)
+        except ValueError:
+            return raw_result
+        return _dumps(self._fit(tool_use_id, project(tool_name, data)))
+
+    def next_page(self, cursor: str) -> str:
+        """Result of the ``get_more_results`` tool."""
+        remaining = self._pages.pop(cursor, None)
+        if remaining is None:
+            return _dumps({
+                "error": "Unknown or expired cursor; call the original tool again.",
+            })
+        return _dumps(self._fit(cursor, remaining))
+
+    def _fit(self, key: str, data: Any) -> Any:
+        """Cut the lists in ``data`` until it fits the token cap."""
+        if _estimate(_dumps(data)) <= self._cap:
+            return data
+        if isinstance(data, list):
+            return self._page(key, "", data, self._cap)
+        if isinstance(data, dict):
+            fitted = dict(data)
+            # Shrink the largest lists first
+            lists = sorted(
+                (k for k, v in data.items() if isinstance(v, list)),
+                key=lambda k: len(_dumps(data[k])),
+                reverse=True,
+            )
+            for field in lists:
+                others = _estimate(_dumps({k: v for k, v in fitted.items() if k != field}))
+                fitted[field] = self._page(key, field, data[field], max(self._cap - others, 0))
+                if _estimate(_dumps(fitted)) <= self._cap:
+                    break
+            return fitted
+        if isinstance(data, str):
+            return data[: self._cap * _CHARS_PER_TOKEN] + "..."
+        return data
+
+    def _page(self, key: str, field: str, items: list[Any], budget: int) -> Any:
+        """Return as many leading items as fit ``budget`` plus a cursor."""
+        kept: list[Any] = []
+        used = 0
+        for item in items:
+            size = _estimate(_dumps(item)) + 1
+            if kept and used + size > budget:
+                break
+            kept.append(item)
+            used += size
+        if len(kept) == len(items):
+            return items
+        cursor = f"{key}:{field}:{len(kept)}"
+        self._pages[cursor] = items[len(kept):]
+        return {
+            "items": kept,
+            "_more": {"remaining": len(items) - len(kept), "cursor": cursor},
+        }
+
+    # -- Message history ----------------------------------------------------
+
+    def prepare(self, messages: list[dict[str, Any]]) -> None:
+        """Summarise consumed results and account the tokens saved.
+
+        Call before each Claude request.
+        """
+        self.summarise_consumed(messages)
+        self._account(messages)
+
+    def summarise_consumed(self, messages: list[dict[str, Any]]) -> None:
+        """Replace consumed tool results with their summaries.
+
+        Every tool_result except those in the final message (the results
+        Claude has not seen yet) has been consumed.
+        """
+        for message in messages[:-1]:
+            if message["role"] != "user" or isinstance(message["content"], str):
+                continue
+            for block in message["content"]:
+                if block.get("type") != "tool_result":
+                    continue
+                content = block.get("content")
+                if isinstance(content, str) and not content.startswith(_SUMMARY_PREFIX):
+                    tool_name = self._tools.get(block["tool_use_id"], "the tool")
+                    block["content"] = summarise(tool_name, content)
+
+    def _account(self, messages: list[dict[str, Any]]) -> None:
+        """Add the tokens the compacted results save on this request."""
+        saved = 0
+        for message in messages:
+            if message["role"] != "user" or isinstance(message["content"], str):
+                continue
+            for block in message["content"]:
+                raw = self._raw_tokens.get(block.get("tool_use_id", ""))
+                if raw is not None and isinstance(block.get("content"), str):
+                    saved += max(raw - _estimate(block["content"]), 0)
+
+        scope = current_scope()
+        if scope is not None:
+            scope.tokens_saved += saved
+        self._accounted += saved
+
+    @property
+    def tokens_saved(self) -> int:
+        """Estimated input tokens saved so far this turn."""
+        return self._accounted
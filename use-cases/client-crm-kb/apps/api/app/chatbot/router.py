@@ -3,23 +3,44 @@ Chatbot API endpoint with Claude tool_use integration.
 
 Provides a conversational AI assistant that can query and modify CRM data
 using Anthropic's tool_use API. Supports multi-turn conversations with
-automatic tool execution loops.
+automatic tool execution loops, either as a single JSON response
+(``POST /api/chat``) or as Server-Sent Events (``POST /api/chat/stream``).
+
+Conversation history is kept server-side (see :mod:`app.chatbot.sessions`),
+so after the first turn clients only send ``session_id`` and the new
+``message``.
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import uuid
-from typing import Any
+from typing import Any, AsyncIterator
 
 import anthropic
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_db
-from app.chatbot.tools import TOOLS, execute_tool
+from app.database import async_session_factory, get_db
+from app.chatbot.compaction import (
+    MORE_RESULTS_TOOL,
+    MORE_RESULTS_TOOL_DEFINITION,
+    ToolResultCompactor,
+)
+from app.chatbot.sessions import (
+    compact_history,
+    delete_session,
+    load_session,
+    save_session,
+)
+from app.chatbot.tools import TOOLS, ToolResultCache, ToolScheduler
+from app.orchestration.usage import current_scope
+from app.utils.anthropic_client import create_message, open_stream
 
 logger = logging.getLogger(__name__)
 
@@ -48,9 +69,20 @@ Guidelines:
 - If you don't have enough information to complete an action, ask the user for clarification.
 - Never make up data - always use the tools to query real data."""
 
+CHAT_MODEL = "claude-sonnet-4-20250514"
+CHAT_MAX_TOKENS = 16384
+
+# CRM tools plus the pager for results cut short by compaction
+CHAT_TOOLS = TOOLS + [MORE_RESULTS_TOOL_DEFINITION]
+
 # Maximum number of tool-use round-trips to prevent infinite loops
 MAX_TOOL_ROUNDS = 5
 
+MAX_ROUNDS_MESSAGE = (
+    "I've completed the maximum number of operations. Please check the "
+    "results and let me know if you need anything else."
+)
+
 
 # ---------------------------------------------------------------------------
 # Request / Response schemas
@@ -62,7 +94,8 @@ class ChatMessageInput(BaseModel):
 
 
 class ChatRequest(BaseModel):
-    messages: list[ChatMessageInput]
+    message: str | None = None
+    messages: list[ChatMessageInput] | None = None
     session_id: str | None = None
 
 
@@ -70,44 +103,141 @@ class ChatResponse(BaseModel):
     message: str
     session_id: str
     tool_calls: list[dict[str, Any]] | None = None
+    tool_cache: dict[str, Any] | None = None
 
 
 # ---------------------------------------------------------------------------
-# Endpoint
+# Helpers
 # ---------------------------------------------------------------------------
 
-@router.post("", response_model=ChatResponse)
-async def chat(request: ChatRequest, db: AsyncSession = Depends(get_db)):
-    """Process a chat message with Claude, executing CRM tools as needed."""
 
+def _check_configured() -> None:
+    """Raise 503 if the Anthropic API key is not set."""
     if not settings.ANTHROPIC_API_KEY:
         raise HTTPException(
             status_code=503,
             detail="Anthropic API key not configured",
         )
 
+
+async def _start_turn(request: ChatRequest) -> tuple[str, list[dict[str, Any]]]:
+    """Resolve the session and build the (compacted) message list for a turn.
+
+    ``messages``, if sent, replaces the stored history (clients that still
+    resend the whole conversation); otherwise the stored history of
+    ``session_id`` is used.  ``message`` is appended as the new user turn.
+    """
+    if not request.message and not request.messages:
+        raise HTTPException(
+            status_code=422,
+            detail="Either message or messages is required",
+        )
+
     session_id = request.session_id or str(uuid.uuid4())
+    if request.messages:
+        messages = [{"role": m.role, "content": m.content} for m in request.messages]
+    elif request.session_id:
+        messages = await load_session(session_id)
+    else:
+        messages = []
+    if request.message:
+        messages.append({"role": "user", "content": request.message})
+    return session_id, compact_history(messages)
+
+
+async def _finish_turn(
+    session_id: str,
+    messages: list[dict[str, Any]],
+    final_text: str,
+    cache: ToolResultCache,
+    compactor: ToolResultCompactor,
+) -> None:
+    """Append the assistant's reply and store the session state.
+
+    All of the turn's tool results have now been consumed, so the stored
+    history only keeps their summaries.
+    """
+    messages.append({"role": "assistant", "content": final_text or "(no response)"})
+    compactor.summarise_consumed(messages)
+    await save_session(session_id, messages)
+    await cache.save()
+
+
+def _serialize_content(content: list[Any]) -> list[dict[str, Any]]:
+    """Serialize response content blocks for the next API request."""
+    assistant_content = []
+    for block in content:
+        if block.type == "text":
+            assistant_content.append({"type": "text", "text": block.text})
+        elif block.type == "tool_use":
+            assistant_content.append({
+                "type": "tool_use",
+                "id": block.id,
+                "name": block.name,
+                "input": block.input,
+            })
+    return assistant_content
+
+
+def _tool_call_record(
+    name: str,
+    tool_input: Any,
+    tool_result: str,
+    cached: bool,
+) -> dict[str, Any]:
+    """Summarise one tool execution for the ``tool_calls`` metadata."""
+    return {
+        "tool": name,
+        "input": tool_input,
+        "result_preview": tool_result[:200] if len(tool_result) > 200 else tool_result,
+        "cached": cached,
+    }
+
+
+def _submit_tool(
+    scheduler: ToolScheduler,
+    compactor: ToolResultCompactor,
+    block: Any,
+) -> asyncio.Future[str]:
+    """Start a tool call; pages of compacted results are served locally."""
+    if block.name == MORE_RESULTS_TOOL:
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        future.set_result(compactor.next_page(block.input.get("cursor", "")))
+        return future
+    return scheduler.submit(block.name, block.input)
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+
 
-    # Build messages for Claude
-    messages: list[dict[str, Any]] = [
-        {"role": m.role, "content": m.content}
-        for m in request.messages
-    ]
+# ---------------------------------------------------------------------------
+# Endpoints
+# ---------------------------------------------------------------------------
 
-    client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+@router.post("", response_model=ChatResponse)
+async def chat(request: ChatRequest, db: AsyncSession = Depends(get_db)):
+    """Process a chat message with Claude, executing CRM tools as needed."""
+    _check_configured()
+    session_id, messages = await _start_turn(request)
+    cache = await ToolResultCache.load(session_id)
+    scheduler = ToolScheduler(db, cache)
+    compactor = ToolResultCompactor()
 
     all_tool_calls: list[dict[str, Any]] = []
     final_text = ""
 
     # Tool-use loop: Claude may request multiple rounds of tools
     for _round in range(MAX_TOOL_ROUNDS):
+        compactor.prepare(messages)
         try:
-            response = await client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=16384,
+            response = await create_message(
+                model=CHAT_MODEL,
+                max_tokens=CHAT_MAX_TOKENS,
                 system=SYSTEM_PROMPT,
                 messages=messages,
-                tools=TOOLS,
+                tools=CHAT_TOOLS,
             )
         except anthropic.APIError as e:
             logger.error(f"Anthropic API error: {e}")
@@ -115,37 +245,26 @@ async def chat(request: ChatRequest, db: AsyncSession = Depends(get_db)):
 
         # Check if Claude wants to use tools
         if response.stop_reason == "tool_use":
-            # Collect tool results
+            # Run the round's tools (reads concurrently) and collect results
+            tool_blocks = [b for b in response.content if b.type == "tool_use"]
+            futures = [_submit_tool(scheduler, compactor, b) for b in tool_blocks]
+            results = await asyncio.gather(*futures)
             tool_results = []
-            for block in response.content:
-                if block.type == "tool_use":
-                    tool_result = await execute_tool(block.name, block.input, db)
-                    all_tool_calls.append({
-                        "tool": block.name,
-                        "input": block.input,
-                        "result_preview": tool_result[:200] if len(tool_result) > 200 else tool_result,
-                    })
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": tool_result,
-                    })
+            for block, future, tool_result in zip(tool_blocks, futures, results):
+                all_tool_calls.append(_tool_call_record(
+                    block.name, block.input, tool_result, scheduler.was_cached(future)
+                ))
+                tool_results.append({
+                    "type": "tool_result",
+                    "tool_use_id": block.id,
+                    "content": compactor.compact(block.id, block.name, tool_result),
+                })
 
             # Continue the conversation with tool results
-            # Serialize content blocks properly for the API
-            assistant_content = []
-            for block in response.content:
-                if block.type == "text":
-                    assistant_content.append({"type": "text", "text": block.text})
-                elif block.type == "tool_use":
-                    assistant_content.append({
-                        "type": "tool_use",
-                        "id": block.id,
-                        "name": block.name,
-                        "input": block.input,
-                    })
-
-            messages.append({"role": "assistant", "content": assistant_content})
+            messages.append({
+                "role": "assistant",
+                "content": _serialize_content(response.content),
+            })
             messages.append({"role": "user", "content": tool_results})
         else:
             # No more tool calls - extract final text
@@ -156,10 +275,168 @@ async def chat(request: ChatRequest, db: AsyncSession = Depends(get_db)):
             break
     else:
         # Exceeded max rounds
-        final_text = "I've completed the maximum number of operations. Please check the results and let me know if you need anything else."
+        final_text = MAX_ROUNDS_MESSAGE
+
+    await _finish_turn(session_id, messages, final_text, cache, compactor)
 
     return ChatResponse(
         message=final_text,
         session_id=session_id,
         tool_calls=all_tool_calls if all_tool_calls else None,
+        tool_cache=cache.stats() if all_tool_calls else None,
     )
+
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest):
+    """Stream a chat turn as Server-Sent Events.
+
+    Events, in order of appearance:
+
+    - ``session``: ``{session_id}``
+    - ``text``: ``{delta}`` for each chunk of assistant text
+    - ``tool_call``: ``{id, tool, input}`` once a tool_use block is complete;
+      the tool starts executing immediately, while Claude is still streaming
+    - ``tool_result``: ``{id, tool, result_preview, cached}``
+    - ``done``: ``{message, session_id, tool_calls, tool_cache, usage}``
+    - ``error``: ``{detail}`` if the AI service fails mid-stream
+
+    Token usage is accumulated in the request's usage scope and recorded
+    by OrchestrationMiddleware once the stream has finished.
+    """
+    _check_configured()
+    session_id, messages = await _start_turn(request)
+
+    return StreamingResponse(
+        _stream_turn(messages, session_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stream_turn(
+    messages: list[dict[str, Any]],
+    session_id: str,
+) -> AsyncIterator[str]:
+    """Stream one chat turn on its own database session.
+
+    The session is opened here rather than through ``get_db`` so that it
+    stays open until the last event has been sent.
+    """
+    async with async_session_factory() as db:
+        try:
+            async for frame in _stream_rounds(messages, session_id, db):
+                yield frame
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def _stream_rounds(
+    messages: list[dict[str, Any]],
+    session_id: str,
+    db: AsyncSession,
+) -> AsyncIterator[str]:
+    """Run the tool-use loop, yielding SSE frames as work progresses."""
+    yield _sse("session", {"session_id": session_id})
+
+    all_tool_calls: list[dict[str, Any]] = []
+    final_text = ""
+    # Each tool starts as soon as its input block is complete
+    cache = await ToolResultCache.load(session_id)
+    scheduler = ToolScheduler(db, cache)
+    compactor = ToolResultCompactor()
+
+    for _round in range(MAX_TOOL_ROUNDS):
+        compactor.prepare(messages)
+        tool_tasks: list[tuple[Any, asyncio.Future[str]]] = []
+        round_text: list[str] = []
+        try:
+            async with open_stream(
+                model=CHAT_MODEL,
+                max_tokens=CHAT_MAX_TOKENS,
+                system=SYSTEM_PROMPT,
+                messages=messages,
+                tools=CHAT_TOOLS,
+            ) as stream:
+                async for event in stream:
+                    if event.type == "text":
+                        round_text.append(event.text)
+                        yield _sse("text", {"delta": event.text})
+                    elif (
+                        event.type == "content_block_stop"
+                        and event.content_block.type == "tool_use"
+                    ):
+                        block = event.content_block
+                        tool_tasks.append(
+                            (block, _submit_tool(scheduler, compactor, block))
+                        )
+                        yield _sse("tool_call", {
+                            "id": block.id,
+                            "tool": block.name,
+                            "input": block.input,
+                        })
+                response = await stream.get_final_message()
+        except anthropic.APIError as e:
+            logger.error(f"Anthropic API error: {e}")
+            scheduler.cancel()
+            yield _sse("error", {"detail": "AI service error"})
+            return
+        except BaseException:
+            # Includes the client disconnecting mid-stream: tools already
+            # started from content_block_stop must not outlive the turn
+            scheduler.cancel()
+            raise
+
+        if response.stop_reason != "tool_use":
+            final_text = "".join(round_text)
+            break
+
+        tool_results = []
+        for block, future in tool_tasks:
+            tool_result = await future
+            record = _tool_call_record(
+                block.name, block.input, tool_result, scheduler.was_cached(future)
+            )
+            all_tool_calls.append(record)
+            tool_results.append({
+                "type": "tool_result",
+                "tool_use_id": block.id,
+                "content": compactor.compact(block.id, block.name, tool_result),
+            })
+            yield _sse("tool_result", {
+                "id": block.id,
+                "tool": block.name,
+                "result_preview": record["result_preview"],
+                "cached": record["cached"],
+            })
+
+        messages.append({
+            "role": "assistant",
+            "content": _serialize_content(response.content),
+        })
+        messages.append({"role": "user", "content": tool_results})
+    else:
+        final_text = MAX_ROUNDS_MESSAGE
+        yield _sse("text", {"delta": final_text})
+
+    await _finish_turn(session_id, messages, final_text, cache, compactor)
+
+    scope = current_scope()
+    yield _sse("done", {
+        "message": final_text,
+        "session_id": session_id,
+        "tool_calls": all_tool_calls or None,
+        "tool_cache": cache.stats() if all_tool_calls else None,
+        "usage": {
+            "input_tokens": scope.input_tokens if scope else 0,
+            "output_tokens": scope.output_tokens if scope else 0,
+        },
+    })
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+async def clear_session(session_id: str):
+    """Forget the stored history of a chat session."""
+    await delete_session(session_id)
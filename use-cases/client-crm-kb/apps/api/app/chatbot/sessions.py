@@ -0,0 +1,141 @@
+"""
+Server-side conversation store for the chatbot.
+
+The canonical message list of each chat session -- including the
+``tool_use`` / ``tool_result`` blocks of earlier rounds -- is kept in
+Redis under ``chat_session:{session_id}`` with a sliding TTL, so clients
+only send the new user message each turn and Claude can reuse data it
+already fetched instead of querying it again.
+
+Before each turn the history is compacted to ``CHAT_HISTORY_TOKEN_BUDGET``
+estimated tokens: the oldest whole turns are dropped and replaced by a
+short note listing the last questions the user asked in them, which bounds per-turn
+input tokens however long the conversation runs.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any
+
+from app.config import settings
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "chat_session:"
+
+# Rough chars-per-token ratio used for budget estimates
+_CHARS_PER_TOKEN = 4
+
+# Truncation note: the most recent dropped questions, each clipped
+_SUMMARY_MAX_QUESTIONS = 8
+_SUMMARY_SNIPPET_CHARS = 160
+
+_NOTE_PREFIX = "[Earlier conversation truncated"
+_NOTE_SUFFIX = "]\n\n"
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+
+async def load_session(session_id: str) -> list[dict[str, Any]]:
+    """Return the stored message list for ``session_id`` (empty if none)."""
+    try:
+        raw = await get_redis().get(_KEY_PREFIX + session_id)
+    except Exception:
+        logger.warning("Chat session store unavailable; starting without history.")
+        return []
+    if raw is None:
+        return []
+    try:
+        return json.loads(raw)
+    except ValueError:
+        logger.warning(f"Discarding corrupt chat session {session_id}")
+        return []
+
+
+async def save_session(session_id: str, messages: list[dict[str, Any]]) -> None:
+    """Store the message list and refresh the session's TTL."""
+    try:
+        await get_redis().set(
+            _KEY_PREFIX + session_id,
+            json.dumps(messages, default=str, ensure_ascii=False),
+            ex=settings.CHAT_SESSION_TTL_SECONDS,
+        )
+    except Exception:
+        logger.warning(f"Failed to save chat session {session_id}")
+
+
+async def delete_session(session_id: str) -> None:
+    """Forget a session's history."""
+    try:
+        await get_redis().delete(_KEY_PREFIX + session_id)
+    except Exception:
+        logger.warning(f"Failed to delete chat session {session_id}")
+
+
+# ---------------------------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------------------------
+
+
+def estimate_tokens(messages: list[dict[str, Any]]) -> int:
+    """Cheap token estimate for a message list."""
+    return len(json.dumps(messages, default=str, ensure_ascii=False)) // _CHARS_PER_TOKEN
+
+
+def _is_user_turn(message: dict[str, Any]) -> bool:
+    """True for a message typed by the user (not a tool_result carrier)."""
+    return message["role"] == "user" and isinstance(message["content"], str)
+
+
+def _strip_note(content: str) -> str:
+    """Remove a truncation note left by a previous compaction."""
+    if content.startswith(_NOTE_PREFIX) and _NOTE_SUFFIX in content:
+        return content.split(_NOTE_SUFFIX, 1)[1]
+    return content
+
+
+def compact_history(
+    messages: list[dict[str, Any]],
+    budget_tokens: int | None = None,
+) -> list[dict[str, Any]]:
+    """Drop the oldest turns until the history fits ``budget_tokens``.
+
+    Cuts only at the start of a user turn, so tool_use / tool_result pairs
+    are never split, and always keeps the most recent turn.  The dropped
+    turns are summarised as a note (the last few questions the user asked)
+    prepended to the first kept message.
+    """
+    budget = budget_tokens or settings.CHAT_HISTORY_TOKEN_BUDGET
+    if estimate_tokens(messages) <= budget:
+        return messages
+
+    turn_starts = [i for i, m in enumerate(messages) if _is_user_turn(m)]
+    cut = turn_starts[-1] if turn_starts else 0
+    for start in turn_starts[1:]:
+        if estimate_tokens(messages[start:]) <= budget:
+            cut = start
+            break
+    if cut == 0:
+        return messages
+
+    dropped = messages[:cut]
+    questions = [
+        _strip_note(m["content"])[:_SUMMARY_SNIPPET_CHARS]
+        for m in dropped
+        if _is_user_turn(m)
+    ][-_SUMMARY_MAX_QUESTIONS:]
+    note = (
+        f"{_NOTE_PREFIX}: {len(dropped)} messages omitted. "
+        "The user previously asked:\n"
+        + "\n".join(f"- {q}" for q in questions)
+        + "\nRe-query any data you need with the tools."
+        + _NOTE_SUFFIX
+    )
+    first = _strip_note(messages[cut]["content"])
+    return [{"role": "user", "content": note + first}] + messages[cut + 1:]
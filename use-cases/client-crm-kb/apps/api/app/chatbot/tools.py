@@ -2,25 +2,36 @@
 CRM tool definitions and execution for the AI chatbot.
 
 Each tool maps to a real CRM operation (query clients, update records, etc.)
-and is exposed to Claude via the Anthropic tool_use API.
+and is exposed to Claude via the Anthropic tool_use API.  Tool calls from
+one turn are run through a :class:`ToolScheduler`, which executes
+read-only tools concurrently and serializes mutating ones, serving
+repeated reads from the session's :class:`ToolResultCache`.
 """
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from typing import Any
+from typing import Any, Optional
+from uuid import UUID
 
 from sqlalchemy import select, func
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.clients.snapshot import load_client_snapshot
+from app.config import settings
+from app.database import async_session_factory
+from app.health.service import feedback_changed, feedback_snapshot, projects_changed
+from app.kb.context import get_kb_context
+from app.kb.usage import record_kb_uses
+from app.utils.redis_client import get_redis
 from app.models import (
     Client,
-    Contact,
     Project,
     FeedbackEvent,
     ClientRule,
-    BrandProfile,
     Pattern,
 )
 
@@ -196,6 +207,17 @@ TOOLS = [
 # Tool execution
 # ---------------------------------------------------------------------------
 
+# Tools that never write.  Anything not listed (including unknown tools) is
+# treated as mutating.
+READ_ONLY_TOOLS = frozenset({
+    "query_clients",
+    "get_client_details",
+    "get_feedback",
+    "list_projects",
+    "get_rules",
+    "get_brand_profile",
+})
+
 UPDATABLE_CLIENT_FIELDS = {
     "name", "legal_name", "industry", "region", "languages",
     "status", "timezone", "website_url", "company_size",
@@ -218,6 +240,186 @@ async def execute_tool(
         return json.dumps({"error": str(e)})
 
 
+class ToolResultCache:
+    """Session-scoped read-through cache of read-only tool results.
+
+    Entries are keyed by (client_id, tool, normalised input) and live in
+    the Redis hash ``chat_tool_cache:{session_id}``, loaded once at the
+    start of a turn and written back at its end with the session's TTL.
+    A mutating tool invalidates every entry for its client_id together
+    with the entries that are not scoped to a client (e.g. searches).
+    """
+
+    __slots__ = ("session_id", "_entries", "_changed", "hits", "misses")
+
+    _KEY_PREFIX = "chat_tool_cache:"
+    _UNSCOPED = "*"
+
+    def __init__(self, session_id: str, entries: Optional[dict[str, str]] = None) -> None:
+        self.session_id = session_id
+        self._entries: dict[str, str] = entries or {}
+        self._changed = False
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    async def load(cls, session_id: str) -> "ToolResultCache":
+        """Load the session's cached results (empty if Redis is unavailable)."""
+        try:
+            entries = await get_redis().hgetall(cls._KEY_PREFIX + session_id)
+        except Exception:
+            logger.warning("Tool result cache unavailable; continuing without it.")
+            entries = {}
+        return cls(session_id, entries)
+
+    async def save(self) -> None:
+        """Write the entries back to Redis if anything changed."""
+        if not self._changed:
+            return
+        key = self._KEY_PREFIX + self.session_id
+        try:
+            async with get_redis().pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                if self._entries:
+                    pipe.hset(key, mapping=self._entries)
+                    pipe.expire(key, settings.CHAT_SESSION_TTL_SECONDS)
+                await pipe.execute()
+        except Exception:
+            logger.warning(f"Failed to save tool result cache {self.session_id}")
+
+    @classmethod
+    def _key(cls, tool_name: str, tool_input: dict[str, Any]) -> str:
+        normalised = {
+            k: v.strip() if isinstance(v, str) else v
+            for k, v in tool_input.items()
+            if v not in (None, "")
+        }
+        client_id = str(normalised.get("client_id") or cls._UNSCOPED)
+        args = json.dumps(normalised, sort_keys=True, separators=(",", ":"), default=str)
+        return f"{client_id}|{tool_name}|{args}"
+
+    def get(self, tool_name: str, tool_input: dict[str, Any]) -> Optional[str]:
+        """Return a cached result, counting the lookup as a hit or miss."""
+        result = self._entries.get(self._key(tool_name, tool_input))
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, tool_name: str, tool_input: dict[str, Any], result: str) -> None:
+        """Cache a successful result."""
+        if result.startswith('{"error"'):
+            return
+        self._entries[self._key(tool_name, tool_input)] = result
+        self._changed = True
+
+    def invalidate(self, client_id: Any) -> None:
+        """Drop entries for ``client_id`` and all unscoped entries."""
+        prefixes = (f"{client_id}|", f"{self._UNSCOPED}|")
+        stale = [k for k in self._entries if k.startswith(prefixes)]
+        for k in stale:
+            del self._entries[k]
+        if stale:
+            self._changed = True
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counts for this turn's lookups."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate_pct": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+        }
+
+
+class ToolScheduler:
+    """Run one chat turn's tool calls with read/write ordering preserved.
+
+    Read-only tools are answered from ``cache`` when possible; otherwise
+    each runs on its own pooled session, concurrently with one another.
+    A mutating tool waits for every call submitted before it, runs on the
+    request session and is committed, so reads submitted after it (on
+    other sessions) see its write.
+    """
+
+    __slots__ = ("_db", "_cache", "_submitted", "_last_write", "_cached")
+
+    def __init__(self, db: AsyncSession, cache: Optional[ToolResultCache] = None) -> None:
+        self._db = db
+        self._cache = cache
+        self._submitted: list[asyncio.Future[str]] = []
+        self._last_write: Optional[asyncio.Future[str]] = None
+        self._cached: set[asyncio.Future[str]] = set()
+
+    def submit(self, tool_name: str, tool_input: dict[str, Any]) -> asyncio.Future[str]:
+        """Start executing a tool call and return a future for its result."""
+        if tool_name in READ_ONLY_TOOLS:
+            cached = self._cache.get(tool_name, tool_input) if self._cache else None
+            if cached is not None:
+                future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+                future.set_result(cached)
+                self._cached.add(future)
+                return future
+            task = asyncio.create_task(
+                self._run_read(tool_name, tool_input, self._last_write)
+            )
+        else:
+            # Invalidate now so reads submitted after this call miss the cache
+            self._invalidate(tool_input)
+            task = asyncio.create_task(
+                self._run_write(tool_name, tool_input, list(self._submitted))
+            )
+            self._last_write = task
+        self._submitted.append(task)
+        return task
+
+    def was_cached(self, future: asyncio.Future[str]) -> bool:
+        """True if ``future`` was answered from the tool result cache."""
+        return future in self._cached
+
+    def _invalidate(self, tool_input: dict[str, Any]) -> None:
+        if self._cache is not None:
+            self._cache.invalidate(tool_input.get("client_id"))
+
+    def cancel(self) -> None:
+        """Cancel any calls that have not finished."""
+        for task in self._submitted:
+            task.cancel()
+
+    async def _run_read(
+        self,
+        tool_name: str,
+        tool_input: dict[str, Any],
+        after: Optional[asyncio.Task[str]],
+    ) -> str:
+        if after is not None:
+            await asyncio.wait([after])
+        async with async_session_factory() as session:
+            result = await execute_tool(tool_name, tool_input, session)
+        if self._cache is not None:
+            self._cache.put(tool_name, tool_input, result)
+        return result
+
+    async def _run_write(
+        self,
+        tool_name: str,
+        tool_input: dict[str, Any],
+        after: list[asyncio.Task[str]],
+    ) -> str:
+        if after:
+            await asyncio.wait(after)
+        result = await execute_tool(tool_name, tool_input, self._db)
+        try:
+            await self._db.commit()
+        except SQLAlchemyError:
+            logger.exception(f"Failed to commit tool: {tool_name}")
+            await self._db.rollback()
+        # Again: reads queued ahead of this write may have cached pre-write data
+        self._invalidate(tool_input)
+        return result
+
+
 async def _dispatch(
     tool_name: str,
     inp: dict[str, Any],
@@ -270,31 +472,17 @@ async def _query_clients(db: AsyncSession, inp: dict) -> list:
 
 
 async def _get_client_details(db: AsyncSession, client_id: str) -> dict:
-    result = await db.execute(
-        select(Client).where(Client.id == client_id)
+    snapshot = await load_client_snapshot(
+        db,
+        client_id,
+        sections=("contacts", "projects", "brand_profile"),
+        include_deleted=True,
     )
-    client = result.scalars().first()
-    if not client:
+    if snapshot is None:
         return {"error": "Client not found"}
 
-    # Contacts
-    contacts_result = await db.execute(
-        select(Contact).where(Contact.client_id == client_id).limit(20)
-    )
-    contacts = contacts_result.scalars().all()
-
-    # Projects
-    projects_result = await db.execute(
-        select(Project).where(Project.client_id == client_id).limit(10)
-    )
-    projects = projects_result.scalars().all()
-
-    # Brand profile
-    bp_result = await db.execute(
-        select(BrandProfile).where(BrandProfile.client_id == client_id)
-    )
-    brand = bp_result.scalars().first()
-
+    client = snapshot["client"]
+    brand = snapshot["brand_profile"]
     return {
         "client": {
             "id": str(client.id),
@@ -307,23 +495,13 @@ async def _get_client_details(db: AsyncSession, client_id: str) -> dict:
             "internal_notes": client.internal_notes,
             "client_value_tier": client.client_value_tier.value if client.client_value_tier else None,
         },
-        "contacts": [
-            {"id": str(c.id), "name": c.name, "email": c.email, "is_primary": c.is_primary}
-            for c in contacts
-        ],
-        "projects": [
-            {
-                "id": str(p.id),
-                "name": p.name,
-                "status": p.status if isinstance(p.status, str) else p.status.value,
-            }
-            for p in projects
-        ],
+        "contacts": snapshot["contacts"],
+        "projects": snapshot["projects"],
         "brand_profile": {
-            "brand_tone": brand.brand_tone,
-            "brand_values": brand.brand_values,
-            "do_list": brand.do_list,
-            "dont_list": brand.dont_list,
+            "brand_tone": brand["brand_tone"],
+            "brand_values": brand["brand_values"],
+            "do_list": brand["do_list"],
+            "dont_list": brand["dont_list"],
         } if brand else None,
     }
 
@@ -351,7 +529,7 @@ async def _update_client(db: AsyncSession, client_id: str, updates: dict) -> dic
 
 async def _create_feedback(db: AsyncSession, inp: dict) -> dict:
     fb = FeedbackEvent(
-        client_id=inp["client_id"],
+        client_id=UUID(inp["client_id"]),
         raw_text=inp["raw_text"],
         source="chat",
     )
@@ -359,6 +537,7 @@ async def _create_feedback(db: AsyncSession, inp: dict) -> dict:
         fb.project_id = project_id
     db.add(fb)
     await db.flush()
+    await feedback_changed(db, [(fb.client_id, None, feedback_snapshot(fb))])
     return {"success": True, "id": str(fb.id), "note": "Feedback created. Use the feedback analysis endpoint to analyze sentiment."}
 
 
@@ -385,12 +564,13 @@ async def _get_feedback(db: AsyncSession, inp: dict) -> list:
 
 async def _create_project(db: AsyncSession, inp: dict) -> dict:
     project = Project(
-        client_id=inp["client_id"],
+        client_id=UUID(inp["client_id"]),
         name=inp["name"],
         type=inp.get("type", "other"),
     )
     db.add(project)
     await db.flush()
+    await projects_changed(db, [project.client_id])
     return {"success": True, "id": str(project.id), "name": project.name}
 
 
@@ -415,14 +595,33 @@ async def _list_projects(db: AsyncSession, inp: dict) -> list:
 
 
 async def _get_rules(db: AsyncSession, inp: dict) -> list:
-    query = select(ClientRule)
+    rule_type = inp.get("rule_type")
     if client_id := inp.get("client_id"):
-        query = query.where(ClientRule.client_id == client_id)
-    if rule_type := inp.get("rule_type"):
+        # One client's rules come from the cached KB context
+        context = await get_kb_context(db, UUID(client_id))
+        items = [
+            r for r in context.active_rules
+            if not rule_type or r["rule_type"] == rule_type
+        ][:20]
+        record_kb_uses(("rule", r["id"]) for r in items)
+        return [
+            {
+                "id": r["id"],
+                "description": r["description"],
+                "rule_type": r["rule_type"],
+                "applies_to": r["applies_to"],
+                "priority": r["priority"],
+            }
+            for r in items
+        ]
+
+    query = select(ClientRule)
+    if rule_type:
         query = query.where(ClientRule.rule_type == rule_type)
     query = query.where(ClientRule.status == "active").limit(20)
     result = await db.execute(query)
     items = result.scalars().all()
+    record_kb_uses(("rule", r.id) for r in items)
     return [
         {
             "id": str(r.id),
@@ -448,17 +647,14 @@ async def _create_rule(db: AsyncSession, inp: dict) -> dict:
 
 
 async def _get_brand_profile(db: AsyncSession, client_id: str) -> dict:
-    result = await db.execute(
-        select(BrandProfile).where(BrandProfile.client_id == client_id)
-    )
-    bp = result.scalars().first()
+    bp = (await get_kb_context(db, UUID(client_id))).brand_profile
     if not bp:
         return {"message": "No brand profile found for this client"}
     return {
-        "brand_tone": bp.brand_tone,
-        "brand_values": bp.brand_values,
-        "key_messages": bp.key_messages,
-        "do_list": bp.do_list,
-        "dont_list": bp.dont_list,
-        "legal_sensitivities": bp.legal_sensitivities,
+        "brand_tone": bp["brand_tone"],
+        "brand_values": bp["brand_values"],
+        "key_messages": bp["key_messages"],
+        "do_list": bp["do_list"],
+        "dont_list": bp["dont_list"],
+        "legal_sensitivities": bp["legal_sensitivities"],
     }
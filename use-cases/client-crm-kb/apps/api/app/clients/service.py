@@ -9,16 +9,11 @@ from uuid import UUID
 from sqlalchemy import Select, and_, delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.clients.snapshot import OVERVIEW_SECTIONS, load_client_snapshot
 from app.models import (
     Client,
     ClientRisk,
-    ClientRule,
-    Contact,
-    FeedbackEvent,
     HealthScoreHistory,
-    Project,
-    ProjectStatus,
-    RuleStatus,
 )
 
 
@@ -155,65 +150,10 @@ async def soft_delete_client(
 async def get_client_overview(
     db: AsyncSession, client_id: UUID
 ) -> Optional[dict[str, Any]]:
-    """Return aggregated overview data for a client."""
-    client = await get_client(db, client_id)
-    if client is None:
-        return None
-
-    # Recent feedback count (last 90 days)
-    ninety_days_ago = datetime.now(timezone.utc) - timedelta(days=90)
-    feedback_count_result = await db.execute(
-        select(func.count(FeedbackEvent.id)).where(
-            and_(
-                FeedbackEvent.client_id == client_id,
-                FeedbackEvent.created_at >= ninety_days_ago,
-            )
-        )
-    )
-    recent_feedback_count = feedback_count_result.scalar_one()
-
-    # Active projects count
-    active_projects_result = await db.execute(
-        select(func.count(Project.id)).where(
-            and_(
-                Project.client_id == client_id,
-                Project.status.in_(
-                    [ProjectStatus.planning, ProjectStatus.in_progress]
-                ),
-            )
-        )
-    )
-    active_projects_count = active_projects_result.scalar_one()
-
-    # Active rules count
-    active_rules_result = await db.execute(
-        select(func.count(ClientRule.id)).where(
-            and_(
-                ClientRule.client_id == client_id,
-                ClientRule.status == RuleStatus.active,
-            )
-        )
-    )
-    active_rules_count = active_rules_result.scalar_one()
-
-    # Contacts count (non-deleted)
-    contacts_result = await db.execute(
-        select(func.count(Contact.id)).where(
-            and_(
-                Contact.client_id == client_id,
-                Contact.deleted_at.is_(None),
-            )
-        )
+    """Return aggregated overview data for a client (one query)."""
+    return await load_client_snapshot(
+        db, client_id, sections=OVERVIEW_SECTIONS
     )
-    contacts_count = contacts_result.scalar_one()
-
-    return {
-        "client": client,
-        "recent_feedback_count": recent_feedback_count,
-        "active_projects_count": active_projects_count,
-        "active_rules_count": active_rules_count,
-        "contacts_count": contacts_count,
-    }
 
 
 # ---------------------------------------------------------------------------
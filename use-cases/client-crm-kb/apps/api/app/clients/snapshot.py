@@ -0,0 +1,336 @@
+"""
+Single-statement client snapshot loader.
+
+Aggregate reads of a client -- the chatbot's ``get_client_details``, the
+client overview endpoint and the KB export -- used to issue one query per
+related table.  :func:`load_client_snapshot` fetches the client row plus
+any requested sections in one round trip: each list section is a
+``json_agg`` scalar subquery, each count a ``COUNT(*)`` scalar subquery.
+
+Usage::
+
+    snapshot = await load_client_snapshot(
+        db, client_id, sections=("contacts", "projects", "brand_profile")
+    )
+    snapshot["client"], snapshot["contacts"]
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import JSON, and_, func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models import (
+    BrandProfile,
+    Client,
+    ClientRule,
+    Contact,
+    FeedbackEvent,
+    Pattern,
+    Project,
+    ProjectStatus,
+    RuleStatus,
+    TasteExample,
+)
+
+_EMPTY_JSON_ARRAY = literal_column("'[]'::json")
+
+
+# ---------------------------------------------------------------------------
+# Subquery helpers
+# ---------------------------------------------------------------------------
+
+
+def _json_object(fields: dict[str, ColumnElement[Any]]) -> ColumnElement[Any]:
+    """``json_build_object`` over ``{key: column}``."""
+    return func.json_build_object(
+        *[arg for key, col in fields.items() for arg in (key, col)],
+        type_=JSON,
+    )
+
+
+def _json_list(
+    fields: dict[str, ColumnElement[Any]],
+    where: ColumnElement[bool],
+    *,
+    order_by: ColumnElement[Any],
+    descending: bool = False,
+    limit: Optional[int] = None,
+) -> ColumnElement[Any]:
+    """Scalar subquery aggregating the matching rows into a JSON array.
+
+    The rows are limited in an inner query and ordered again inside the
+    aggregate, since ``json_agg`` does not preserve subquery order.
+    """
+    inner = (
+        select(
+            *[col.label(key) for key, col in fields.items()],
+            order_by.label("_sort"),
+        )
+        .where(where)
+        .order_by(order_by.desc() if descending else order_by.asc())
+    )
+    if limit is not None:
+        inner = inner.limit(limit)
+    sub = inner.subquery()
+
+    row = _json_object({key: sub.c[key] for key in fields})
+    sort = sub.c["_sort"].desc() if descending else sub.c["_sort"].asc()
+    agg = func.json_agg(aggregate_order_by(row, sort))
+    return (
+        select(func.coalesce(agg, _EMPTY_JSON_ARRAY, type_=JSON))
+        .select_from(sub)
+        .scalar_subquery()
+    )
+
+
+def _json_row(
+    fields: dict[str, ColumnElement[Any]],
+    where: ColumnElement[bool],
+) -> ColumnElement[Any]:
+    """Scalar subquery returning one matching row as a JSON object (or NULL)."""
+    return (
+        select(_json_object(fields))
+        .where(where)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _count(column: ColumnElement[Any], where: ColumnElement[bool]) -> ColumnElement[Any]:
+    """Scalar ``COUNT`` subquery."""
+    return select(func.count(column)).where(where).scalar_subquery()
+
+
+# ---------------------------------------------------------------------------
+# Sections
+# ---------------------------------------------------------------------------
+
+
+def _contacts(client_id: UUID) -> ColumnElement[Any]:
+    return _json_list(
+        {
+            "id": Contact.id,
+            "name": Contact.name,
+            "email": Contact.email,
+            "is_primary": Contact.is_primary,
+        },
+        and_(Contact.client_id == client_id, Contact.deleted_at.is_(None)),
+        order_by=Contact.created_at,
+        limit=20,
+    )
+
+
+def _projects(client_id: UUID) -> ColumnElement[Any]:
+    return _json_list(
+        {"id": Project.id, "name": Project.name, "status": Project.status},
+        Project.client_id == client_id,
+        order_by=Project.created_at,
+        descending=True,
+        limit=10,
+    )
+
+
+def _brand_profile(client_id: UUID) -> ColumnElement[Any]:
+    return _json_row(
+        {
+            "id": BrandProfile.id,
+            "brand_tone": BrandProfile.brand_tone,
+            "brand_values": BrandProfile.brand_values,
+            "key_messages": BrandProfile.key_messages,
+            "do_list": BrandProfile.do_list,
+            "dont_list": BrandProfile.dont_list,
+            "legal_sensitivities": BrandProfile.legal_sensitivities,
+            "visual_rules": BrandProfile.visual_rules,
+            "version": BrandProfile.version,
+            "status": BrandProfile.status,
+        },
+        BrandProfile.client_id == client_id,
+    )
+
+
+def _taste_examples(client_id: UUID) -> ColumnElement[Any]:
+    return _json_list(
+        {
+            "id": TasteExample.id,
+            "type": TasteExample.type,
+            "category": TasteExample.category,
+            "description": TasteExample.description,
+            "why_client_likes_or_dislikes": TasteExample.why_client_likes_or_dislikes,
+            "tags": TasteExample.tags,
+            "media_ref": TasteExample.media_ref,
+        },
+        TasteExample.client_id == client_id,
+        order_by=TasteExample.added_at,
+        descending=True,
+    )
+
+
+def _rules(client_id: UUID) -> ColumnElement[Any]:
+    return _json_list(
+        {
+            "id": ClientRule.id,
+            "description": ClientRule.description,
+            "rule_type": ClientRule.rule_type,
+            "applies_to": ClientRule.applies_to,
+            "priority": ClientRule.priority,
+            "status": ClientRule.status,
+            "usage_count": ClientRule.usage_count,
+        },
+        ClientRule.client_id == client_id,
+        order_by=ClientRule.priority,
+    )
+
+
+def _patterns(client_id: UUID) -> ColumnElement[Any]:
+    # Client-scoped patterns plus global and segment ones
+    return _json_list(
+        {
+            "id": Pattern.id,
+            "scope": Pattern.scope,
+            "name": Pattern.name,
+            "description": Pattern.description,
+            "category": Pattern.category,
+            "applicable_channels": Pattern.applicable_channels,
+            "usage_count": Pattern.usage_count,
+        },
+        or_(
+            Pattern.client_id == client_id,
+            Pattern.scope.in_(["global", "segment"]),
+        ),
+        order_by=Pattern.usage_count,
+        descending=True,
+    )
+
+
+def _recent_feedback(client_id: UUID) -> ColumnElement[Any]:
+    return _json_list(
+        {
+            "id": FeedbackEvent.id,
+            "source": FeedbackEvent.source,
+            "date": FeedbackEvent.date,
+            "sentiment": FeedbackEvent.sentiment,
+            "severity": FeedbackEvent.severity,
+            "topics": FeedbackEvent.topics,
+            "status": FeedbackEvent.status,
+            "raw_text": func.left(FeedbackEvent.raw_text, 500),
+        },
+        FeedbackEvent.client_id == client_id,
+        order_by=FeedbackEvent.created_at,
+        descending=True,
+        limit=20,
+    )
+
+
+def _recent_feedback_count(client_id: UUID) -> ColumnElement[Any]:
+    ninety_days_ago = datetime.now(timezone.utc) - timedelta(days=90)
+    return _count(
+        FeedbackEvent.id,
+        and_(
+            FeedbackEvent.client_id == client_id,
+            FeedbackEvent.created_at >= ninety_days_ago,
+        ),
+    )
+
+
+def _active_projects_count(client_id: UUID) -> ColumnElement[Any]:
+    return _count(
+        Project.id,
+        and_(
+            Project.client_id == client_id,
+            Project.status.in_([ProjectStatus.planning, ProjectStatus.in_progress]),
+        ),
+    )
+
+
+def _active_rules_count(client_id: UUID) -> ColumnElement[Any]:
+    return _count(
+        ClientRule.id,
+        and_(
+            ClientRule.client_id == client_id,
+            ClientRule.status == RuleStatus.active,
+        ),
+    )
+
+
+def _contacts_count(client_id: UUID) -> ColumnElement[Any]:
+    return _count(
+        Contact.id,
+        and_(Contact.client_id == client_id, Contact.deleted_at.is_(None)),
+    )
+
+
+SECTIONS: dict[str, Callable[[UUID], ColumnElement[Any]]] = {
+    "contacts": _contacts,
+    "projects": _projects,
+    "brand_profile": _brand_profile,
+    "taste_examples": _taste_examples,
+    "rules": _rules,
+    "patterns": _patterns,
+    "recent_feedback": _recent_feedback,
+    "recent_feedback_count": _recent_feedback_count,
+    "active_projects_count": _active_projects_count,
+    "active_rules_count": _active_rules_count,
+    "contacts_count": _contacts_count,
+}
+
+# Sections used by the client overview endpoint
+OVERVIEW_SECTIONS = (
+    "recent_feedback_count",
+    "active_projects_count",
+    "active_rules_count",
+    "contacts_count",
+)
+
+# Sections used by the KB export (brand profile, rules and patterns come
+# from the cached KB context, see app.kb.context)
+KB_EXPORT_SECTIONS = (
+    "taste_examples",
+    "recent_feedback",
+)
+
+
+# ---------------------------------------------------------------------------
+# Loader
+# ---------------------------------------------------------------------------
+
+
+async def load_client_snapshot(
+    db: AsyncSession,
+    client_id: UUID,
+    *,
+    sections: Iterable[str],
+    include_deleted: bool = False,
+) -> Optional[dict[str, Any]]:
+    """Load a client and the requested sections in a single statement.
+
+    Returns ``{"client": Client, <section>: value, ...}`` or None if the
+    client does not exist.  List sections are lists of plain dicts (UUIDs
+    and enums as strings), ``brand_profile`` is a dict or None, and count
+    sections are ints.
+    """
+    names = list(sections)
+    unknown = set(names) - SECTIONS.keys()
+    if unknown:
+        raise ValueError(f"Unknown snapshot sections: {sorted(unknown)}")
+
+    stmt = select(
+        Client,
+        *[SECTIONS[name](client_id).label(name) for name in names],
+    ).where(Client.id == client_id)
+    if not include_deleted:
+        stmt = stmt.where(Client.deleted_at.is_(None))
+
+    row = (await db.execute(stmt)).first()
+    if row is None:
+        return None
+    snapshot: dict[str, Any] = {"client": row[0]}
+    for index, name in enumerate(names, start=1):
+        snapshot[name] = row[index]
+    return snapshot
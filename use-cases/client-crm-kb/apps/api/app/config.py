@@ -20,6 +20,18 @@ class Settings(BaseSettings):
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
     GOOGLE_REDIRECT_URI: str = ""
+    GMAIL_API_ENDPOINT: str = ""  # override the API root, e.g. a local fake server
+    GMAIL_FETCH_BATCH_SIZE: int = 50  # messages per batch request (Gmail allows 100)
+    GMAIL_FETCH_CONCURRENCY: int = 4  # batch requests in flight
+    GMAIL_ANALYSIS_CONCURRENCY: int = 8  # Claude analyses in flight
+    GMAIL_PIPELINE_QUEUE_SIZE: int = 100  # items buffered between sync stages
+    GMAIL_BODY_MAX_CHARS: int = 5000  # text extracted per email body
+    GMAIL_DOMAIN_MATCHING: bool = True  # match unknown senders by client domain
+    GMAIL_CONTACT_INDEX_MAX_AGE_SECONDS: int = 300  # rebuild the sender index at least this often
+    GMAIL_SYNC_MAX_RESULTS: int = 200  # per background (scheduled or push) sync
+    GMAIL_SYNC_MAX_ATTEMPTS: int = 3  # tries per failing message before giving up
+    GMAIL_PUSH_TOPIC: str = ""  # Pub/Sub topic for users.watch; empty disables push
+    GMAIL_PUSH_VERIFICATION_TOKEN: str = ""  # required ?token= on the push webhook
 
     # AI orchestration engine
     AI_DAILY_TOKEN_LIMIT: int = 1_000_000
@@ -31,6 +43,58 @@ class Settings(BaseSettings):
     AI_MODEL_DEFAULT: str = "claude-sonnet-4-20250514"
     AI_MODEL_FALLBACK: str = "claude-haiku-4-5-20251001"
 
+    # AI response cache (deterministic temperature-0 tool_use calls)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    AI_CACHE_MAX_ENTRIES: int = 10_000
+
+    # Shared Anthropic client (connection pool, retry, concurrency)
+    ANTHROPIC_MAX_CONNECTIONS: int = 50
+    ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    ANTHROPIC_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    ANTHROPIC_TIMEOUT_SECONDS: float = 120.0
+    ANTHROPIC_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    ANTHROPIC_MAX_RETRIES: int = 4
+    ANTHROPIC_RETRY_BASE_DELAY_SECONDS: float = 1.0
+    ANTHROPIC_RETRY_MAX_DELAY_SECONDS: float = 30.0
+    ANTHROPIC_MAX_CONCURRENCY_PER_MODEL: int = 8
+
+    # Chatbot server-side session store
+    CHAT_SESSION_TTL_SECONDS: int = 24 * 3600
+    CHAT_HISTORY_TOKEN_BUDGET: int = 24_000
+    CHAT_TOOL_RESULT_TOKEN_CAP: int = 1_500
+
+    # Knowledge base hybrid (lexical + vector) search
+    KB_HYBRID_LATENCY_BUDGET_MS: int = 300
+    KB_EMBEDDING_BATCH_SIZE: int = 500
+    KB_LOCAL_INDEX_REFRESH_SECONDS: int = 60  # without pgvector: in-process index check
+
+    # Versioned KB context cache (Redis + in-process LRU)
+    KB_CONTEXT_CACHE_TTL_SECONDS: int = 24 * 3600
+    KB_CONTEXT_LOCAL_MAX_ENTRIES: int = 256
+
+    # Buffered rule/pattern usage counting
+    KB_USAGE_FLUSH_INTERVAL_SECONDS: float = 10.0
+
+    # Bulk feedback analysis
+    FEEDBACK_ANALYSIS_BATCH_SIZE: int = 50  # pending items claimed per batch
+    FEEDBACK_ANALYSIS_CONCURRENCY: int = 8  # Claude analyses in flight
+
+    # Local pre-classifier; only uncertain feedback is escalated to Claude
+    FEEDBACK_LOCAL_CLASSIFIER_ENABLED: bool = True
+    FEEDBACK_LOCAL_MAX_CHARS: int = 280  # longer feedback always goes to Claude
+    FEEDBACK_LOCAL_CONFIDENCE: float = 0.9  # minimum probability per prediction
+    FEEDBACK_LOCAL_MIN_ACCURACY: float = 0.9  # holdout accuracy required to use it
+    FEEDBACK_LOCAL_MIN_EXAMPLES: int = 200  # Claude-labelled items needed to train
+    FEEDBACK_LOCAL_TRAINING_LIMIT: int = 5000  # most recent items trained on
+    FEEDBACK_LOCAL_RETRAIN_SECONDS: int = 6 * 3600
+    FEEDBACK_LOCAL_AUDIT_RATE: float = 0.05  # local decisions re-checked by Claude
+
+    # Background jobs and the recommended-schedule runner
+    JOB_SCHEDULER_ENABLED: bool = True
+    JOB_RESULT_TTL_SECONDS: int = 24 * 3600
+    JOB_LEASE_SECONDS: int = 60  # a job's claim lapses this long after its worker dies
+
     class Config:
         env_file = ".env"
 
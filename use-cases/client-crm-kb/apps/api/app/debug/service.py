@@ -11,19 +11,20 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select, update
+from sqlalchemy import case, column, func, select, true, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.kb.context import get_kb_context
+from app.kb.usage import record_kb_uses
 from app.models import (
-    BrandProfile,
     Client,
-    ClientRule,
     DebugIssue,
     DebugModuleDefinition,
     DebugSession,
     DebugTraceStep,
-    Pattern,
+    IssueSeverity,
 )
 
 
@@ -157,63 +158,44 @@ async def update_session_status(
 async def load_client_kb(
     db: AsyncSession, client_id: UUID
 ) -> dict:
-    """Load client knowledge base context for debug modules."""
-    # Brand profile
-    bp_result = await db.execute(
-        select(BrandProfile).where(BrandProfile.client_id == client_id)
-    )
-    brand_profile = bp_result.scalar_one_or_none()
+    """Load client knowledge base context for debug modules.
 
-    # Active client rules
-    rules_result = await db.execute(
-        select(ClientRule).where(
-            ClientRule.client_id == client_id,
-            ClientRule.status == "active",
-        )
-    )
-    rules = list(rules_result.scalars().all())
-
-    # Patterns (client + segment + global)
-    patterns_result = await db.execute(
-        select(Pattern).where(
-            (Pattern.client_id == client_id)
-            | (Pattern.scope == "segment")
-            | (Pattern.scope == "global")
-        )
-    )
-    patterns = list(patterns_result.scalars().all())
+    Served from the versioned KB context cache (see :mod:`app.kb.context`).
+    """
+    context = await get_kb_context(db, client_id, with_usage=True)
+    brand_profile = context.brand_profile or {}
 
     return {
         "brand_profile": {
-            "brand_tone": brand_profile.brand_tone if brand_profile else None,
-            "brand_values": brand_profile.brand_values if brand_profile else [],
-            "key_messages": brand_profile.key_messages if brand_profile else [],
-            "do_list": brand_profile.do_list if brand_profile else [],
-            "dont_list": brand_profile.dont_list if brand_profile else [],
-            "legal_sensitivities": brand_profile.legal_sensitivities if brand_profile else None,
-            "visual_rules": brand_profile.visual_rules if brand_profile else {},
+            "brand_tone": brand_profile.get("brand_tone"),
+            "brand_values": brand_profile.get("brand_values") or [],
+            "key_messages": brand_profile.get("key_messages") or [],
+            "do_list": brand_profile.get("do_list") or [],
+            "dont_list": brand_profile.get("dont_list") or [],
+            "legal_sensitivities": brand_profile.get("legal_sensitivities"),
+            "visual_rules": brand_profile.get("visual_rules") or {},
         },
         "rules": [
             {
-                "id": str(r.id),
-                "description": r.description,
-                "rule_type": r.rule_type,
-                "applies_to": r.applies_to or [],
-                "priority": r.priority,
+                "id": r["id"],
+                "description": r["description"],
+                "rule_type": r["rule_type"],
+                "applies_to": r["applies_to"] or [],
+                "priority": r["priority"],
             }
-            for r in rules
+            for r in context.active_rules
         ],
         "patterns": [
             {
-                "id": str(p.id),
-                "name": p.name,
-                "description": p.description,
-                "scope": p.scope,
-                "category": p.category,
-                "trigger_conditions": p.trigger_conditions,
-                "recommended_actions": p.recommended_actions or [],
+                "id": p["id"],
+                "name": p["name"],
+                "description": p["description"],
+                "scope": p["scope"],
+                "category": p["category"],
+                "trigger_conditions": p["trigger_conditions"],
+                "recommended_actions": p["recommended_actions"] or [],
             }
-            for p in patterns
+            for p in context.patterns
         ],
     }
 
@@ -345,6 +327,7 @@ async def run_debug_session(
 
     await db.flush()
     await db.refresh(session)
+    record_kb_uses((entry["type"], entry["id"]) for entry in kb_entries_used)
     return session
 
 
@@ -834,64 +817,87 @@ async def get_stats(
     *,
     client_id: Optional[UUID] = None,
 ) -> dict:
-    """Compute aggregate debug statistics."""
-    base_filter = []
-    if client_id:
-        base_filter.append(DebugSession.client_id == client_id)
-
-    # Session counts
-    total_q = select(func.count(DebugSession.id)).where(*base_filter)
-    total = (await db.execute(total_q)).scalar() or 0
-
-    pass_q = select(func.count(DebugSession.id)).where(
-        DebugSession.overall_status == "pass", *base_filter
-    )
-    pass_count = (await db.execute(pass_q)).scalar() or 0
-
-    warn_q = select(func.count(DebugSession.id)).where(
-        DebugSession.overall_status == "warning", *base_filter
-    )
-    warning_count = (await db.execute(warn_q)).scalar() or 0
+    """Compute aggregate debug statistics in one statement.
 
-    fail_q = select(func.count(DebugSession.id)).where(
-        DebugSession.overall_status == "fail", *base_filter
+    Session and issue counts are ``COUNT(*) FILTER (...)`` aggregates over
+    one scan of each table; sessions per module are counted over the
+    unnested ``modules_invoked`` arrays and returned as one JSON object.
+    """
+    session_filter = []
+    issue_filter = []
+    if client_id:
+        session_filter.append(DebugSession.client_id == client_id)
+        issue_filter.append(DebugIssue.client_id == client_id)
+
+    sessions = (
+        select(
+            func.count().label("total_sessions"),
+            func.count().filter(DebugSession.overall_status == "pass").label("pass_count"),
+            func.count().filter(DebugSession.overall_status == "warning").label("warning_count"),
+            func.count().filter(DebugSession.overall_status == "fail").label("fail_count"),
+            func.avg(DebugSession.overall_score).label("avg_score"),
+        )
+        .where(*session_filter)
+        .cte("sessions")
     )
-    fail_count = (await db.execute(fail_q)).scalar() or 0
 
-    avg_q = select(func.avg(DebugSession.overall_score)).where(
-        DebugSession.overall_score.is_not(None), *base_filter
+    is_open = DebugIssue.resolution_status == "open"
+    issues = (
+        select(
+            func.count().label("total_issues"),
+            func.count().filter(is_open).label("open_issues"),
+            func.count().filter(is_open, DebugIssue.severity == "critical").label("critical_open"),
+            *(
+                func.count().filter(DebugIssue.severity == severity.value).label(severity.value)
+                for severity in IssueSeverity
+            ),
+        )
+        .where(*issue_filter)
+        .cte("issues")
     )
-    avg_score = (await db.execute(avg_q)).scalar()
 
-    # Issue counts
-    issue_base = []
-    if client_id:
-        issue_base.append(DebugIssue.client_id == client_id)
-
-    total_issues_q = select(func.count(DebugIssue.id)).where(*issue_base)
-    total_issues = (await db.execute(total_issues_q)).scalar() or 0
-
-    open_issues_q = select(func.count(DebugIssue.id)).where(
-        DebugIssue.resolution_status == "open", *issue_base
+    # Legacy rows may hold a non-array; the WHERE filter alone does not stop
+    # jsonb_array_elements from seeing them, so they are unnested as NULL
+    is_array = func.jsonb_typeof(DebugSession.modules_invoked) == "array"
+    entry = (
+        func.jsonb_array_elements(case((is_array, DebugSession.modules_invoked)))
+        .table_valued(column("value", JSONB))
+        .render_derived(name="entry")
     )
-    open_issues = (await db.execute(open_issues_q)).scalar() or 0
-
-    critical_open_q = select(func.count(DebugIssue.id)).where(
-        DebugIssue.resolution_status == "open",
-        DebugIssue.severity == "critical",
-        *issue_base,
+    module = entry.c.value["module"].astext
+    per_module = (
+        select(module.label("module"), func.count().label("sessions"))
+        .select_from(DebugSession)
+        .join(entry, true())
+        .where(is_array, module.isnot(None), *session_filter)
+        .group_by(module)
+        .subquery("per_module")
     )
-    critical_open = (await db.execute(critical_open_q)).scalar() or 0
+    sessions_by_module = select(
+        func.jsonb_object_agg(per_module.c.module, per_module.c.sessions, type_=JSONB)
+    ).scalar_subquery()
+
+    row = (
+        await db.execute(
+            select(
+                sessions,
+                issues,
+                sessions_by_module.label("sessions_by_module"),
+            ).select_from(sessions.join(issues, true()))
+        )
+    ).one()
 
     return {
-        "total_sessions": total,
-        "pass_count": pass_count,
-        "warning_count": warning_count,
-        "fail_count": fail_count,
-        "total_issues": total_issues,
-        "open_issues": open_issues,
-        "critical_open": critical_open,
-        "avg_score": round(float(avg_score), 1) if avg_score else None,
-        "sessions_by_module": {},
-        "issues_by_severity": {},
+        "total_sessions": row.total_sessions,
+        "pass_count": row.pass_count,
+        "warning_count": row.warning_count,
+        "fail_count": row.fail_count,
+        "total_issues": row.total_issues,
+        "open_issues": row.open_issues,
+        "critical_open": row.critical_open,
+        "avg_score": round(float(row.avg_score), 1) if row.avg_score else None,
+        "sessions_by_module": row.sessions_by_module or {},
+        "issues_by_severity": {
+            severity.value: row._mapping[severity.value] for severity in IssueSeverity
+        },
     }
@@ -1,7 +1,8 @@
 """
 FeedbackAnalyzer: uses the Anthropic Claude API with tool_use
 to extract structured sentiment, topics, severity and requirements
-from raw feedback text, and to suggest rules.
+from raw feedback text, and to suggest rules -- separately, or both in a
+single call with :meth:`FeedbackAnalyzer.analyze_and_suggest`.
 """
 
 from __future__ import annotations
@@ -134,6 +135,25 @@ _SUGGEST_RULES_TOOL = {
 }
 
 
+# Both tools' fields in one schema, for a single analyze + suggest call
+_ANALYZE_AND_SUGGEST_TOOL = {
+    "name": "feedback_analysis_with_rules",
+    "description": (
+        "Return structured analysis of the client feedback (sentiment, "
+        "sentiment score, topics, severity, extracted requirements) together "
+        "with client rules suggested from it."
+    ),
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            **_ANALYSIS_TOOL["input_schema"]["properties"],
+            "rules": _SUGGEST_RULES_TOOL["input_schema"]["properties"]["rules"],
+        },
+        "required": [*_ANALYSIS_TOOL["input_schema"]["required"], "rules"],
+    },
+}
+
+
 # ---------------------------------------------------------------------------
 # FeedbackAnalyzer
 # ---------------------------------------------------------------------------
@@ -161,6 +181,31 @@ class FeedbackAnalyzer:
         )
         return result
 
+    @staticmethod
+    async def analyze_and_suggest(
+        raw_text: str,
+    ) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        """Analyze feedback and suggest rules in one Claude call.
+
+        Returns ``(analysis, rules)``: the same analysis dict as
+        :meth:`analyze` and the same rule list as :meth:`suggest_rules`.
+        """
+        result = await chat_with_tools(
+            system=(
+                "You are an expert client feedback analyst for a creative agency. "
+                "Analyze the following feedback from a client -- be precise about "
+                "sentiment scoring and severity classification -- and, based on "
+                "the requirements you extract, suggest concrete rules the team "
+                "should follow when working with this client. Return both using "
+                "the feedback_analysis_with_rules tool. Suggest no rules if the "
+                "feedback contains nothing actionable."
+            ),
+            user_message=f"Analyze this client feedback:\n\n{raw_text}",
+            tools=[_ANALYZE_AND_SUGGEST_TOOL],
+        )
+        analysis = {k: v for k, v in result.items() if k != "rules"}
+        return analysis, result.get("rules") or []
+
     @staticmethod
     async def suggest_rules(
         raw_text: str,
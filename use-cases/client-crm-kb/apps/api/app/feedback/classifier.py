@@ -0,0 +1,301 @@
+"""
+Local pre-classifier for feedback analysis.
+
+Most pending feedback is short and unremarkable -- "thanks, looks great!"
+-- yet every item used to cost a Claude call.  :class:`FeedbackClassifier`
+is a CPU-only naive Bayes model trained on the feedback Claude has already
+analysed.  It has three heads: sentiment, severity, and whether Claude
+found any requirements in the text ("actionable").
+
+An item is classified locally only if all of the following hold:
+
+- the text is at most ``FEEDBACK_LOCAL_MAX_CHARS`` long;
+- every head is at least ``FEEDBACK_LOCAL_CONFIDENCE`` sure;
+- the item is predicted to be non-actionable;
+- the severity is info or minor.
+
+Everything else is escalated to :meth:`FeedbackAnalyzer.analyze`.  Local
+results carry no topics or extracted requirements.
+
+Each model is evaluated on a held-out fifth of its training data and only
+used if its accuracy on the items it would handle reaches
+``FEEDBACK_LOCAL_MIN_ACCURACY``.  In production, ``FEEDBACK_LOCAL_AUDIT_RATE``
+of the local decisions are also sent to Claude and compared, and the
+agreement is reported in the orchestration status next to the escalation
+rate and the estimated tokens saved.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import math
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import FeedbackEvent
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+|[!?]", re.UNICODE)
+
+# Severities the classifier may decide on its own
+_LOCAL_SEVERITIES = frozenset({"info", "minor"})
+
+# Every example whose id hashes to 0 mod this is held out for evaluation
+_HOLDOUT_EVERY = 5
+
+# Rough size of a FeedbackAnalyzer.analyze call without the feedback text
+# (system prompt, tool schema and tool output), for the savings estimate
+_ANALYSIS_OVERHEAD_TOKENS = 900
+
+
+def _features(text: str) -> set[str]:
+    """Distinct words and word bigrams (binarised naive Bayes)."""
+    words = _TOKEN_RE.findall(text.lower())
+    features = set(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return features
+
+
+def estimate_tokens_saved(text: str) -> int:
+    """Estimated tokens of the Claude analysis a local decision replaces."""
+    return _ANALYSIS_OVERHEAD_TOKENS + len(text) // 4
+
+
+# ---------------------------------------------------------------------------
+# Model
+# ---------------------------------------------------------------------------
+
+
+class _NaiveBayes:
+    """Multinomial naive Bayes over binary features with Laplace smoothing."""
+
+    __slots__ = ("docs", "label_docs", "feature_counts", "feature_totals", "vocab")
+
+    def __init__(self) -> None:
+        self.docs = 0
+        self.label_docs: Counter[str] = Counter()
+        self.feature_counts: dict[str, Counter[str]] = defaultdict(Counter)
+        self.feature_totals: Counter[str] = Counter()
+        self.vocab: set[str] = set()
+
+    def add(self, features: set[str], label: str) -> None:
+        self.docs += 1
+        self.label_docs[label] += 1
+        self.feature_counts[label].update(features)
+        self.feature_totals[label] += len(features)
+        self.vocab.update(features)
+
+    def predict(self, features: set[str]) -> tuple[Optional[str], float]:
+        """Most likely label and its posterior probability."""
+        if not self.docs:
+            return None, 0.0
+        known = features & self.vocab
+        vocab_size = len(self.vocab)
+        scores = {}
+        for label, docs in self.label_docs.items():
+            counts = self.feature_counts[label]
+            denominator = math.log(self.feature_totals[label] + vocab_size)
+            scores[label] = math.log(docs / self.docs) + sum(
+                math.log(counts[f] + 1) - denominator for f in known
+            )
+        best = max(scores, key=scores.__getitem__)
+        total = sum(math.exp(s - scores[best]) for s in scores.values())
+        return best, 1.0 / total
+
+
+def _is_actionable(analysis: dict[str, Any]) -> bool:
+    requirements = analysis.get("extracted_requirements") or {}
+    return any(requirements.get(key) for key in ("explicit", "implicit", "constraints"))
+
+
+class FeedbackClassifier:
+    """Trained sentiment/severity/actionable heads and their evaluation."""
+
+    __slots__ = (
+        "sentiment", "severity", "actionable", "sentiment_scores",
+        "trained_on", "trained_at", "holdout_accuracy", "holdout_coverage",
+    )
+
+    def __init__(self) -> None:
+        self.sentiment = _NaiveBayes()
+        self.severity = _NaiveBayes()
+        self.actionable = _NaiveBayes()
+        # sentiment -> mean Claude sentiment_score
+        self.sentiment_scores: dict[str, int] = {}
+        self.trained_on = 0
+        self.trained_at = 0.0
+        self.holdout_accuracy: Optional[float] = None
+        self.holdout_coverage: Optional[float] = None
+
+    @property
+    def usable(self) -> bool:
+        return (
+            self.holdout_accuracy is not None
+            and self.holdout_accuracy >= settings.FEEDBACK_LOCAL_MIN_ACCURACY
+        )
+
+    def predict(self, text: str) -> Optional[dict[str, Any]]:
+        """Analysis of ``text`` if the model is confident, else None."""
+        if len(text) > settings.FEEDBACK_LOCAL_MAX_CHARS:
+            return None
+        features = _features(text)
+        if not features:
+            return None
+        threshold = settings.FEEDBACK_LOCAL_CONFIDENCE
+        actionable, p_actionable = self.actionable.predict(features)
+        if actionable != "no" or p_actionable < threshold:
+            return None
+        severity, p_severity = self.severity.predict(features)
+        if severity not in _LOCAL_SEVERITIES or p_severity < threshold:
+            return None
+        sentiment, p_sentiment = self.sentiment.predict(features)
+        if sentiment is None or p_sentiment < threshold:
+            return None
+        return {
+            "sentiment": sentiment,
+            "sentiment_score": self.sentiment_scores.get(sentiment, 0),
+            "topics": [],
+            "severity": severity,
+            "extracted_requirements": {"explicit": [], "implicit": [], "constraints": []},
+        }
+
+    def classify(self, text: str) -> Optional[dict[str, Any]]:
+        """Like :meth:`predict`, but None unless the model passed evaluation."""
+        return self.predict(text) if self.usable else None
+
+
+def train(examples: Iterable[tuple[str, str, dict[str, Any]]]) -> FeedbackClassifier:
+    """Train on ``(id, text, Claude analysis)`` triples; evaluate on a
+    deterministic held-out fifth."""
+    model = FeedbackClassifier()
+    holdout: list[tuple[str, dict[str, Any]]] = []
+    scores: dict[str, list[int]] = defaultdict(list)
+    for example_id, text, analysis in examples:
+        digest = hashlib.blake2b(example_id.encode(), digest_size=4).digest()
+        if int.from_bytes(digest, "little") % _HOLDOUT_EVERY == 0:
+            holdout.append((text, analysis))
+            continue
+        features = _features(text)
+        model.sentiment.add(features, analysis["sentiment"])
+        model.severity.add(features, analysis.get("severity") or "info")
+        model.actionable.add(features, "yes" if _is_actionable(analysis) else "no")
+        if analysis.get("sentiment_score") is not None:
+            scores[analysis["sentiment"]].append(analysis["sentiment_score"])
+        model.trained_on += 1
+    model.sentiment_scores = {s: round(sum(v) / len(v)) for s, v in scores.items()}
+
+    handled = correct = 0
+    for text, analysis in holdout:
+        predicted = model.predict(text)
+        if predicted is None:
+            continue
+        handled += 1
+        correct += agrees(predicted, analysis)
+    if handled:
+        model.holdout_accuracy = correct / handled
+    model.holdout_coverage = handled / len(holdout) if holdout else None
+    model.trained_at = time.monotonic()
+    return model
+
+
+def agrees(local: dict[str, Any], claude: dict[str, Any]) -> bool:
+    """True if a local decision matches Claude's on every decided field."""
+    return (
+        local["sentiment"] == claude.get("sentiment")
+        and local["severity"] == (claude.get("severity") or "info")
+        and not _is_actionable(claude)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Process-level model
+# ---------------------------------------------------------------------------
+
+_model: Optional[FeedbackClassifier] = None
+_lock = asyncio.Lock()
+
+
+async def _load_examples(db: AsyncSession) -> list[tuple[str, str, dict[str, Any]]]:
+    """Claude-labelled feedback (never the classifier's own decisions)."""
+    rows = (
+        await db.execute(
+            select(
+                FeedbackEvent.id,
+                FeedbackEvent.raw_text,
+                FeedbackEvent.sentiment,
+                FeedbackEvent.sentiment_score,
+                FeedbackEvent.severity,
+                FeedbackEvent.extracted_requirements,
+            )
+            .where(
+                FeedbackEvent.sentiment.isnot(None),
+                FeedbackEvent.analysis_source.is_distinct_from("local"),
+                func.length(FeedbackEvent.raw_text) <= settings.FEEDBACK_LOCAL_MAX_CHARS * 4,
+            )
+            .order_by(FeedbackEvent.created_at.desc())
+            .limit(settings.FEEDBACK_LOCAL_TRAINING_LIMIT)
+        )
+    ).all()
+    return [
+        (
+            str(row.id),
+            row.raw_text,
+            {
+                "sentiment": row.sentiment,
+                "sentiment_score": row.sentiment_score,
+                "severity": row.severity,
+                "extracted_requirements": row.extracted_requirements,
+            },
+        )
+        for row in rows
+    ]
+
+
+def _stale() -> bool:
+    return (
+        _model is None
+        or time.monotonic() - _model.trained_at >= settings.FEEDBACK_LOCAL_RETRAIN_SECONDS
+    )
+
+
+async def get_classifier(db: AsyncSession) -> Optional[FeedbackClassifier]:
+    """Return the current model, retraining it when it is older than
+    ``FEEDBACK_LOCAL_RETRAIN_SECONDS``.  None if the classifier is disabled
+    or there are too few labelled examples to train on."""
+    global _model
+    if not settings.FEEDBACK_LOCAL_CLASSIFIER_ENABLED:
+        return None
+    if _stale():
+        async with _lock:
+            if _stale():
+                _model = await _retrain(db)
+    return _model if _model.trained_on else None
+
+
+async def _retrain(db: AsyncSession) -> FeedbackClassifier:
+    examples = await _load_examples(db)
+    if len(examples) < settings.FEEDBACK_LOCAL_MIN_EXAMPLES:
+        logger.info(
+            f"Local feedback classifier: {len(examples)} labelled examples, "
+            f"need {settings.FEEDBACK_LOCAL_MIN_EXAMPLES}; escalating everything"
+        )
+        # An empty model; checked again after the retrain interval
+        model = FeedbackClassifier()
+        model.trained_at = time.monotonic()
+        return model
+    model = await asyncio.to_thread(train, examples)
+    logger.info(
+        f"Local feedback classifier trained on {model.trained_on} examples: "
+        f"holdout accuracy {model.holdout_accuracy}, "
+        f"coverage {model.holdout_coverage}, usable={model.usable}"
+    )
+    return model
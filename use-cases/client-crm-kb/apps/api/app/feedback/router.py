@@ -16,6 +16,8 @@ from app.dependencies import get_current_user
 from app.feedback.schemas import (
     AnalysisResponse,
     AnalysisResult,
+    BulkAnalysisRequest,
+    BulkAnalysisResponse,
     FeedbackCreate,
     FeedbackListResponse,
     FeedbackResponse,
@@ -26,6 +28,7 @@ from app.feedback.schemas import (
 )
 from app.feedback.service import (
     analyze_feedback,
+    analyze_pending_feedback,
     create_feedback,
     delete_feedback,
     get_analysis,
@@ -96,6 +99,23 @@ async def list_feedback_endpoint(
     )
 
 
+@router.post(
+    "/api/feedback/analyze-pending",
+    response_model=BulkAnalysisResponse,
+)
+async def analyze_pending_endpoint(
+    body: BulkAnalysisRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Analyze up to ``limit`` feedback items that have no analysis yet.
+    Safe to call concurrently: each call claims different items."""
+    result = await analyze_pending_feedback(
+        db, limit=body.limit, client_id=body.client_id
+    )
+    return BulkAnalysisResponse(**result)
+
+
 @router.get(
     "/api/feedback/{feedback_id}",
     response_model=FeedbackResponse,
@@ -54,6 +54,7 @@ class FeedbackResponse(BaseModel):
     topics: Optional[list[str]] = None
     severity: Optional[str] = None
     extracted_requirements: Optional[dict] = None
+    analysis_source: Optional[str] = None
     status: str
     processed_by: Optional[UUID] = None
     processed_at: Optional[datetime] = None
@@ -87,6 +88,24 @@ class AnalysisResponse(BaseModel):
     analysis: AnalysisResult
 
 
+class BulkAnalysisRequest(BaseModel):
+    limit: Optional[int] = Field(
+        default=None, ge=1, le=200, description="Defaults to FEEDBACK_ANALYSIS_BATCH_SIZE."
+    )
+    client_id: Optional[UUID] = None
+
+
+class BulkAnalysisResponse(BaseModel):
+    claimed_count: int = Field(description="Pending items claimed by this run.")
+    analyzed_count: int
+    local_count: int = Field(
+        default=0, description="Analyzed by the local pre-classifier instead of Claude."
+    )
+    failed_count: int = Field(description="Claimed items left pending for a later run.")
+    budget_exceeded: bool = False
+    errors: list[str] = []
+
+
 # ---------------------------------------------------------------------------
 # Rule Suggestions
 # ---------------------------------------------------------------------------
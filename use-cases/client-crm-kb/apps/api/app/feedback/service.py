@@ -4,17 +4,26 @@ Business logic for FeedbackEvent CRUD and AI analysis orchestration.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
 from datetime import date, datetime, timezone
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.database import async_session_factory
 from app.feedback.analyzer import FeedbackAnalyzer
+from app.feedback.classifier import agrees, estimate_tokens_saved, get_classifier
+from app.health.service import feedback_changed, feedback_snapshot
 from app.models import Client, FeedbackEvent
+from app.orchestration.engine import OrchestrationEngine
+from app.orchestration.usage import current_scope
+from app.utils.ai import AIBudgetExceededError
 
 logger = logging.getLogger(__name__)
 
@@ -60,6 +69,7 @@ async def create_feedback(db: AsyncSession, data: dict) -> FeedbackEvent:
     feedback = FeedbackEvent(**data)
     db.add(feedback)
     await db.flush()
+    await feedback_changed(db, [(feedback.client_id, None, feedback_snapshot(feedback))])
     await db.refresh(feedback)
     return feedback
 
@@ -117,18 +127,25 @@ async def update_feedback(
     db: AsyncSession, feedback_id: UUID, data: dict
 ) -> FeedbackEvent:
     feedback = await _get_feedback_or_404(db, feedback_id)
+    before = feedback_snapshot(feedback)
+    if data.get("raw_text") not in (None, feedback.raw_text):
+        # Cached suggestions were made for the old text
+        feedback.suggested_rules = None
     for field, value in data.items():
         if value is not None:
             setattr(feedback, field, value)
     await db.flush()
+    await feedback_changed(db, [(feedback.client_id, before, feedback_snapshot(feedback))])
     await db.refresh(feedback)
     return feedback
 
 
 async def delete_feedback(db: AsyncSession, feedback_id: UUID) -> None:
     feedback = await _get_feedback_or_404(db, feedback_id)
+    change = (feedback.client_id, feedback_snapshot(feedback), None)
     await db.delete(feedback)
     await db.flush()
+    await feedback_changed(db, [change])
 
 
 # ---------------------------------------------------------------------------
@@ -139,22 +156,172 @@ async def delete_feedback(db: AsyncSession, feedback_id: UUID) -> None:
 async def analyze_feedback(
     db: AsyncSession, feedback_id: UUID
 ) -> dict:
-    """Run AI analysis on a feedback event and persist results."""
+    """Run AI analysis on a feedback event and persist results.
+
+    Rule suggestions come back from the same Claude call and are cached on
+    the event for :func:`get_suggested_rules`.
+    """
     feedback = await _get_feedback_or_404(db, feedback_id)
+    before = feedback_snapshot(feedback)
 
-    analysis = await FeedbackAnalyzer.analyze(feedback.raw_text)
+    analysis, rules = await FeedbackAnalyzer.analyze_and_suggest(feedback.raw_text)
 
     feedback.sentiment = analysis.get("sentiment")
     feedback.sentiment_score = analysis.get("sentiment_score")
     feedback.topics = analysis.get("topics")
     feedback.severity = analysis.get("severity")
     feedback.extracted_requirements = analysis.get("extracted_requirements")
+    feedback.analysis_source = "claude"
+    feedback.suggested_rules = rules
 
     await db.flush()
+    await feedback_changed(db, [(feedback.client_id, before, feedback_snapshot(feedback))])
     await db.refresh(feedback)
     return analysis
 
 
+_ANALYSIS_FIELDS = (
+    "sentiment",
+    "sentiment_score",
+    "topics",
+    "severity",
+    "extracted_requirements",
+)
+
+# Claimed-row columns matching feedback_snapshot()
+_SNAPSHOT_FIELDS = ("date", "sentiment", "severity", "status")
+
+
+async def analyze_pending_feedback(
+    db: AsyncSession,
+    *,
+    limit: Optional[int] = None,
+    client_id: Optional[UUID] = None,
+) -> dict[str, Any]:
+    """Analyze up to ``limit`` pending feedback events (no sentiment yet).
+
+    The oldest pending rows are claimed with ``FOR UPDATE SKIP LOCKED``, so
+    concurrent runs (several workers, or the API and the scheduler) each
+    get different rows; the locks are held until the caller's transaction
+    ends.  Items the local pre-classifier is confident about are decided
+    without Claude; the rest are analysed with bounded concurrency, with
+    rule suggestions from the same call cached as in
+    :func:`analyze_feedback`.  The results are written with one bulk
+    UPDATE.  Failed items stay pending for the next run.
+    """
+    stmt = (
+        select(
+            FeedbackEvent.id,
+            FeedbackEvent.client_id,
+            FeedbackEvent.raw_text,
+            FeedbackEvent.date,
+            FeedbackEvent.sentiment,
+            FeedbackEvent.severity,
+            FeedbackEvent.status,
+        )
+        .where(FeedbackEvent.sentiment.is_(None))
+        .order_by(FeedbackEvent.created_at)
+        .limit(limit or settings.FEEDBACK_ANALYSIS_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    if client_id:
+        stmt = stmt.where(FeedbackEvent.client_id == client_id)
+    rows = (await db.execute(stmt)).all()
+
+    classifier = await get_classifier(db) if rows else None
+    engine = OrchestrationEngine.get_instance()
+    semaphore = asyncio.Semaphore(settings.FEEDBACK_ANALYSIS_CONCURRENCY)
+
+    async def _analyze(
+        raw_text: str,
+    ) -> tuple[dict[str, Any], str, Optional[list[dict[str, Any]]]]:
+        local = classifier.classify(raw_text) if classifier else None
+        if local is not None and random.random() >= settings.FEEDBACK_LOCAL_AUDIT_RATE:
+            saved = estimate_tokens_saved(raw_text)
+            scope = current_scope()
+            if scope is not None:
+                scope.tokens_saved += saved
+            await engine.record_local_classification(escalated=False, tokens_saved=saved)
+            return local, "local", None
+
+        async with semaphore:
+            analysis, rules = await FeedbackAnalyzer.analyze_and_suggest(raw_text)
+        if classifier is not None:
+            # Escalated, or a local decision audited against Claude
+            await engine.record_local_classification(
+                escalated=local is None,
+                agreed=None if local is None else agrees(local, analysis),
+            )
+        return analysis, "claude", rules
+
+    results = await asyncio.gather(
+        *(_analyze(row.raw_text) for row in rows), return_exceptions=True
+    )
+
+    updates: list[dict[str, Any]] = []
+    changes: list[tuple] = []
+    errors: list[str] = []
+    budget_exceeded = False
+    local_count = 0
+    for row, result in zip(rows, results):
+        if isinstance(result, AIBudgetExceededError):
+            budget_exceeded = True
+        elif isinstance(result, BaseException):
+            logger.error(f"Analysis of feedback {row.id} failed: {result}")
+            errors.append(f"Feedback {row.id}: {result}")
+        else:
+            analysis, source, rules = result
+            values = {
+                "id": row.id,
+                "analysis_source": source,
+                **{field: analysis.get(field) for field in _ANALYSIS_FIELDS},
+            }
+            if source == "local":
+                local_count += 1
+            else:
+                values["suggested_rules"] = rules
+            updates.append(values)
+            before = {field: getattr(row, field) for field in _SNAPSHOT_FIELDS}
+            after = {**before, "sentiment": analysis.get("sentiment"), "severity": analysis.get("severity")}
+            changes.append((row.client_id, before, after))
+
+    if updates:
+        # ORM bulk UPDATE by primary key: one executemany round trip
+        await db.execute(update(FeedbackEvent), updates)
+        await feedback_changed(db, changes)
+
+    return {
+        "claimed_count": len(rows),
+        "analyzed_count": len(updates),
+        "local_count": local_count,
+        "failed_count": len(rows) - len(updates),
+        "budget_exceeded": budget_exceeded,
+        "errors": errors,
+    }
+
+
+async def run_analysis_job(client_id: Optional[UUID] = None) -> dict[str, Any]:
+    """Background-job entry point: analyze pending feedback batch by batch,
+    committing (and releasing the row locks) after each, until none is
+    left, the budget blocks further calls or a batch makes no progress."""
+    totals = {"claimed_count": 0, "analyzed_count": 0, "local_count": 0, "failed_count": 0}
+    errors: list[str] = []
+    while True:
+        async with async_session_factory() as db:
+            result = await analyze_pending_feedback(db, client_id=client_id)
+            await db.commit()
+        for key in totals:
+            totals[key] += result[key]
+        errors.extend(result["errors"])
+        if (
+            result["claimed_count"] < settings.FEEDBACK_ANALYSIS_BATCH_SIZE
+            or result["budget_exceeded"]
+            or not result["analyzed_count"]
+        ):
+            break
+    return {**totals, "budget_exceeded": result["budget_exceeded"], "errors": errors}
+
+
 async def get_analysis(db: AsyncSession, feedback_id: UUID) -> dict:
     """Return persisted analysis for a feedback event."""
     feedback = await _get_feedback_or_404(db, feedback_id)
@@ -173,28 +340,29 @@ async def get_analysis(db: AsyncSession, feedback_id: UUID) -> dict:
 
 
 async def suggest_rules(db: AsyncSession, feedback_id: UUID) -> list[dict]:
-    """Use AI to suggest rules from feedback. Analysis must exist."""
+    """Use AI to (re)generate rule suggestions from feedback and cache them."""
     feedback = await _get_feedback_or_404(db, feedback_id)
     suggestions = await FeedbackAnalyzer.suggest_rules(
         raw_text=feedback.raw_text,
         extracted_requirements=feedback.extracted_requirements,
     )
+    feedback.suggested_rules = suggestions
+    await db.flush()
     return suggestions
 
 
 async def get_suggested_rules(db: AsyncSession, feedback_id: UUID) -> list[dict]:
-    """Generate rule suggestions on the fly (no persistence)."""
+    """Return the cached rule suggestions, generating them once for
+    feedback analysed before suggestions were cached."""
     feedback = await _get_feedback_or_404(db, feedback_id)
+    if feedback.suggested_rules is not None:
+        return feedback.suggested_rules
     if feedback.extracted_requirements is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No analysis available. Trigger analysis first.",
         )
-    suggestions = await FeedbackAnalyzer.suggest_rules(
-        raw_text=feedback.raw_text,
-        extracted_requirements=feedback.extracted_requirements,
-    )
-    return suggestions
+    return await suggest_rules(db, feedback_id)
 
 
 async def mark_processed(
@@ -205,11 +373,13 @@ async def mark_processed(
 ) -> FeedbackEvent:
     """Mark a feedback event as reviewed/processed."""
     feedback = await _get_feedback_or_404(db, feedback_id)
+    before = feedback_snapshot(feedback)
     feedback.status = "reviewed"
     feedback.processed_by = user_id
     feedback.processed_at = datetime.now(timezone.utc)
     if processing_notes is not None:
         feedback.processing_notes = processing_notes
     await db.flush()
+    await feedback_changed(db, [(feedback.client_id, before, feedback_snapshot(feedback))])
     await db.refresh(feedback)
     return feedback
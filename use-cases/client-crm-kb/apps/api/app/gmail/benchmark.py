@@ -0,0 +1,169 @@
+"""
+Benchmark Gmail fetching and ingestion against the local fake Gmail server.
+
+Fetch: the old fetch (one blocking ``messages.get(format=full)`` per
+message) against the batched one used by the sync -- ``format=metadata``
+for every message in batch requests, then ``format=full`` only for
+messages from known contacts -- including how long the event loop is
+blocked during each, measured with a ticker task.
+
+Ingest: fetch, match and analyze one message after another (the old
+sync) against the staged pipeline, with Claude replaced by a fixed
+``--analysis-ms`` delay and the database write left out.
+
+Usage::
+
+    python -m app.gmail.benchmark --messages 500 --latency-ms 50 --analysis-ms 800
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from google.oauth2.credentials import Credentials
+
+from app.config import settings
+from app.gmail import service as gmail_service
+from app.gmail.contacts import ContactIndex
+from app.gmail.extract import extract_text
+from app.gmail.fake_server import FakeGmail
+from app.gmail.pipeline import Pipeline
+from app.gmail.service import (
+    _fetch_messages,
+    _gmail_service,
+    _Ingest,
+    _parse_headers,
+)
+
+
+async def _measure(fn: Callable[[], Awaitable[int]]) -> tuple[float, float, int]:
+    """Run ``fn``; return (seconds, longest event-loop stall in ms, messages)."""
+    stalls = [0.0]
+    done = asyncio.Event()
+
+    async def _ticker() -> None:
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stalls[0] = max(stalls[0], (now - last - 0.005) * 1000)
+            last = now
+
+    ticker = asyncio.create_task(_ticker())
+    await asyncio.sleep(0)  # let the ticker start
+    started = time.perf_counter()
+    count = await fn()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticker
+    return elapsed, stalls[0], count
+
+
+async def _ingest(
+    service, creds, ids: list[str], contacts: dict[str, object], analysis_ms: float
+) -> None:
+    async def _analyze_email(**kwargs) -> dict:
+        await asyncio.sleep(analysis_ms / 1000)
+        return {"sentiment": "neutral", "topics": []}
+
+    gmail_service._analyze_email = _analyze_email
+
+    async def sequential() -> int:
+        count = 0
+        for message_id in ids:
+            msg = service.users().messages().get(
+                userId="me", id=message_id, format="full"
+            ).execute()
+            _, _, sender, _ = _parse_headers(msg)
+            body = extract_text(msg["payload"], settings.GMAIL_BODY_MAX_CHARS)
+            if sender in contacts and body.strip():
+                await _analyze_email(subject="", body=body)
+            count += 1
+        return count
+
+    async def pipelined() -> int:
+        ingest = _Ingest(None, service, creds, None, ContactIndex(0, contacts, {}, {}, {}))
+        written = [0]
+
+        async def persist(emails) -> None:
+            written[0] += len(emails)
+
+        pipeline = Pipeline(settings.GMAIL_PIPELINE_QUEUE_SIZE)
+        for stage in ingest.pipeline().stages[:-1]:
+            pipeline.add_stage(
+                stage.name, stage.fn, workers=stage.workers, batch_size=stage.batch_size
+            )
+        pipeline.add_stage("persist", persist, batch_size=100)
+        await pipeline.run(ids)
+        for m in pipeline.metrics():
+            print(
+                f"  {m['name']:<11}{m['processed']:>6} items {m['throughput_per_second']:>9}/s"
+                f"  busy {m['busy_seconds']:>7.2f}s  max queue {m['max_queue_depth']:>4}"
+            )
+        return written[0]
+
+    print(f"{'ingest':<12}{'seconds':>10}{'max stall ms':>15}")
+    for name, fn in (("sequential", sequential), ("pipelined", pipelined)):
+        elapsed, stall, _ = await _measure(fn)
+        print(f"{name:<12}{elapsed:>10.2f}{stall:>15.0f}")
+
+
+async def run(
+    messages: int, latency_ms: float, contact_every: int, analysis_ms: float
+) -> None:
+    with FakeGmail(messages, latency_ms=latency_ms, contact_every=contact_every) as fake:
+        settings.GMAIL_API_ENDPOINT = fake.endpoint
+        creds = Credentials(token="fake")
+        service = _gmail_service(creds)
+        ids = list(fake.messages)
+        contacts = set(fake.contact_emails())
+
+        async def sequential() -> int:
+            for message_id in ids:
+                service.users().messages().get(
+                    userId="me", id=message_id, format="full"
+                ).execute()
+            return len(ids)
+
+        async def batched() -> int:
+            metadata = await _fetch_messages(service, creds, ids, "metadata")
+            known = [
+                message_id
+                for message_id, msg in metadata.items()
+                if isinstance(msg, dict) and _parse_headers(msg)[2] in contacts
+            ]
+            bodies = await _fetch_messages(service, creds, known, "full")
+            return sum(isinstance(m, dict) for m in bodies.values())
+
+        print(
+            f"{messages} messages, {latency_ms:.0f} ms per round trip, "
+            f"{len(contacts)} from known contacts"
+        )
+        print(f"{'fetch':<12}{'seconds':>10}{'max stall ms':>15}{'round trips':>13}")
+        for name, fn in (("sequential", sequential), ("batched", batched)):
+            before = fake.requests
+            elapsed, stall, _ = await _measure(fn)
+            print(f"{name:<12}{elapsed:>10.2f}{stall:>15.0f}{fake.requests - before:>13}")
+
+        print()
+        client_id = object()
+        await _ingest(service, creds, ids, {c: client_id for c in contacts}, analysis_ms)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--contact-every", type=int, default=5)
+    parser.add_argument("--analysis-ms", type=float, default=800.0)
+    args = parser.parse_args()
+    asyncio.run(
+        run(args.messages, args.latency_ms, args.contact_every, args.analysis_ms)
+    )
+
+
+if __name__ == "__main__":
+    main()
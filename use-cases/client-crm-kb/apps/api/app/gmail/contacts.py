@@ -0,0 +1,212 @@
+"""
+Process-level index of client contacts for matching email senders.
+
+The Gmail sync maps every sender to a client.  :func:`get_contact_index`
+builds the lookup tables once -- contact emails, client domains, client
+names and active projects -- and keeps them in process until a contact,
+client or project changes.  Changes are detected through the
+``contact_index_version`` sequence, which database triggers advance (at
+commit) when a column the index reads changes, so each sync costs a
+single sequence read while nothing has changed.  A sequence takes no row
+lock, so CRM writes are not serialised on the version.  An index is also
+rebuilt after ``GMAIL_CONTACT_INDEX_MAX_AGE_SECONDS``, covering a rebuild
+that raced a commit.
+
+A sender matches on its exact address first, then on its domain (or a
+parent domain): any ``@client.com`` sender belongs to the client whose
+website is ``client.com``, or whose contacts use ``client.com``
+addresses.  Public mail providers and domains shared by several clients
+are never matched by domain.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+from urllib.parse import urlparse
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Client, Contact, Project
+
+logger = logging.getLogger(__name__)
+
+# Sequence advanced by the contacts/clients/projects triggers
+_VERSION_SQL = text("SELECT last_value FROM contact_index_version")
+
+# Projects passed to the analysis as context
+_ACTIVE_PROJECT_STATUSES = ("planning", "in_progress")
+
+# Mail providers whose addresses say nothing about the sender's company
+_PUBLIC_DOMAINS = frozenset({
+    "gmail.com", "googlemail.com", "outlook.com", "hotmail.com", "live.com",
+    "msn.com", "yahoo.com", "yahoo.com.hk", "ymail.com", "icloud.com", "me.com",
+    "mac.com", "aol.com", "proton.me", "protonmail.com", "gmx.com", "gmx.net",
+    "mail.com", "qq.com", "163.com", "126.com", "sina.com", "naver.com",
+    "yandex.com", "zoho.com",
+})
+
+
+def _email_domain(email: str) -> Optional[str]:
+    _, at, domain = email.rpartition("@")
+    if not at:
+        return None
+    return domain.strip().lower().rstrip(".") or None
+
+
+def _website_domain(url: str) -> Optional[str]:
+    url = url.strip().lower()
+    if "//" not in url:
+        url = "//" + url
+    host = urlparse(url).hostname
+    if not host or "." not in host:
+        return None
+    return host[4:] if host.startswith("www.") else host
+
+
+class ContactIndex:
+    """Sender lookup tables.  Shared between syncs -- treat as read-only."""
+
+    __slots__ = (
+        "version", "built_at", "by_email", "by_domain", "client_names",
+        "client_projects",
+    )
+
+    def __init__(
+        self,
+        version: int,
+        by_email: dict[str, UUID],
+        by_domain: dict[str, UUID],
+        client_names: dict[UUID, str],
+        client_projects: dict[UUID, list[dict[str, Any]]],
+    ) -> None:
+        self.version = version
+        self.built_at = time.monotonic()
+        self.by_email = by_email
+        self.by_domain = by_domain
+        self.client_names = client_names
+        self.client_projects = client_projects
+
+    def match(self, sender_email: str) -> Optional[UUID]:
+        """Client of ``sender_email``: by exact address, then by domain."""
+        email = sender_email.strip().lower()
+        client_id = self.by_email.get(email)
+        if client_id is not None or not self.by_domain:
+            return client_id
+        domain = _email_domain(email)
+        # mail.client.com -> client.com
+        while domain and "." in domain:
+            client_id = self.by_domain.get(domain)
+            if client_id is not None:
+                return client_id
+            domain = domain.split(".", 1)[1]
+        return None
+
+
+async def _build(db: AsyncSession, version: int) -> ContactIndex:
+    clients = {
+        row.id: row
+        for row in (
+            await db.execute(
+                select(Client.id, Client.name, Client.website_url).where(
+                    Client.deleted_at.is_(None)
+                )
+            )
+        ).all()
+    }
+    client_names = {client_id: row.name for client_id, row in clients.items()}
+
+    by_email: dict[str, UUID] = {}
+    contact_domains: dict[str, set[UUID]] = {}
+    contact_rows = (
+        await db.execute(
+            select(Contact.email, Contact.client_id).where(
+                Contact.email.isnot(None), Contact.deleted_at.is_(None)
+            )
+        )
+    ).all()
+    for row in contact_rows:
+        if row.client_id not in clients:
+            continue
+        email = row.email.strip().lower()
+        if not email:
+            continue
+        by_email[email] = row.client_id
+        domain = _email_domain(email)
+        if domain:
+            contact_domains.setdefault(domain, set()).add(row.client_id)
+
+    by_domain: dict[str, UUID] = {}
+    if settings.GMAIL_DOMAIN_MATCHING:
+        # A client's website is authoritative for its domain; contact
+        # addresses fill in the rest.  Ambiguous domains are left out.
+        website_domains: dict[str, set[UUID]] = {}
+        for client_id, row in clients.items():
+            domain = _website_domain(row.website_url or "")
+            if domain:
+                website_domains.setdefault(domain, set()).add(client_id)
+        skipped = set(_PUBLIC_DOMAINS)
+        for source in (website_domains, contact_domains):
+            for domain, owners in source.items():
+                if domain in skipped:
+                    continue
+                skipped.add(domain)
+                if len(owners) == 1:
+                    by_domain[domain] = next(iter(owners))
+
+    client_projects: dict[UUID, list[dict[str, Any]]] = {}
+    project_rows = (
+        await db.execute(
+            select(Project.id, Project.client_id, Project.name, Project.status).where(
+                Project.status.in_(_ACTIVE_PROJECT_STATUSES)
+            )
+        )
+    ).all()
+    for p in project_rows:
+        client_projects.setdefault(p.client_id, []).append(
+            {"id": str(p.id), "name": p.name, "status": p.status}
+        )
+
+    return ContactIndex(version, by_email, by_domain, client_names, client_projects)
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+_index: Optional[ContactIndex] = None
+_lock = asyncio.Lock()
+
+
+def _is_current(index: Optional[ContactIndex], version: int) -> bool:
+    return (
+        index is not None
+        and index.version == version
+        and time.monotonic() - index.built_at < settings.GMAIL_CONTACT_INDEX_MAX_AGE_SECONDS
+    )
+
+
+async def get_contact_index(db: AsyncSession) -> ContactIndex:
+    """Return the contact index, rebuilding it only if its data changed."""
+    global _index
+    version = (await db.execute(_VERSION_SQL)).scalar_one()
+    if _is_current(_index, version):
+        return _index
+
+    async with _lock:
+        # Another sync may have rebuilt it while we waited
+        if not _is_current(_index, version):
+            _index = await _build(db, version)
+            logger.info(
+                "Built contact index v%d: %d emails, %d domains",
+                version,
+                len(_index.by_email),
+                len(_index.by_domain),
+            )
+    return _index
+
@@ -0,0 +1,277 @@
+"""
+Streaming plain-text extraction from Gmail message payloads.
+
+Picks the best body part (``text/plain``, else ``text/html``) and decodes
+it incrementally -- base64url in small chunks, UTF-8 through an
+incremental decoder, HTML through :class:`html.parser.HTMLParser` -- into
+a line-based sink that stops as soon as it has ``max_chars`` characters.
+A huge newsletter therefore costs about as much as a short email.
+
+On the way, the sink drops what the analysis does not need:
+
+- ``script``/``style``/``head`` content and HTML quote blocks
+  (``blockquote``, Gmail's ``gmail_quote``, signature ``div``\\s);
+- ``>``-quoted lines and their "On ... wrote:" headers;
+- everything after a forwarded/original-message header or a signature
+  delimiter ("-- ", "Sent from my ...").
+"""
+
+from __future__ import annotations
+
+import base64
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Any, Optional
+
+# Base64 characters decoded per step (a multiple of 4)
+_B64_CHUNK = 16 * 1024
+
+_WHITESPACE_RE = re.compile(r"[ \t\r\f\v\u00a0]+")
+_REPLY_HEADER_RE = re.compile(
+    r"^(On|Le|Am|El) .{0,200}(wrote|a écrit|schrieb|escribió):$"
+)
+_ORIGINAL_MESSAGE_RE = re.compile(
+    r"^-{2,}\s*(Original Message|Forwarded message)\s*-{2,}$", re.IGNORECASE
+)
+_OUTLOOK_FROM_RE = re.compile(r"^From:\s")
+_OUTLOOK_HEADER_RE = re.compile(r"^(Sent|Date|To|Subject):\s")
+_CHARSET_RE = re.compile(r'charset="?([\w.:-]+)', re.IGNORECASE)
+_SIGNATURE_RE = re.compile(
+    r"^(--|__+|Sent from my \w+.*|Get Outlook for \w+.*|Sent from Outlook.*)$",
+    re.IGNORECASE,
+)
+
+
+class _Done(Exception):
+    """Raised by the sink to stop decoding."""
+
+
+# ---------------------------------------------------------------------------
+# Text sink
+# ---------------------------------------------------------------------------
+
+
+class _TextSink:
+    """Collects text line by line, dropping quotes and stopping at the
+    first quoted-thread header or signature, or at ``max_chars``."""
+
+    __slots__ = (
+        "max_chars", "lines", "size", "partial", "pending_from", "blank", "stopped",
+    )
+
+    def __init__(self, max_chars: int) -> None:
+        self.max_chars = max_chars
+        self.lines: list[str] = []
+        self.size = 0
+        self.partial = ""
+        self.pending_from: Optional[str] = None
+        self.blank = False
+        self.stopped = False
+
+    def write(self, text: str) -> None:
+        if "\n" not in text:
+            self.partial += text
+            if len(self.partial) > self.max_chars:
+                # A single enormous line: no need to wait for its end
+                self._line(self.partial)
+                self.partial = ""
+            return
+        first, *rest = text.split("\n")
+        self._line(self.partial + first)
+        for line in rest[:-1]:
+            self._line(line)
+        self.partial = rest[-1]
+
+    def close(self) -> str:
+        if self.stopped:
+            return "\n".join(self.lines).strip()[: self.max_chars]
+        try:
+            if self.partial:
+                self._line(self.partial)
+            if self.pending_from is not None:
+                self._emit(self.pending_from)
+        except _Done:
+            pass
+        return "\n".join(self.lines).strip()[: self.max_chars]
+
+    def _line(self, raw: str) -> None:
+        line = _WHITESPACE_RE.sub(" ", raw).strip()
+
+        if self.pending_from is not None:
+            # "From: ..." followed by "Sent:"/"To:" starts an Outlook-style
+            # quoted message
+            if _OUTLOOK_HEADER_RE.match(line):
+                self._stop()
+            pending, self.pending_from = self.pending_from, None
+            self._emit(pending)
+
+        if line.startswith(">") or _REPLY_HEADER_RE.match(line):
+            return
+        if line.endswith("wrote:") and self.lines and self.lines[-1].startswith("On "):
+            # Reply header wrapped over two lines
+            self.size -= len(self.lines.pop()) + 1
+            return
+        if _ORIGINAL_MESSAGE_RE.match(line) or _SIGNATURE_RE.match(line):
+            self._stop()
+        if _OUTLOOK_FROM_RE.match(line):
+            self.pending_from = line
+            return
+        self._emit(line)
+
+    def _emit(self, line: str) -> None:
+        if not line:
+            # Collapse runs of blank lines
+            if self.blank or not self.lines:
+                return
+            self.blank = True
+        else:
+            self.blank = False
+        self.lines.append(line)
+        self.size += len(line) + 1
+        if self.size >= self.max_chars:
+            self._stop()
+
+    def _stop(self) -> None:
+        self.stopped = True
+        raise _Done
+
+
+# ---------------------------------------------------------------------------
+# HTML
+# ---------------------------------------------------------------------------
+
+# Elements whose content is never text
+_SKIP_TAGS = {"script", "style", "head", "title", "noscript", "template", "svg"}
+# Elements whose content is a quoted message or signature
+_QUOTE_TAGS = {"blockquote"}
+_QUOTE_CLASSES = {"gmail_quote", "gmail_signature", "moz-cite-prefix", "yahoo_quoted"}
+_QUOTE_IDS = {"divRplyFwdMsg", "appendonsend", "Signature"}
+# Elements that end a line
+_BLOCK_TAGS = {
+    "address", "article", "br", "div", "dd", "dl", "dt", "footer", "h1", "h2",
+    "h3", "h4", "h5", "h6", "header", "hr", "li", "ol", "p", "pre", "section",
+    "table", "td", "th", "tr", "ul",
+}
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+
+
+class _HTMLText(HTMLParser):
+    """Feeds the visible text of an HTML document into a sink."""
+
+    def __init__(self, sink: _TextSink) -> None:
+        super().__init__(convert_charrefs=True)
+        self.sink = sink
+        # Tag being skipped and how deeply it is nested
+        self.skip_tag: Optional[str] = None
+        self.skip_depth = 0
+
+    def _skips(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> bool:
+        if tag in _SKIP_TAGS or tag in _QUOTE_TAGS:
+            return True
+        for name, value in attrs:
+            if name == "class" and value and _QUOTE_CLASSES.intersection(value.split()):
+                return True
+            if name == "id" and value in _QUOTE_IDS:
+                return True
+        return False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if tag in _VOID_TAGS:
+            if self.skip_tag is None and tag in _BLOCK_TAGS:
+                self.sink.write("\n")
+            return
+        if self.skip_tag is not None:
+            if tag == self.skip_tag:
+                self.skip_depth += 1
+            return
+        if self._skips(tag, attrs):
+            self.skip_tag, self.skip_depth = tag, 1
+            return
+        if tag in _BLOCK_TAGS:
+            self.sink.write("\n")
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if self.skip_tag is None and tag in _BLOCK_TAGS:
+            self.sink.write("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.skip_tag is not None:
+            if tag == self.skip_tag:
+                self.skip_depth -= 1
+                if self.skip_depth == 0:
+                    self.skip_tag = None
+            return
+        if tag in _BLOCK_TAGS:
+            self.sink.write("\n")
+
+    def handle_data(self, data: str) -> None:
+        if self.skip_tag is None:
+            # Source newlines are not line breaks in HTML
+            self.sink.write(data.replace("\n", " "))
+
+
+# ---------------------------------------------------------------------------
+# Payload walking and decoding
+# ---------------------------------------------------------------------------
+
+
+def _find_part(payload: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """Return the first text/plain part with data, else the first text/html."""
+    html: Optional[dict[str, Any]] = None
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        children = part.get("parts")
+        if children:
+            stack.extend(reversed(children))
+            continue
+        if part.get("filename") or not part.get("body", {}).get("data"):
+            continue
+        mime_type = part.get("mimeType", "")
+        if mime_type == "text/plain":
+            return part
+        if mime_type == "text/html" and html is None:
+            html = part
+    return html
+
+
+def _charset(part: dict[str, Any]) -> str:
+    for header in part.get("headers", []):
+        if header.get("name", "").lower() == "content-type":
+            match = _CHARSET_RE.search(header.get("value", ""))
+            if match:
+                try:
+                    return codecs.lookup(match.group(1)).name
+                except LookupError:
+                    break
+    return "utf-8"
+
+
+def extract_text(payload: dict[str, Any], max_chars: int) -> str:
+    """Return up to ``max_chars`` characters of the message's new text."""
+    part = _find_part(payload)
+    if part is None:
+        return ""
+
+    sink = _TextSink(max_chars)
+    parser = _HTMLText(sink) if part.get("mimeType") == "text/html" else None
+    write = parser.feed if parser else sink.write
+    decoder = codecs.getincrementaldecoder(_charset(part))(errors="replace")
+    data: str = part["body"]["data"]
+
+    try:
+        for start in range(0, len(data), _B64_CHUNK):
+            chunk = data[start:start + _B64_CHUNK]
+            final = start + _B64_CHUNK >= len(data)
+            if final:
+                chunk += "=" * (-len(chunk) % 4)
+            write(decoder.decode(base64.urlsafe_b64decode(chunk), final=final))
+        if parser:
+            parser.close()
+    except _Done:
+        pass
+    return sink.close()
@@ -0,0 +1,237 @@
+"""
+Local fake of the Gmail API endpoints used by the sync.
+
+Serves a synthetic mailbox over HTTP -- ``messages.list``/``get``,
+``history.list``, ``getProfile`` and batch requests -- with a fixed
+latency per round trip, so fetching can be exercised and benchmarked
+without a Google account.  Point the sync at it with
+``GMAIL_API_ENDPOINT=http://127.0.0.1:<port>/``.
+
+Usage::
+
+    python -m app.gmail.fake_server --messages 1000 --latency-ms 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import threading
+import time
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+_PREFIX = "/gmail/v1/users/me/"
+_BATCH_PATH = "/batch/gmail/v1"
+_BOUNDARY = "batch_fake_gmail"
+
+# Sender domain of the messages from "known contacts"
+CONTACT_DOMAIN = "client.example"
+
+
+def _message(index: int, contact_every: int) -> dict[str, Any]:
+    if contact_every and index % contact_every == 0:
+        sender = f"Contact {index} <contact{index}@{CONTACT_DOMAIN}>"
+    else:
+        sender = f"Newsletter <news{index}@lists.example>"
+    body = (
+        f"Hi team,\n\nFeedback on round {index}: please make the logo larger "
+        "and soften the headline copy before launch.\n\nThanks"
+    )
+    return {
+        "id": f"m{index:08d}",
+        "threadId": f"t{index:08d}",
+        "historyId": str(index + 1),
+        "payload": {
+            "mimeType": "text/plain",
+            "headers": [
+                {"name": "From", "value": sender},
+                {"name": "Subject", "value": f"Round {index} feedback"},
+                {"name": "Date", "value": "Mon, 19 Oct 2026 09:00:00 +0000"},
+            ],
+            "body": {"data": base64.urlsafe_b64encode(body.encode()).decode()},
+        },
+    }
+
+
+class FakeGmail:
+    """A synthetic mailbox served on ``127.0.0.1``.
+
+    Every ``contact_every``-th message is sent from ``CONTACT_DOMAIN``.
+    """
+
+    def __init__(
+        self,
+        messages: int = 200,
+        *,
+        latency_ms: float = 50.0,
+        contact_every: int = 5,
+        port: int = 0,
+    ) -> None:
+        self.latency = latency_ms / 1000
+        self.messages = {
+            m["id"]: m for m in (_message(i, contact_every) for i in range(messages))
+        }
+        self.requests = 0  # HTTP round trips served
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def contact_emails(self) -> list[str]:
+        """Sender addresses of the messages from known contacts."""
+        emails = []
+        for message in self.messages.values():
+            sender = message["payload"]["headers"][0]["value"]
+            if CONTACT_DOMAIN in sender:
+                emails.append(sender.split("<")[1].rstrip(">"))
+        return emails
+
+    def start(self) -> "FakeGmail":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeGmail":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    # -- request handling ----------------------------------------------------
+
+    def handle_get(self, path: str, query: dict[str, list[str]]) -> tuple[int, Any]:
+        """Serve one API GET.  Returns ``(status, JSON body)``."""
+        if not path.startswith(_PREFIX):
+            return 404, {"error": {"code": 404, "message": "Not found"}}
+        resource = path[len(_PREFIX):]
+        ids = list(self.messages)
+
+        if resource == "profile":
+            return 200, {"emailAddress": "me@agency.example", "historyId": str(len(ids))}
+        if resource == "history":
+            start = int(query.get("startHistoryId", ["0"])[0])
+            added = [
+                {"messagesAdded": [{"message": {"id": m, "threadId": m}}]}
+                for m in ids[start:]
+            ]
+            return 200, {"history": added, "historyId": str(len(ids))}
+        if resource == "messages":
+            limit = int(query.get("maxResults", ["100"])[0])
+            newest = ids[::-1][:limit]
+            return 200, {"messages": [{"id": m, "threadId": m} for m in newest]}
+        if resource.startswith("messages/"):
+            message = self.messages.get(resource[len("messages/"):])
+            if message is None:
+                return 404, {"error": {"code": 404, "message": "Not Found"}}
+            if query.get("format", ["full"])[0] == "metadata":
+                wanted = {h.lower() for h in query.get("metadataHeaders", [])}
+                payload = message["payload"]
+                message = {
+                    **message,
+                    "payload": {
+                        "mimeType": payload["mimeType"],
+                        "headers": [
+                            h for h in payload["headers"]
+                            if not wanted or h["name"].lower() in wanted
+                        ],
+                    },
+                }
+            return 200, message
+        return 404, {"error": {"code": 404, "message": "Not found"}}
+
+    def handle_batch(self, content_type: str, body: bytes) -> bytes:
+        """Serve a multipart batch request; returns the multipart response."""
+        envelope = BytesParser().parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        out = []
+        for part in envelope.get_payload():
+            request_line = part.get_payload().split("\n", 1)[0].strip()
+            url = urlparse(request_line.split(" ")[1])
+            status, payload = self.handle_get(url.path, parse_qs(url.query))
+            content_id = part["Content-ID"].strip("<>")
+            reason = "OK" if status == 200 else "Not Found"
+            out.append(
+                f"--{_BOUNDARY}\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {reason}\r\n"
+                "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(payload)}\r\n"
+            )
+        out.append(f"--{_BOUNDARY}--\r\n")
+        return "".join(out).encode()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, content_type: str, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _round_trip(self) -> None:
+                with fake._lock:
+                    fake.requests += 1
+                time.sleep(fake.latency)
+
+            def do_GET(self) -> None:
+                self._round_trip()
+                url = urlparse(self.path)
+                status, payload = fake.handle_get(url.path, parse_qs(url.query))
+                self._reply(status, "application/json", json.dumps(payload).encode())
+
+            def do_POST(self) -> None:
+                self._round_trip()
+                if urlparse(self.path).path != _BATCH_PATH:
+                    self._reply(404, "application/json", b"{}")
+                    return
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                response = fake.handle_batch(self.headers["Content-Type"], body)
+                self._reply(200, f"multipart/mixed; boundary={_BOUNDARY}", response)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--contact-every", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    fake = FakeGmail(
+        args.messages,
+        latency_ms=args.latency_ms,
+        contact_every=args.contact_every,
+        port=args.port,
+    )
+    print(f"Fake Gmail API on {fake.endpoint} ({args.messages} messages)")
+    fake.start()
+    try:
+        fake._thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Minimal asyncio pipeline: stages of workers joined by bounded queues.
+
+Each stage is an async function run by ``workers`` concurrent tasks.  It
+receives one item (or, for batch stages, a list of up to ``batch_size``
+items already waiting in its queue) and returns the items to pass to the
+next stage.  Queues are bounded, so a slow stage applies back-pressure
+upstream instead of letting work pile up in memory.
+
+Every stage records throughput, busy time and queue depth, reported by
+:meth:`Pipeline.metrics`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a queue; one is queued per downstream worker
+_DONE = object()
+
+StageFn = Callable[[Any], Awaitable[Optional[Iterable[Any]]]]
+ErrorHandler = Callable[[str, Any, Exception], None]
+
+
+class Stage:
+    """One pipeline stage and its counters."""
+
+    __slots__ = (
+        "name", "fn", "workers", "batch_size", "queue",
+        "processed", "errors", "busy_seconds",
+        "max_queue_depth", "_depth_total", "_depth_samples",
+    )
+
+    def __init__(
+        self, name: str, fn: StageFn, workers: int, batch_size: Optional[int], queue_size: int
+    ) -> None:
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_size)
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+
+    async def put(self, item: Any) -> None:
+        await self.queue.put(item)
+        depth = self.queue.qsize()
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+
+    async def _take(self) -> tuple[Any, bool]:
+        """Next item (or batch) and whether the end marker was reached."""
+        item = await self.queue.get()
+        if item is _DONE:
+            return None, True
+        if self.batch_size is None:
+            return item, False
+        batch = [item]
+        while len(batch) < self.batch_size:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def metrics(self, elapsed: float) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "processed": self.processed,
+            "errors": self.errors,
+            "throughput_per_second": round(self.processed / elapsed, 2) if elapsed else 0.0,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "max_queue_depth": self.max_queue_depth,
+            "mean_queue_depth": (
+                round(self._depth_total / self._depth_samples, 2) if self._depth_samples else 0.0
+            ),
+        }
+
+
+class Pipeline:
+    """Stages run in the order they are added."""
+
+    def __init__(self, queue_size: int, on_error: Optional[ErrorHandler] = None) -> None:
+        self.queue_size = queue_size
+        self.on_error = on_error
+        self.stages: list[Stage] = []
+        self.elapsed = 0.0
+
+    def add_stage(
+        self,
+        name: str,
+        fn: StageFn,
+        *,
+        workers: int = 1,
+        batch_size: Optional[int] = None,
+    ) -> "Pipeline":
+        self.stages.append(Stage(name, fn, workers, batch_size, self.queue_size))
+        return self
+
+    async def _worker(self, stage: Stage, downstream: Optional[Stage]) -> None:
+        while True:
+            item, done = await stage._take()
+            if item is not None:
+                started = time.perf_counter()
+                size = len(item) if stage.batch_size is not None else 1
+                try:
+                    outputs = await stage.fn(item)
+                    stage.processed += size
+                except Exception as exc:
+                    stage.errors += size
+                    if self.on_error is not None:
+                        self.on_error(stage.name, item, exc)
+                    else:
+                        logger.exception(f"Pipeline stage {stage.name} failed")
+                    outputs = None
+                stage.busy_seconds += time.perf_counter() - started
+                if downstream is not None:
+                    for output in outputs or ():
+                        await downstream.put(output)
+            if done:
+                return
+
+    async def _run_stage(self, stage: Stage, downstream: Optional[Stage]) -> None:
+        await asyncio.gather(*(self._worker(stage, downstream) for _ in range(stage.workers)))
+        if downstream is not None:
+            for _ in range(downstream.workers):
+                await downstream.queue.put(_DONE)
+
+    async def _feed(self, items: Iterable[Any]) -> None:
+        first = self.stages[0]
+        for item in items:
+            await first.put(item)
+        for _ in range(first.workers):
+            await first.queue.put(_DONE)
+
+    async def run(self, items: Iterable[Any]) -> None:
+        """Push ``items`` through every stage and wait until all are drained."""
+        started = time.perf_counter()
+        downstream = self.stages[1:] + [None]
+        tasks = [asyncio.create_task(self._feed(items))] + [
+            asyncio.create_task(self._run_stage(stage, nxt))
+            for stage, nxt in zip(self.stages, downstream)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.elapsed = time.perf_counter() - started
+
+    def metrics(self) -> list[dict[str, Any]]:
+        return [stage.metrics(self.elapsed) for stage in self.stages]
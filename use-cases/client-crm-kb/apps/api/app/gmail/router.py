@@ -2,22 +2,25 @@
 FastAPI router for Gmail integration endpoints.
 
 Provides OAuth2 authentication, email sync triggers, and sync status/results.
+Syncs run as background jobs: triggering one returns a job id to poll.
 """
 
 from __future__ import annotations
 
-from typing import Optional
+import hmac
+from typing import Any, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
 from app.gmail.schemas import (
     GmailAuthResponse,
     GmailStatus,
+    GmailSyncJob,
     GmailSyncRequest,
-    GmailSyncResponse,
     SyncedEmail,
 )
 from app.gmail.service import (
@@ -25,8 +28,11 @@ from app.gmail.service import (
     get_sync_status,
     get_synced_emails,
     handle_callback,
-    sync_emails,
+    handle_push,
+    is_connected,
+    run_sync_job,
 )
+from app.orchestration import jobs
 
 router = APIRouter(prefix="/api/gmail", tags=["gmail"])
 
@@ -54,10 +60,11 @@ async def gmail_auth():
 )
 async def gmail_callback(
     code: str = Query(..., description="Authorization code from Google"),
+    db: AsyncSession = Depends(get_db),
 ):
     """Exchange the Google OAuth authorization code for tokens and store them."""
     try:
-        result = handle_callback(code)
+        result = await handle_callback(db, code)
         return {
             "success": result.get("success", False),
             "email": result.get("email"),
@@ -70,35 +77,87 @@ async def gmail_callback(
         )
 
 
+def _job_response(job: jobs.Job) -> GmailSyncJob:
+    return GmailSyncJob(
+        job_id=job.id,
+        status=job.status,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result=job.result if job.status == "succeeded" else None,
+        error=job.error,
+    )
+
+
 @router.post(
     "/sync",
-    response_model=GmailSyncResponse,
+    response_model=GmailSyncJob,
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Trigger email sync",
 )
 async def gmail_sync(
     body: Optional[GmailSyncRequest] = None,
-    db: AsyncSession = Depends(get_db),
 ):
-    """Fetch recent emails from the connected Gmail account, match them to CRM
-    clients, analyse with AI, and create FeedbackEvent records."""
+    """Start a background sync of the connected Gmail account: match new
+    emails to CRM clients, analyse them with AI, and create FeedbackEvent
+    records.  Returns a job to poll; if a sync is already running, that
+    job is returned instead."""
+    if not is_connected():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Gmail is not connected. Please authorize first.",
+        )
     request = body or GmailSyncRequest()
-    try:
-        result = await sync_emails(
-            db,
-            client_id=request.client_id,
-            max_results=request.max_results,
+    job = await jobs.submit(
+        "gmail_sync",
+        run_sync_job,
+        client_id=request.client_id,
+        max_results=request.max_results,
+    )
+    return _job_response(job)
+
+
+@router.get(
+    "/sync/{job_id}",
+    response_model=GmailSyncJob,
+    summary="Get the status of a sync job",
+)
+async def gmail_sync_job(job_id: str):
+    """Return the status of a sync job, with its summary once finished."""
+    job = await jobs.get_job(job_id)
+    if job is None or job.kind != "gmail_sync":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sync job not found or expired.",
         )
-        return GmailSyncResponse(**result)
-    except ValueError as exc:
+    return _job_response(job)
+
+
+@router.post(
+    "/push",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Gmail push notification webhook",
+)
+async def gmail_push(
+    payload: dict[str, Any] = Body(...),
+    token: str = Query("", description="GMAIL_PUSH_VERIFICATION_TOKEN"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Receive a Gmail ``watch`` notification from a Pub/Sub push
+    subscription and start a sync if it reports new changes."""
+    if not settings.GMAIL_PUSH_VERIFICATION_TOKEN:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(exc),
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Gmail push notifications are not configured.",
         )
-    except Exception as exc:
+    if not hmac.compare_digest(token, settings.GMAIL_PUSH_VERIFICATION_TOKEN):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Sync failed: {exc}",
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid push token.",
         )
+    if await handle_push(db, payload):
+        await jobs.submit("gmail_sync", run_sync_job)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get(
@@ -131,11 +190,14 @@ async def gmail_status(
     response_model=list[SyncedEmail],
     summary="List recently synced emails",
 )
-async def gmail_emails():
-    """Return the list of emails from the most recent sync operation with
-    their AI analysis results."""
+async def gmail_emails(
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    """Return the most recently ingested emails with their AI analysis
+    results."""
     try:
-        emails = get_synced_emails()
+        emails = await get_synced_emails(db, limit)
         return [SyncedEmail(**e) for e in emails]
     except Exception as exc:
         raise HTTPException(
@@ -42,10 +42,29 @@ class GmailSyncRequest(BaseModel):
     )
 
 
+class GmailStageMetrics(BaseModel):
+    """Throughput and queue depth of one sync pipeline stage."""
+
+    name: str
+    workers: int
+    processed: int = Field(description="Items the stage completed.")
+    errors: int = Field(default=0, description="Items the stage failed on.")
+    throughput_per_second: float = Field(
+        description="Items completed per second of sync wall time."
+    )
+    busy_seconds: float = Field(description="Total time spent by the stage's workers.")
+    max_queue_depth: int = Field(description="Largest backlog waiting for the stage.")
+    mean_queue_depth: float
+
+
 class GmailSyncResponse(BaseModel):
     """Summary returned after a sync operation completes."""
 
     synced_count: int = Field(description="Total emails fetched from Gmail.")
+    skipped_count: int = Field(
+        default=0,
+        description="Emails skipped because they had already been ingested.",
+    )
     new_feedback_count: int = Field(
         description="Number of new FeedbackEvent records created."
     )
@@ -57,6 +76,25 @@ class GmailSyncResponse(BaseModel):
         default_factory=list,
         description="Non-fatal errors encountered during sync.",
     )
+    stages: list[GmailStageMetrics] = Field(
+        default_factory=list,
+        description="Per-stage metrics of the ingestion pipeline.",
+    )
+
+
+class GmailSyncJob(BaseModel):
+    """A background sync job; poll GET /api/gmail/sync/{job_id} until it
+    has finished."""
+
+    job_id: str
+    status: str = Field(description="queued, running, succeeded or failed.")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[GmailSyncResponse] = Field(
+        default=None, description="Sync summary once the job has succeeded."
+    )
+    error: Optional[str] = None
 
 
 # ---------------------------------------------------------------------------
@@ -80,7 +118,7 @@ class GmailStatus(BaseModel):
     )
     total_synced: int = Field(
         default=0,
-        description="Cumulative number of emails synced.",
+        description="Cumulative number of emails ingested.",
     )
 
 
@@ -3,31 +3,51 @@ Gmail integration service using the Google API.
 
 Handles OAuth2 authentication, email fetching, client matching, and
 AI-powered email analysis to create CRM feedback records.
+
+Sync is incremental: the last Gmail ``historyId`` is stored in
+``gmail_sync_state`` and each run asks ``users.history.list`` only for
+messages added to the inbox since then.  Every ingested message is
+recorded in ``gmail_processed_messages`` (unique on the Gmail message id),
+so a message is analysed -- and turned into feedback -- at most once.
 """
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
 import logging
 import os
-import re
-from datetime import date, datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from email.utils import parseaddr, parsedate_to_datetime
 from pathlib import Path
 from typing import Any, Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from google.auth.transport.requests import Request as GoogleAuthRequest
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
-from sqlalchemy import func, select
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest, build_http
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.models import Client, Contact, FeedbackEvent, Project
-from app.utils.ai import extract_json
+from app.database import async_session_factory
+from app.gmail.contacts import ContactIndex, get_contact_index
+from app.gmail.extract import extract_text
+from app.gmail.pipeline import Pipeline
+from app.health.service import feedback_changed
+from app.models import (
+    Client,
+    FeedbackEvent,
+    GmailProcessedMessage,
+    GmailSyncState,
+)
+from app.utils.ai import AIBudgetExceededError, extract_json
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +60,27 @@ SCOPES = [
     "https://www.googleapis.com/auth/userinfo.email",
 ]
 CREDENTIALS_PATH = Path("/tmp/gmail_credentials.json")
-SYNC_STATUS_PATH = Path("/tmp/gmail_sync_status.json")
+
+# Single connected account -> a single sync-state row
+_SYNC_STATE_ID = 1
+
+# Emails listed by GET /api/gmail/emails
+RECENT_EMAILS_LIMIT = 50
+
+# Headers fetched with format=metadata for sender matching
+_METADATA_HEADERS = ["From", "Subject", "Date"]
+
+# Processed messages (and their feedback) written per INSERT
+_PERSIST_BATCH_SIZE = 100
+
+# Renew the push-notification watch this long before it expires (Gmail
+# watches last 7 days)
+_WATCH_RENEW_BEFORE = timedelta(days=1)
+
+# Listing the backlog of an expired cursor starts this much before the
+# cursor's time, for messages whose received date predates their arrival
+# in the inbox; duplicates are dropped as already processed
+_BACKLOG_OVERLAP = timedelta(days=1)
 
 
 # ---------------------------------------------------------------------------
@@ -112,22 +152,531 @@ def _get_oauth_flow() -> Flow:
 
 
 # ---------------------------------------------------------------------------
-# Sync status helpers
+# Sync state helpers
 # ---------------------------------------------------------------------------
 
 
-def _load_sync_status() -> dict[str, Any]:
-    """Load the persistent sync-status metadata."""
-    if not SYNC_STATUS_PATH.exists():
-        return {"last_sync_at": None, "total_synced": 0, "email": None}
+async def _get_sync_state(db: AsyncSession) -> GmailSyncState:
+    """Return the sync-state row, creating it on first use."""
+    await db.execute(
+        insert(GmailSyncState)
+        .values(id=_SYNC_STATE_ID, total_synced=0)
+        .on_conflict_do_nothing(index_elements=[GmailSyncState.id])
+    )
+    return await db.get(GmailSyncState, _SYNC_STATE_ID)
+
+
+def _history_message_ids(service: Any, start_history_id: int) -> tuple[list[str], int]:
+    """Ids of messages added to the inbox since ``start_history_id``.
+
+    Returns ``(message ids, oldest first; latest history id)``.  Raises
+    ``HttpError`` 404 if the start id is too old for Gmail to serve.
+    """
+    message_ids: list[str] = []
+    seen: set[str] = set()
+    page_token: Optional[str] = None
+    while True:
+        response = (
+            service.users()
+            .history()
+            .list(
+                userId="me",
+                startHistoryId=start_history_id,
+                historyTypes=["messageAdded"],
+                labelId="INBOX",
+                pageToken=page_token,
+            )
+            .execute()
+        )
+        for record in response.get("history", []):
+            for added in record.get("messagesAdded", []):
+                message_id = added["message"]["id"]
+                if message_id not in seen:
+                    seen.add(message_id)
+                    message_ids.append(message_id)
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return message_ids, int(response["historyId"])
+
+
+def _list_inbox_page(
+    service: Any, query: str, max_results: int, page_token: Optional[str]
+) -> dict[str, Any]:
+    """One page of ``messages.list`` (blocking), newest first."""
+    return (
+        service.users()
+        .messages()
+        .list(userId="me", q=query, maxResults=max_results, pageToken=page_token)
+        .execute()
+    )
+
+
+async def _processed_ids(db: AsyncSession, message_ids: list[str]) -> set[str]:
+    """The ids among ``message_ids`` that have a processed (or failed) row."""
+    if not message_ids:
+        return set()
+    return set(
+        (
+            await db.execute(
+                select(GmailProcessedMessage.gmail_message_id).where(
+                    GmailProcessedMessage.gmail_message_id.in_(message_ids)
+                )
+            )
+        ).scalars()
+    )
+
+
+async def _backlog_message_ids(
+    db: AsyncSession, service: Any, since: datetime
+) -> list[str]:
+    """Inbox messages received since ``since``, oldest first, for a history
+    cursor Gmail has expired.
+
+    Pages newest first and stops at the first page that was ingested
+    completely: runs work through a backlog oldest first, so everything
+    older has been ingested too.
+    """
+    after = int((since - _BACKLOG_OVERLAP).timestamp())
+    message_ids: list[str] = []
+    page_token: Optional[str] = None
+    while True:
+        response = await asyncio.to_thread(
+            _list_inbox_page, service, f"in:inbox after:{after}", 500, page_token
+        )
+        page = [m["id"] for m in response.get("messages", [])]
+        if page and await _processed_ids(db, page) == set(page):
+            break
+        message_ids.extend(page)
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            break
+    message_ids.reverse()
+    return message_ids
+
+
+async def _list_new_message_ids(
+    db: AsyncSession, service: Any, state: GmailSyncState, max_results: int
+) -> tuple[list[str], int]:
+    """Message ids added since the cursor, oldest first, and the latest
+    history id.
+
+    All ids since the cursor are returned, so the caller can drop the ones
+    already processed before capping the run at ``max_results``.  If Gmail
+    has expired the cursor, every inbox message received since the cursor
+    was last advanced is listed instead.  On the first sync, the latest
+    ``max_results`` inbox messages.
+    """
+    if state.history_id is not None:
+        try:
+            return await asyncio.to_thread(
+                _history_message_ids, service, state.history_id
+            )
+        except HttpError as exc:
+            if exc.resp.status != 404:
+                raise
+            logger.warning(
+                "Gmail history %s has expired; listing the inbox since %s",
+                state.history_id,
+                state.cursor_at or state.last_sync_at,
+            )
+
+    # The history id is taken first so nothing arriving meanwhile is missed
+    profile = await asyncio.to_thread(
+        lambda: service.users().getProfile(userId="me").execute()
+    )
+    latest = int(profile["historyId"])
+    since = state.cursor_at or state.last_sync_at
+    if state.history_id is not None and since is not None:
+        return await _backlog_message_ids(db, service, since), latest
+
+    results = await asyncio.to_thread(
+        _list_inbox_page, service, "in:inbox", max_results, None
+    )
+    return [m["id"] for m in results.get("messages", [])], latest
+
+
+def _ensure_watch(service: Any, state: GmailSyncState) -> None:
+    """(Re)start Gmail push notifications to ``GMAIL_PUSH_TOPIC`` when the
+    current watch is missing or about to expire (blocking)."""
+    now = datetime.now(timezone.utc)
+    if state.watch_expires_at and state.watch_expires_at - now > _WATCH_RENEW_BEFORE:
+        return
+    response = (
+        service.users()
+        .watch(
+            userId="me",
+            body={"topicName": settings.GMAIL_PUSH_TOPIC, "labelIds": ["INBOX"]},
+        )
+        .execute()
+    )
+    state.watch_expires_at = datetime.fromtimestamp(
+        int(response["expiration"]) / 1000, tz=timezone.utc
+    )
+    logger.info("Gmail watch renewed until %s", state.watch_expires_at)
+
+
+# ---------------------------------------------------------------------------
+# Message fetching
+# ---------------------------------------------------------------------------
+#
+# googleapiclient is synchronous, so every call runs in a worker thread.
+# Messages are fetched with batch HTTP requests (GMAIL_FETCH_BATCH_SIZE
+# per round trip), several batches at a time: first ``format=metadata``
+# for every new message, then ``format=full`` only for those sent by a
+# known contact.
+
+
+def _gmail_service(creds: Credentials) -> Any:
+    """Build a Gmail API client, pointed at ``GMAIL_API_ENDPOINT`` if set."""
+    if settings.GMAIL_API_ENDPOINT:
+        return build(
+            "gmail",
+            "v1",
+            credentials=creds,
+            client_options={"api_endpoint": settings.GMAIL_API_ENDPOINT},
+        )
+    return build("gmail", "v1", credentials=creds)
+
+
+def _new_batch(service: Any, callback: Any) -> BatchHttpRequest:
+    if settings.GMAIL_API_ENDPOINT:
+        batch_uri = settings.GMAIL_API_ENDPOINT.rstrip("/") + "/batch/gmail/v1"
+        return BatchHttpRequest(callback=callback, batch_uri=batch_uri)
+    return service.new_batch_http_request(callback=callback)
+
+
+def _fetch_batch(
+    service: Any, creds: Credentials, message_ids: list[str], fmt: str
+) -> dict[str, Any]:
+    """Fetch ``message_ids`` in a single batch request (blocking).
+
+    Maps each id to its message, or to the exception it failed with.
+    """
+    results: dict[str, Any] = {}
+
+    def _collect(request_id: str, response: Any, exception: Optional[Exception]) -> None:
+        results[request_id] = exception if exception is not None else response
+
+    batch = _new_batch(service, _collect)
+    for message_id in message_ids:
+        params: dict[str, Any] = {"userId": "me", "id": message_id, "format": fmt}
+        if fmt == "metadata":
+            params["metadataHeaders"] = _METADATA_HEADERS
+        batch.add(service.users().messages().get(**params), request_id=message_id)
+    # httplib2 connections are not thread-safe, so each batch gets its own
+    batch.execute(http=AuthorizedHttp(creds, http=build_http()))
+    return results
+
+
+async def _fetch_messages(
+    service: Any, creds: Credentials, message_ids: list[str], fmt: str
+) -> dict[str, Any]:
+    """Fetch messages off the event loop, ``GMAIL_FETCH_CONCURRENCY``
+    batches at a time.  Maps each id to its message or exception."""
+    size = settings.GMAIL_FETCH_BATCH_SIZE
+    semaphore = asyncio.Semaphore(settings.GMAIL_FETCH_CONCURRENCY)
+
+    async def _run(chunk: list[str]) -> dict[str, Any]:
+        async with semaphore:
+            try:
+                return await asyncio.to_thread(_fetch_batch, service, creds, chunk, fmt)
+            except Exception as exc:
+                logger.warning("Gmail batch fetch of %d messages failed: %s", len(chunk), exc)
+                return {message_id: exc for message_id in chunk}
+
+    results: dict[str, Any] = {}
+    chunks = [message_ids[i:i + size] for i in range(0, len(message_ids), size)]
+    for part in await asyncio.gather(*(_run(chunk) for chunk in chunks)):
+        results.update(part)
+    return results
+
+
+def _is_not_found(exc: Any) -> bool:
+    return isinstance(exc, HttpError) and exc.resp.status == 404
+
+
+def _parse_headers(msg: dict[str, Any]) -> tuple[str, str, str, datetime]:
+    """Return ``(subject, from header, sender email, date)`` of a message."""
+    headers = {
+        h["name"].lower(): h["value"]
+        for h in msg.get("payload", {}).get("headers", [])
+    }
+    subject = headers.get("subject", "(no subject)")
+    from_header = headers.get("from", "")
+    _, sender_email = parseaddr(from_header)
     try:
-        return json.loads(SYNC_STATUS_PATH.read_text())
+        email_date = parsedate_to_datetime(headers.get("date", ""))
     except Exception:
-        return {"last_sync_at": None, "total_synced": 0, "email": None}
+        email_date = datetime.now(timezone.utc)
+    return subject, from_header, sender_email, email_date
 
 
-def _save_sync_status(status: dict[str, Any]) -> None:
-    SYNC_STATUS_PATH.write_text(json.dumps(status, indent=2, default=str))
+# ---------------------------------------------------------------------------
+# Ingestion pipeline
+# ---------------------------------------------------------------------------
+#
+#   fetch (metadata batches) -> match (parse headers, sender -> client)
+#   -> fetch_body (full batches, known contacts only) -> analyze (Claude)
+#   -> persist (bulk claim + feedback insert)
+#
+# Stages overlap, so a sync takes roughly as long as its slowest stage
+# rather than the sum of every message's latencies.
+
+
+class _Email:
+    """A message on its way through the ingestion pipeline."""
+
+    __slots__ = (
+        "id", "thread_id", "subject", "from_header", "sender_email", "date",
+        "client_id", "client_name", "project_id", "body", "analysis",
+    )
+
+    def __init__(self, msg: dict[str, Any]) -> None:
+        self.id: str = msg["id"]
+        self.thread_id: Optional[str] = msg.get("threadId")
+        self.subject, self.from_header, self.sender_email, self.date = _parse_headers(msg)
+        self.client_id: Optional[UUID] = None
+        self.client_name: Optional[str] = None
+        self.project_id: Optional[UUID] = None
+        self.body = ""
+        self.analysis: dict[str, Any] = {}
+
+    @property
+    def creates_feedback(self) -> bool:
+        return self.client_id is not None and bool(self.body.strip())
+
+
+class _Ingest:
+    """State and stage functions of one sync run."""
+
+    __slots__ = (
+        "db", "service", "creds", "client_id", "contacts", "synced_count",
+        "skipped_count", "new_feedback_count", "matched_client_names", "errors",
+        "failed", "deferred",
+    )
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        service: Any,
+        creds: Credentials,
+        client_id: Optional[UUID],
+        contacts: ContactIndex,
+    ) -> None:
+        self.db = db
+        self.service = service
+        self.creds = creds
+        self.client_id = client_id
+        self.contacts = contacts
+        self.synced_count = 0
+        self.skipped_count = 0
+        self.new_feedback_count = 0
+        self.matched_client_names: set[str] = set()
+        self.errors: list[str] = []
+        # Message id -> error, recorded as failed attempts after the run
+        self.failed: dict[str, str] = {}
+        # Set when the AI budget blocked analysis; nothing is recorded then
+        self.deferred = False
+
+    def pipeline(self) -> Pipeline:
+        return (
+            Pipeline(settings.GMAIL_PIPELINE_QUEUE_SIZE, on_error=self.on_error)
+            .add_stage(
+                "fetch",
+                self.fetch,
+                workers=settings.GMAIL_FETCH_CONCURRENCY,
+                batch_size=settings.GMAIL_FETCH_BATCH_SIZE,
+            )
+            .add_stage("match", self.match)
+            .add_stage(
+                "fetch_body",
+                self.fetch_body,
+                workers=settings.GMAIL_FETCH_CONCURRENCY,
+                batch_size=settings.GMAIL_FETCH_BATCH_SIZE,
+            )
+            .add_stage("analyze", self.analyze, workers=settings.GMAIL_ANALYSIS_CONCURRENCY)
+            # A single writer: the session is not safe for concurrent use
+            .add_stage("persist", self.persist, batch_size=_PERSIST_BATCH_SIZE)
+        )
+
+    def on_error(self, stage: str, item: Any, exc: Exception) -> None:
+        items = item if isinstance(item, list) else [item]
+        logger.error("Gmail sync stage %s failed for %d message(s): %s", stage, len(items), exc)
+        for entry in items:
+            message_id = entry.id if isinstance(entry, _Email) else entry
+            self._fail(message_id, exc)
+
+    def _fail(self, message_id: str, exc: Any) -> None:
+        self.errors.append(f"Message {message_id}: {exc}")
+        if isinstance(exc, AIBudgetExceededError):
+            self.deferred = True
+        else:
+            self.failed[message_id] = str(exc)[:1000]
+
+    def _collect(self, message_id: str, result: Any) -> Optional[dict[str, Any]]:
+        """Return a fetched message, recording 404s and errors."""
+        if _is_not_found(result):
+            # Added and deleted again since the last sync
+            self.skipped_count += 1
+            return None
+        if not isinstance(result, dict):
+            self._fail(message_id, result)
+            return None
+        return result
+
+    async def fetch(self, message_ids: list[str]) -> list[dict[str, Any]]:
+        metadata = await _fetch_messages(self.service, self.creds, message_ids, "metadata")
+        fetched = (self._collect(m, metadata.get(m)) for m in message_ids)
+        return [msg for msg in fetched if msg is not None]
+
+    async def match(self, msg: dict[str, Any]) -> list[_Email]:
+        email = _Email(msg)
+        email.client_id = self.contacts.match(email.sender_email)
+        # If filtering by client_id, leave other emails for a full sync
+        if self.client_id and email.client_id != self.client_id:
+            return []
+        if email.client_id:
+            email.client_name = self.contacts.client_names.get(email.client_id) or "Unknown"
+        return [email]
+
+    async def fetch_body(self, emails: list[_Email]) -> list[_Email]:
+        # Bodies are only needed for emails from known contacts
+        known = [e.id for e in emails if e.client_id]
+        bodies = await _fetch_messages(self.service, self.creds, known, "full") if known else {}
+        ready = []
+        for email in emails:
+            if email.client_id:
+                full_msg = self._collect(email.id, bodies.get(email.id))
+                if full_msg is None:
+                    continue
+                email.body = extract_text(
+                    full_msg.get("payload", {}), settings.GMAIL_BODY_MAX_CHARS
+                )
+            ready.append(email)
+        return ready
+
+    async def analyze(self, email: _Email) -> list[_Email]:
+        if not email.creates_feedback:
+            return [email]
+        projects = self.contacts.client_projects.get(email.client_id, [])
+        email.analysis = await _analyze_email(
+            subject=email.subject,
+            body=email.body,
+            sender=email.from_header,
+            client_name=email.client_name or "Unknown",
+            projects=projects,
+        )
+        # Try to resolve project_id from name
+        project_name = email.analysis.get("project_name")
+        if project_name:
+            for proj in projects:
+                if proj["name"].lower() == project_name.lower():
+                    email.project_id = UUID(proj["id"])
+                    break
+        return [email]
+
+    async def persist(self, emails: list[_Email]) -> None:
+        """Claim and store a batch in one savepoint.
+
+        Messages already claimed (e.g. by a concurrent sync) are skipped;
+        the rest get their processed row and, if matched, a FeedbackEvent.
+        A row left by a failed attempt is claimed again.
+        """
+        stmt = insert(GmailProcessedMessage).values([
+            {
+                "gmail_message_id": e.id,
+                "thread_id": e.thread_id,
+                "subject": e.subject,
+                "from_email": e.sender_email or None,
+                "email_date": e.date,
+                "client_id": e.client_id,
+                "sentiment": e.analysis.get("sentiment"),
+                "topics": e.analysis.get("topics") or None,
+            }
+            for e in emails
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[GmailProcessedMessage.gmail_message_id],
+            set_={
+                **{
+                    name: stmt.excluded[name]
+                    for name in (
+                        "thread_id", "subject", "from_email", "email_date",
+                        "client_id", "sentiment", "topics",
+                    )
+                },
+                "error": None,
+                "processed_at": func.now(),
+            },
+            where=GmailProcessedMessage.error.isnot(None),
+        ).returning(GmailProcessedMessage.gmail_message_id, GmailProcessedMessage.id)
+        async with self.db.begin_nested():
+            claimed = dict((await self.db.execute(stmt)).all())
+            new = [e for e in emails if e.id in claimed]
+
+            feedback_rows: list[dict[str, Any]] = []
+            links: list[dict[str, Any]] = []
+            for email in new:
+                if not email.creates_feedback:
+                    continue
+                feedback_id = uuid4()
+                topics = email.analysis.get("topics", [])
+                feedback_rows.append({
+                    "id": feedback_id,
+                    "client_id": email.client_id,
+                    "project_id": email.project_id,
+                    "source": "email",
+                    "date": email.date.date() if email.date else date.today(),
+                    "raw_text": f"Subject: {email.subject}\n\n{email.body[:5000]}",
+                    "sentiment": email.analysis.get("sentiment", "neutral"),
+                    "topics": topics if topics else None,
+                    "extracted_requirements": email.analysis.get("extracted_requirements"),
+                    "severity": email.analysis.get("severity", "info"),
+                })
+                links.append({"id": claimed[email.id], "feedback_event_id": feedback_id})
+            if feedback_rows:
+                await self.db.execute(insert(FeedbackEvent), feedback_rows)
+                await self.db.execute(update(GmailProcessedMessage), links)
+                await feedback_changed(self.db, [
+                    (
+                        row["client_id"],
+                        None,
+                        {
+                            "date": row["date"],
+                            "sentiment": row["sentiment"],
+                            "severity": row["severity"],
+                            "status": "new",
+                        },
+                    )
+                    for row in feedback_rows
+                ])
+
+        self.skipped_count += len(emails) - len(new)
+        self.synced_count += len(new)
+        self.new_feedback_count += len(feedback_rows)
+        self.matched_client_names.update(e.client_name for e in new if e.client_name)
+
+    async def record_failures(self) -> None:
+        """Store the run's failed messages so they stop holding back the
+        history cursor; they are retried until ``GMAIL_SYNC_MAX_ATTEMPTS``."""
+        if not self.failed:
+            return
+        stmt = insert(GmailProcessedMessage).values([
+            {"gmail_message_id": message_id, "error": error, "failed_attempts": 1}
+            for message_id, error in self.failed.items()
+        ])
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[GmailProcessedMessage.gmail_message_id],
+                set_={
+                    "error": stmt.excluded.error,
+                    "failed_attempts": GmailProcessedMessage.failed_attempts + 1,
+                    "processed_at": func.now(),
+                },
+                # Never overwrite a message a concurrent sync has ingested
+                where=GmailProcessedMessage.error.isnot(None),
+            )
+        )
 
 
 # ---------------------------------------------------------------------------
@@ -146,7 +695,7 @@ def authorize_url() -> str:
     return auth_url
 
 
-def handle_callback(code: str) -> dict[str, Any]:
+async def handle_callback(db: AsyncSession, code: str) -> dict[str, Any]:
     """Exchange an authorization code for tokens and persist them.
 
     Returns a dict with ``email`` (if available) and ``success`` flag.
@@ -165,10 +714,13 @@ def handle_callback(code: str) -> dict[str, Any]:
     except Exception:
         logger.warning("Could not fetch user email after OAuth callback")
 
-    # Update sync status with the connected account
-    status = _load_sync_status()
-    status["email"] = email
-    _save_sync_status(status)
+    # Record the connected account; a different account starts a fresh sync
+    state = await _get_sync_state(db)
+    if state.email != email:
+        state.history_id = None
+        state.cursor_at = None
+    state.email = email
+    await db.flush()
 
     return {"success": True, "email": email}
 
@@ -188,211 +740,139 @@ async def sync_emails(
     client_id:
         If provided, only create feedback for emails matching this client.
     max_results:
-        Maximum number of Gmail messages to retrieve.
+        Maximum number of unprocessed Gmail messages to ingest; failed
+        messages are retried with any room left.
 
     Returns
     -------
-    dict with keys: synced_count, new_feedback_count, matched_clients, errors
+    dict with keys: synced_count, skipped_count, new_feedback_count,
+    matched_clients, errors, stages (per-stage pipeline metrics)
     """
     creds = _load_credentials()
     if not creds or not creds.valid:
         raise ValueError("Gmail is not connected. Please authorize first.")
 
-    service = build("gmail", "v1", credentials=creds)
+    service = _gmail_service(creds)
+    state = await _get_sync_state(db)
 
-    # --- Fetch message list ---------------------------------------------------
-    results = (
-        service.users()
-        .messages()
-        .list(userId="me", maxResults=max_results, q="in:inbox")
-        .execute()
+    if settings.GMAIL_PUSH_TOPIC:
+        try:
+            await asyncio.to_thread(_ensure_watch, service, state)
+        except Exception:
+            logger.exception("Failed to renew the Gmail watch")
+
+    # --- Fetch new message ids since the last sync -----------------------------
+    started_at = datetime.now(timezone.utc)
+    message_ids, latest_history_id = await _list_new_message_ids(
+        db, service, state, max_results
     )
-    messages = results.get("messages", [])
 
-    # --- Build contact-email -> client lookup --------------------------------
-    contact_query = select(Contact.email, Contact.client_id, Contact.name).where(
-        Contact.email.isnot(None)
+    # Skip messages that have already been ingested or have used up their
+    # attempts, before capping the run, so a backlog of processed ids can
+    # never fill the whole run
+    already_processed = await _processed_ids(db, message_ids)
+    new_ids = [m for m in message_ids if m not in already_processed]
+    complete = len(new_ids) <= max_results
+
+    # Failed messages are retried with whatever room is left in the run
+    retry_ids: list[str] = []
+    if len(new_ids) < max_results:
+        retry_ids = list(
+            (
+                await db.execute(
+                    select(GmailProcessedMessage.gmail_message_id)
+                    .where(
+                        GmailProcessedMessage.error.isnot(None),
+                        GmailProcessedMessage.failed_attempts
+                        < settings.GMAIL_SYNC_MAX_ATTEMPTS,
+                    )
+                    .order_by(GmailProcessedMessage.processed_at)
+                    .limit(max_results - len(new_ids))
+                )
+            ).scalars()
+        )
+    pending_ids = new_ids[:max_results] + retry_ids
+    skipped_count = len(message_ids) - len(new_ids)
+
+    contacts = await get_contact_index(db)
+
+    # --- Run the ingestion pipeline ------------------------------------------
+    ingest = _Ingest(db, service, creds, client_id, contacts)
+    ingest.skipped_count = skipped_count
+    pipeline = ingest.pipeline()
+    await pipeline.run(pending_ids)
+    await ingest.record_failures()
+    stages = pipeline.metrics()
+    logger.info(
+        "Gmail sync: %d new, %d skipped, %d errors in %.2fs (%s)",
+        ingest.synced_count,
+        ingest.skipped_count,
+        len(ingest.errors),
+        pipeline.elapsed,
+        ", ".join(f"{m['name']} {m['throughput_per_second']}/s" for m in stages),
     )
-    if client_id:
-        contact_query = contact_query.where(Contact.client_id == client_id)
-    contact_rows = (await db.execute(contact_query)).all()
-    email_to_client: dict[str, UUID] = {}
-    email_to_contact_name: dict[str, str] = {}
-    for row in contact_rows:
-        if row.email:
-            normalised = row.email.strip().lower()
-            email_to_client[normalised] = row.client_id
-            email_to_contact_name[normalised] = row.name
-
-    # Pre-load client names for matched IDs
-    if email_to_client:
-        client_ids = list(set(email_to_client.values()))
-        client_rows = (
-            await db.execute(
-                select(Client.id, Client.name).where(Client.id.in_(client_ids))
-            )
-        ).all()
-        client_id_to_name: dict[UUID, str] = {r.id: r.name for r in client_rows}
-    else:
-        client_id_to_name = {}
-
-    # --- Fetch active projects per client (for AI context) -------------------
-    if email_to_client:
-        project_rows = (
-            await db.execute(
-                select(Project.id, Project.client_id, Project.name, Project.status)
-                .where(Project.client_id.in_(list(set(email_to_client.values()))))
-                .where(Project.status.in_(["planning", "in_progress"]))
-            )
-        ).all()
-        client_projects: dict[UUID, list[dict]] = {}
-        for p in project_rows:
-            client_projects.setdefault(p.client_id, []).append(
-                {"id": str(p.id), "name": p.name, "status": p.status}
-            )
-    else:
-        client_projects = {}
 
-    # --- Process each message ------------------------------------------------
-    synced_emails: list[dict[str, Any]] = []
-    matched_client_names: set[str] = set()
-    new_feedback_count = 0
-    errors: list[str] = []
+    # --- Update sync state ---------------------------------------------------
+    # The cursor advances once every new message has been ingested or
+    # recorded as failed (failed ones are retried from their rows).  A
+    # client-filtered or capped run, or one the AI budget cut short, leaves
+    # the rest for the next sync; already ingested messages are skipped.
+    # That includes a run listing the backlog of an expired cursor: the old
+    # cursor is kept until the backlog has been drained.
+    if complete and client_id is None and not ingest.deferred:
+        state.history_id = latest_history_id
+        state.cursor_at = started_at
+    state.last_sync_at = datetime.now(timezone.utc)
+    state.total_synced = (state.total_synced or 0) + ingest.synced_count
+    await db.flush()
 
-    for msg_meta in messages:
-        msg_id = msg_meta["id"]
-        try:
-            msg = (
-                service.users()
-                .messages()
-                .get(userId="me", id=msg_id, format="full")
-                .execute()
-            )
-            headers = {
-                h["name"].lower(): h["value"]
-                for h in msg.get("payload", {}).get("headers", [])
-            }
-            subject = headers.get("subject", "(no subject)")
-            from_header = headers.get("from", "")
-            date_header = headers.get("date", "")
-
-            # Parse sender email
-            _, sender_email = parseaddr(from_header)
-            sender_email_lower = sender_email.strip().lower()
+    return {
+        "synced_count": ingest.synced_count,
+        "skipped_count": ingest.skipped_count,
+        "new_feedback_count": ingest.new_feedback_count,
+        "matched_clients": sorted(ingest.matched_client_names),
+        "errors": ingest.errors,
+        "stages": stages,
+    }
 
-            # Parse date
-            email_date: Optional[datetime] = None
-            try:
-                email_date = parsedate_to_datetime(date_header)
-            except Exception:
-                email_date = datetime.now(timezone.utc)
 
-            # Extract body text
-            body_text = _extract_body(msg.get("payload", {}))
+def is_connected() -> bool:
+    """True if valid Gmail credentials are stored."""
+    creds = _load_credentials()
+    return creds is not None and creds.valid
 
-            # --- Match to CRM client ----------------------------------------
-            matched_cid = email_to_client.get(sender_email_lower)
-            matched_name = (
-                client_id_to_name.get(matched_cid) if matched_cid else None
-            )
 
-            # If filtering by client_id, skip unmatched
-            if client_id and matched_cid != client_id:
-                synced_emails.append(
-                    {
-                        "id": msg_id,
-                        "subject": subject,
-                        "from_email": sender_email,
-                        "date": email_date.isoformat() if email_date else None,
-                        "client_name": None,
-                        "sentiment": None,
-                        "topics": [],
-                        "created_feedback_id": None,
-                    }
-                )
-                continue
-
-            if matched_cid:
-                matched_client_names.add(matched_name or "Unknown")
-
-            # --- AI analysis -------------------------------------------------
-            analysis: dict[str, Any] = {}
-            if matched_cid and body_text.strip():
-                projects_ctx = client_projects.get(matched_cid, [])
-                analysis = await _analyze_email(
-                    subject=subject,
-                    body=body_text,
-                    sender=from_header,
-                    client_name=matched_name or "Unknown",
-                    projects=projects_ctx,
-                )
+async def run_sync_job(
+    client_id: Optional[UUID] = None, max_results: Optional[int] = None
+) -> dict[str, Any]:
+    """Background-job entry point: sync in a session of its own and commit."""
+    async with async_session_factory() as db:
+        result = await sync_emails(
+            db,
+            client_id=client_id,
+            max_results=max_results or settings.GMAIL_SYNC_MAX_RESULTS,
+        )
+        await db.commit()
+    return result
 
-            # --- Create FeedbackEvent if matched -----------------------------
-            created_feedback_id: Optional[UUID] = None
-            if matched_cid and body_text.strip():
-                sentiment_val = analysis.get("sentiment", "neutral")
-                topics_val = analysis.get("topics", [])
-                project_match_name = analysis.get("project_name")
-                is_actionable = analysis.get("is_actionable", False)
-
-                # Try to resolve project_id from name
-                resolved_project_id: Optional[UUID] = None
-                if project_match_name and matched_cid in client_projects:
-                    for proj in client_projects[matched_cid]:
-                        if proj["name"].lower() == project_match_name.lower():
-                            resolved_project_id = UUID(proj["id"])
-                            break
-
-                feedback = FeedbackEvent(
-                    client_id=matched_cid,
-                    project_id=resolved_project_id,
-                    source="email",
-                    date=email_date.date() if email_date else date.today(),
-                    raw_text=f"Subject: {subject}\n\n{body_text[:5000]}",
-                    sentiment=sentiment_val,
-                    topics=topics_val if topics_val else None,
-                    extracted_requirements=analysis.get(
-                        "extracted_requirements"
-                    ),
-                    severity=analysis.get("severity", "info"),
-                )
-                db.add(feedback)
-                await db.flush()
-                created_feedback_id = feedback.id
-                new_feedback_count += 1
-
-            synced_emails.append(
-                {
-                    "id": msg_id,
-                    "subject": subject,
-                    "from_email": sender_email,
-                    "date": email_date.isoformat() if email_date else None,
-                    "client_name": matched_name,
-                    "sentiment": analysis.get("sentiment"),
-                    "topics": analysis.get("topics", []),
-                    "created_feedback_id": (
-                        str(created_feedback_id) if created_feedback_id else None
-                    ),
-                }
-            )
 
-        except Exception as exc:
-            logger.exception("Error processing Gmail message %s", msg_id)
-            errors.append(f"Message {msg_id}: {exc}")
+async def handle_push(db: AsyncSession, payload: dict[str, Any]) -> bool:
+    """Decode a Gmail push notification (a Pub/Sub push message).
 
-    # --- Update sync status --------------------------------------------------
-    status = _load_sync_status()
-    status["last_sync_at"] = datetime.now(timezone.utc).isoformat()
-    status["total_synced"] = status.get("total_synced", 0) + len(messages)
-    status["last_synced_emails"] = synced_emails
-    _save_sync_status(status)
+    Returns True if it reports changes past the stored history id, i.e. a
+    sync should run.
+    """
+    try:
+        data = json.loads(base64.b64decode(payload["message"]["data"]))
+        history_id = int(data["historyId"])
+    except (KeyError, TypeError, ValueError):
+        logger.warning("Ignoring malformed Gmail push notification")
+        return False
 
-    return {
-        "synced_count": len(messages),
-        "new_feedback_count": new_feedback_count,
-        "matched_clients": sorted(matched_client_names),
-        "errors": errors,
-    }
+    state = await db.get(GmailSyncState, _SYNC_STATE_ID)
+    if state is None or (state.email and data.get("emailAddress") != state.email):
+        return False
+    return state.history_id is None or history_id > state.history_id
 
 
 async def get_sync_status(db: AsyncSession) -> dict[str, Any]:
@@ -401,10 +881,9 @@ async def get_sync_status(db: AsyncSession) -> dict[str, Any]:
     Parameters
     ----------
     db:
-        Async database session (used to count total feedback from email source).
+        Async database session.
     """
-    creds = _load_credentials()
-    status = _load_sync_status()
+    state = await db.get(GmailSyncState, _SYNC_STATE_ID)
 
     # Count total email-sourced feedback in DB
     result = await db.execute(
@@ -415,18 +894,40 @@ async def get_sync_status(db: AsyncSession) -> dict[str, Any]:
     db_email_count = result.scalar() or 0
 
     return {
-        "connected": creds is not None and creds.valid if creds else False,
-        "email": status.get("email"),
-        "last_sync_at": status.get("last_sync_at"),
-        "total_synced": status.get("total_synced", 0),
+        "connected": is_connected(),
+        "email": state.email if state else None,
+        "last_sync_at": state.last_sync_at if state else None,
+        "total_synced": state.total_synced if state else 0,
         "total_feedback_from_email": db_email_count,
     }
 
 
-def get_synced_emails() -> list[dict[str, Any]]:
-    """Return the list of emails from the last sync operation."""
-    status = _load_sync_status()
-    return status.get("last_synced_emails", [])
+async def get_synced_emails(
+    db: AsyncSession, limit: int = RECENT_EMAILS_LIMIT
+) -> list[dict[str, Any]]:
+    """Return the most recently ingested emails, newest first."""
+    rows = (
+        await db.execute(
+            select(GmailProcessedMessage, Client.name)
+            .outerjoin(Client, Client.id == GmailProcessedMessage.client_id)
+            .where(GmailProcessedMessage.error.is_(None))
+            .order_by(GmailProcessedMessage.processed_at.desc())
+            .limit(limit)
+        )
+    ).all()
+    return [
+        {
+            "id": message.gmail_message_id,
+            "subject": message.subject,
+            "from_email": message.from_email,
+            "date": message.email_date,
+            "client_name": client_name,
+            "sentiment": message.sentiment,
+            "topics": message.topics or [],
+            "created_feedback_id": message.feedback_event_id,
+        }
+        for message, client_name in rows
+    ]
 
 
 # ---------------------------------------------------------------------------
@@ -434,41 +935,6 @@ def get_synced_emails() -> list[dict[str, Any]]:
 # ---------------------------------------------------------------------------
 
 
-def _extract_body(payload: dict[str, Any]) -> str:
-    """Recursively extract plain-text body from a Gmail message payload."""
-    mime_type = payload.get("mimeType", "")
-    parts = payload.get("parts", [])
-
-    if mime_type == "text/plain" and "body" in payload:
-        data = payload["body"].get("data", "")
-        if data:
-            return base64.urlsafe_b64decode(data).decode("utf-8", errors="replace")
-
-    if parts:
-        # Prefer text/plain, fall back to text/html
-        for part in parts:
-            if part.get("mimeType") == "text/plain":
-                text = _extract_body(part)
-                if text:
-                    return text
-        for part in parts:
-            text = _extract_body(part)
-            if text:
-                return text
-
-    if "body" in payload:
-        data = payload["body"].get("data", "")
-        if data:
-            raw = base64.urlsafe_b64decode(data).decode("utf-8", errors="replace")
-            # Strip HTML tags if the body is HTML
-            if mime_type == "text/html":
-                raw = re.sub(r"<[^>]+>", " ", raw)
-                raw = re.sub(r"\s+", " ", raw).strip()
-            return raw
-
-    return ""
-
-
 async def _analyze_email(
     *,
     subject: str,
@@ -581,6 +1047,9 @@ async def _analyze_email(
             json_schema=json_schema,
         )
         return result
+    except AIBudgetExceededError:
+        # Leave the message unprocessed; it is retried on a later sync
+        raise
     except Exception:
         logger.exception("AI analysis of email failed")
         return {
@@ -8,20 +8,48 @@ Calculates a client's health score (0-100) based on:
 - Inactivity penalty (no feedback or project activity in 60+ days)
 
 Saves the computed score to health_score_history and updates client.health_score.
+
+The factor inputs are kept per client in ``client_health_aggregates``, so
+scoring a client reads one row.  Feedback, project and milestone writes
+apply their change to the row and rescore the client
+(:func:`feedback_changed`, :func:`projects_changed`).  The daily
+``health_aggregate_sweep`` job rebuilds every row from the source tables
+with one grouped query, which moves the feedback window forward and
+corrects any drift; the ``health_score_recalculation`` job does the same
+and also records history.  A row whose window is behind (the sweep did not
+run) is rebuilt before it is scored or changed, so scores never depend on
+the scheduler.
 """
 
 from __future__ import annotations
 
 import logging
-from datetime import datetime, timedelta, timezone
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, select
+from sqlalchemy import (
+    Integer,
+    Select,
+    and_,
+    column,
+    func,
+    insert,
+    literal,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import async_session_factory
 from app.models import (
     Client,
+    ClientHealthAggregate,
     FeedbackEvent,
     HealthScoreHistory,
     Project,
@@ -42,138 +70,129 @@ INACTIVITY_PENALTY = 15
 FEEDBACK_LOOKBACK_DAYS = 90
 
 
-async def calculate_health_score(
-    db: AsyncSession,
-    client_id: UUID,
-) -> dict:
-    """Calculate and persist a health score for the given client.
+# Clients per multi-row INSERT / UPDATE ... FROM (VALUES ...) statement
+_WRITE_BATCH_SIZE = 1000
 
-    Returns a dict with score, factors breakdown, and recorded_at timestamp.
-    """
-    # Verify client
-    result = await db.execute(select(Client).where(Client.id == client_id))
-    client = result.scalars().first()
-    if client is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Client {client_id} not found.",
-        )
+# ClientHealthAggregate columns that hold factor inputs
+_AGGREGATE_COLUMNS = (
+    "positive",
+    "negative",
+    "neutral",
+    "critical",
+    "major",
+    "delayed_milestones",
+    "latest_feedback",
+    "latest_project",
+)
 
-    now = datetime.now(timezone.utc)
-    lookback = now - timedelta(days=FEEDBACK_LOOKBACK_DAYS)
-
-    # --- Factor 1: Recent feedback sentiment ---
-    fb_result = await db.execute(
-        select(FeedbackEvent).where(
-            FeedbackEvent.client_id == client_id,
-            FeedbackEvent.date >= lookback.date(),
-            FeedbackEvent.sentiment.isnot(None),
+
+# ---------------------------------------------------------------------------
+# Factors
+# ---------------------------------------------------------------------------
+
+
+def _window_start(now: datetime) -> date:
+    return (now - timedelta(days=FEEDBACK_LOOKBACK_DAYS)).date()
+
+
+def _project_factors(client_ids: Optional[Iterable[UUID]] = None) -> Select:
+    """Delayed milestones and latest project activity per client."""
+    stmt = (
+        select(
+            Project.client_id,
+            func.count(ProjectMilestone.id)
+            .filter(Project.status == "in_progress", ProjectMilestone.status == "delayed")
+            .label("delayed_milestones"),
+            func.max(Project.updated_at).label("latest_project"),
         )
+        .select_from(Project)
+        .outerjoin(ProjectMilestone, ProjectMilestone.project_id == Project.id)
+        .group_by(Project.client_id)
     )
-    recent_feedback = list(fb_result.scalars().all())
-
-    sentiment_adjustment = 0
-    positive_count = 0
-    negative_count = 0
-    neutral_count = 0
-
-    for fb in recent_feedback:
-        if fb.sentiment == "positive":
-            positive_count += 1
-            sentiment_adjustment += 5
-        elif fb.sentiment == "negative":
-            negative_count += 1
-            sentiment_adjustment -= 8
-        else:
-            neutral_count += 1
-
-    # Cap the sentiment impact
-    sentiment_adjustment = max(-SENTIMENT_CAP, min(SENTIMENT_CAP, sentiment_adjustment))
+    if client_ids is not None:
+        stmt = stmt.where(Project.client_id.in_(client_ids))
+    return stmt
 
-    # --- Factor 2: Unresolved critical/major feedback ---
-    unresolved_result = await db.execute(
-        select(func.count(FeedbackEvent.id)).where(
-            FeedbackEvent.client_id == client_id,
-            FeedbackEvent.status.in_(["new"]),
-            FeedbackEvent.severity.in_(["critical", "major"]),
-        )
+
+def _factors_query(now: datetime, client_ids: Optional[Iterable[UUID]] = None) -> Select:
+    """One grouped statement returning every factor input per client.
+
+    Feedback counts and project/milestone figures are aggregated in two
+    CTEs with FILTER clauses and left-joined onto clients.  Without
+    ``client_ids`` it covers every client that is not soft-deleted.
+    """
+    if client_ids is not None:
+        client_ids = list(client_ids)
+    recent = and_(
+        FeedbackEvent.date >= _window_start(now), FeedbackEvent.sentiment.isnot(None)
     )
-    unresolved_critical_major = unresolved_result.scalar() or 0
-
-    unresolved_penalty = 0
-    # Count critical vs major separately for more granular penalty
-    critical_result = await db.execute(
-        select(func.count(FeedbackEvent.id)).where(
-            FeedbackEvent.client_id == client_id,
-            FeedbackEvent.status == "new",
-            FeedbackEvent.severity == "critical",
+    unresolved = FeedbackEvent.status == "new"
+
+    feedback = select(
+        FeedbackEvent.client_id,
+        func.count().filter(recent, FeedbackEvent.sentiment == "positive").label("positive"),
+        func.count().filter(recent, FeedbackEvent.sentiment == "negative").label("negative"),
+        func.count()
+        .filter(recent, FeedbackEvent.sentiment.notin_(["positive", "negative"]))
+        .label("neutral"),
+        func.count().filter(unresolved, FeedbackEvent.severity == "critical").label("critical"),
+        func.count().filter(unresolved, FeedbackEvent.severity == "major").label("major"),
+        func.max(FeedbackEvent.created_at).label("latest_feedback"),
+    ).group_by(FeedbackEvent.client_id)
+
+    if client_ids is not None:
+        feedback = feedback.where(FeedbackEvent.client_id.in_(client_ids))
+    feedback_cte = feedback.cte("feedback")
+    projects_cte = _project_factors(client_ids).cte("projects")
+
+    stmt = (
+        select(
+            Client.id,
+            Client.health_score,
+            func.coalesce(feedback_cte.c.positive, 0).label("positive"),
+            func.coalesce(feedback_cte.c.negative, 0).label("negative"),
+            func.coalesce(feedback_cte.c.neutral, 0).label("neutral"),
+            func.coalesce(feedback_cte.c.critical, 0).label("critical"),
+            func.coalesce(feedback_cte.c.major, 0).label("major"),
+            func.coalesce(projects_cte.c.delayed_milestones, 0).label("delayed_milestones"),
+            feedback_cte.c.latest_feedback,
+            projects_cte.c.latest_project,
         )
+        .outerjoin(feedback_cte, feedback_cte.c.client_id == Client.id)
+        .outerjoin(projects_cte, projects_cte.c.client_id == Client.id)
     )
-    critical_count = critical_result.scalar() or 0
+    if client_ids is not None:
+        return stmt.where(Client.id.in_(client_ids))
+    return stmt.where(Client.deleted_at.is_(None))
 
-    major_result = await db.execute(
-        select(func.count(FeedbackEvent.id)).where(
-            FeedbackEvent.client_id == client_id,
-            FeedbackEvent.status == "new",
-            FeedbackEvent.severity == "major",
-        )
-    )
-    major_count = major_result.scalar() or 0
 
-    unresolved_penalty = (critical_count * CRITICAL_PENALTY) + (
-        major_count * MAJOR_PENALTY
-    )
+def _score(row: Any, now: datetime) -> tuple[int, dict]:
+    """Health score and factor breakdown from a :class:`ClientHealthAggregate`
+    (or any row with the same factor attributes)."""
+    # --- Factor 1: Recent feedback sentiment (capped) ---
+    sentiment_adjustment = row.positive * 5 - row.negative * 8
+    sentiment_adjustment = max(-SENTIMENT_CAP, min(SENTIMENT_CAP, sentiment_adjustment))
+
+    # --- Factor 2: Unresolved critical/major feedback ---
+    unresolved_penalty = row.critical * CRITICAL_PENALTY + row.major * MAJOR_PENALTY
 
     # --- Factor 3: Project delays ---
-    delayed_result = await db.execute(
-        select(func.count(ProjectMilestone.id))
-        .join(Project, ProjectMilestone.project_id == Project.id)
-        .where(
-            Project.client_id == client_id,
-            Project.status == "in_progress",
-            ProjectMilestone.status == "delayed",
-        )
-    )
-    delayed_milestones = delayed_result.scalar() or 0
     delay_penalty = min(
-        delayed_milestones * DELAY_PENALTY_PER_MILESTONE, DELAY_PENALTY_CAP
+        row.delayed_milestones * DELAY_PENALTY_PER_MILESTONE, DELAY_PENALTY_CAP
     )
 
     # --- Factor 4: Inactivity ---
-    inactivity_cutoff = now - timedelta(days=INACTIVITY_THRESHOLD_DAYS)
-
-    latest_fb_result = await db.execute(
-        select(func.max(FeedbackEvent.created_at)).where(
-            FeedbackEvent.client_id == client_id
-        )
-    )
-    latest_fb_date = latest_fb_result.scalar()
-
-    latest_project_result = await db.execute(
-        select(func.max(Project.updated_at)).where(
-            Project.client_id == client_id
-        )
-    )
-    latest_project_date = latest_project_result.scalar()
-
-    latest_activity = None
-    if latest_fb_date and latest_project_date:
-        latest_activity = max(latest_fb_date, latest_project_date)
-    elif latest_fb_date:
-        latest_activity = latest_fb_date
-    elif latest_project_date:
-        latest_activity = latest_project_date
-
+    activity = [d for d in (row.latest_feedback, row.latest_project) if d is not None]
+    latest_activity = max(activity) if activity else None
     inactivity_penalty_value = 0
     if latest_activity is None:
         inactivity_penalty_value = INACTIVITY_PENALTY
     else:
         if latest_activity.tzinfo is None:
             latest_activity = latest_activity.replace(tzinfo=timezone.utc)
-        if latest_activity < inactivity_cutoff:
+        if latest_activity < now - timedelta(days=INACTIVITY_THRESHOLD_DAYS):
             inactivity_penalty_value = INACTIVITY_PENALTY
 
-    # --- Calculate final score ---
     score = BASE_SCORE + sentiment_adjustment - unresolved_penalty - delay_penalty - inactivity_penalty_value
     score = max(0, min(100, score))
 
@@ -181,21 +200,224 @@ async def calculate_health_score(
         "base_score": BASE_SCORE,
         "sentiment_adjustment": sentiment_adjustment,
         "sentiment_detail": {
-            "positive": positive_count,
-            "neutral": neutral_count,
-            "negative": negative_count,
-            "total_recent": len(recent_feedback),
+            "positive": row.positive,
+            "neutral": row.neutral,
+            "negative": row.negative,
+            "total_recent": row.positive + row.neutral + row.negative,
         },
         "unresolved_penalty": unresolved_penalty,
         "unresolved_detail": {
-            "critical": critical_count,
-            "major": major_count,
+            "critical": row.critical,
+            "major": row.major,
         },
         "delay_penalty": delay_penalty,
-        "delayed_milestones": delayed_milestones,
+        "delayed_milestones": row.delayed_milestones,
         "inactivity_penalty": inactivity_penalty_value,
         "latest_activity": str(latest_activity) if latest_activity else None,
     }
+    return score, factors
+
+
+# ---------------------------------------------------------------------------
+# Aggregates
+# ---------------------------------------------------------------------------
+
+
+def feedback_snapshot(feedback: FeedbackEvent) -> dict[str, Any]:
+    """The fields of a feedback event its client's aggregates depend on."""
+    return {
+        "date": feedback.date,
+        "sentiment": feedback.sentiment,
+        "severity": feedback.severity,
+        "status": feedback.status,
+    }
+
+
+def _contribution(snapshot: Optional[dict[str, Any]], window_start: date) -> Counter[str]:
+    """What one feedback event adds to its client's aggregate counts."""
+    counts: Counter[str] = Counter()
+    if snapshot is None:
+        return counts
+    sentiment = snapshot["sentiment"]
+    if sentiment is not None and snapshot["date"] is not None and snapshot["date"] >= window_start:
+        counts[sentiment if sentiment in ("positive", "negative") else "neutral"] += 1
+    if snapshot["status"] == "new" and snapshot["severity"] in ("critical", "major"):
+        counts[snapshot["severity"]] += 1
+    return counts
+
+
+async def refresh_aggregates(
+    db: AsyncSession, client_ids: Optional[Iterable[UUID]] = None
+) -> None:
+    """Rebuild aggregates from the source tables with one
+    ``INSERT ... SELECT ... ON CONFLICT DO UPDATE``.  Without ``client_ids``
+    it covers every client that is not soft-deleted."""
+    now = datetime.now(timezone.utc)
+    factors = _factors_query(now, client_ids).subquery()
+    stmt = pg_insert(ClientHealthAggregate).from_select(
+        ["client_id", "window_start", *_AGGREGATE_COLUMNS, "updated_at"],
+        select(
+            factors.c.id,
+            literal(_window_start(now)),
+            *(factors.c[name] for name in _AGGREGATE_COLUMNS),
+            literal(now),
+        )
+        # Same lock order as _lock_aggregates
+        .order_by(factors.c.id),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ClientHealthAggregate.client_id],
+        set_={
+            name: stmt.excluded[name]
+            for name in ("window_start", *_AGGREGATE_COLUMNS, "updated_at")
+        },
+    )
+    await db.execute(stmt)
+
+
+async def _lock_aggregates(
+    db: AsyncSession, client_ids: set[UUID]
+) -> tuple[dict[UUID, ClientHealthAggregate], set[UUID]]:
+    """Lock the aggregates of ``client_ids``, building missing ones and
+    rebuilding those whose sentiment window is behind (the daily sweep has
+    not run), so deltas are never applied to counts that should have aged.
+
+    Returns the rows by client and the ids that were just built; those
+    already reflect every flushed write.
+    """
+    window_start = _window_start(datetime.now(timezone.utc))
+    stmt = (
+        select(ClientHealthAggregate)
+        .order_by(ClientHealthAggregate.client_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    aggregates = {
+        a.client_id: a
+        for a in (
+            await db.execute(stmt.where(ClientHealthAggregate.client_id.in_(client_ids)))
+        ).scalars()
+    }
+    rebuild = client_ids - {
+        client_id
+        for client_id, aggregate in aggregates.items()
+        if aggregate.window_start >= window_start
+    }
+    if rebuild:
+        await refresh_aggregates(db, rebuild)
+        aggregates.update(
+            (a.client_id, a)
+            for a in (
+                await db.execute(stmt.where(ClientHealthAggregate.client_id.in_(rebuild)))
+            ).scalars()
+        )
+    return aggregates, rebuild
+
+
+async def _write_scores(db: AsyncSession, scores: list[tuple[UUID, int]]) -> None:
+    """Set ``(client_id, score)`` pairs with one ``UPDATE ... FROM (VALUES ...)``,
+    skipping clients whose score is unchanged."""
+    if not scores:
+        return
+    rows = values(
+        column("id", PG_UUID(as_uuid=True)),
+        column("score", Integer),
+        name="scores",
+    ).data(scores)
+    await db.execute(
+        update(Client)
+        .where(Client.id == rows.c.id, Client.health_score != rows.c.score)
+        .values(health_score=rows.c.score)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _rescore(
+    db: AsyncSession, aggregates: Iterable[ClientHealthAggregate], now: datetime
+) -> None:
+    await _write_scores(db, [(a.client_id, _score(a, now)[0]) for a in aggregates])
+
+
+async def feedback_changed(
+    db: AsyncSession,
+    changes: Iterable[tuple[UUID, Optional[dict[str, Any]], Optional[dict[str, Any]]]],
+) -> None:
+    """Apply flushed feedback writes to their clients' aggregates and scores.
+
+    Each change is ``(client_id, before, after)`` with
+    :func:`feedback_snapshot` values; ``before`` is None for a new event
+    and ``after`` for a deleted one.  Deletes do not move
+    ``latest_feedback`` back; the sweep does.
+    """
+    changes = list(changes)
+    if not changes:
+        return
+    now = datetime.now(timezone.utc)
+    aggregates, built = await _lock_aggregates(db, {change[0] for change in changes})
+    for client_id, before, after in changes:
+        aggregate = aggregates.get(client_id)
+        if aggregate is None or client_id in built:
+            continue
+        delta = _contribution(after, aggregate.window_start)
+        delta.subtract(_contribution(before, aggregate.window_start))
+        for name, count in delta.items():
+            if count:
+                setattr(aggregate, name, max(0, getattr(aggregate, name) + count))
+        if before is None and after is not None:
+            aggregate.latest_feedback = now
+        aggregate.updated_at = now
+    await db.flush()
+    await _rescore(db, aggregates.values(), now)
+
+
+async def projects_changed(db: AsyncSession, client_ids: Iterable[UUID]) -> None:
+    """Recount delayed milestones and project activity for ``client_ids``
+    after flushed project or milestone writes, and rescore them."""
+    now = datetime.now(timezone.utc)
+    aggregates, built = await _lock_aggregates(db, set(client_ids))
+    stale = aggregates.keys() - built
+    if stale:
+        rows = {
+            row.client_id: row
+            for row in (await db.execute(_project_factors(stale))).all()
+        }
+        for client_id in stale:
+            aggregate, row = aggregates[client_id], rows.get(client_id)
+            aggregate.delayed_milestones = row.delayed_milestones if row else 0
+            aggregate.latest_project = row.latest_project if row else None
+            aggregate.updated_at = now
+        await db.flush()
+    await _rescore(db, aggregates.values(), now)
+
+
+# ---------------------------------------------------------------------------
+# Calculation
+# ---------------------------------------------------------------------------
+
+
+async def calculate_health_score(
+    db: AsyncSession,
+    client_id: UUID,
+) -> dict:
+    """Calculate and persist a health score for the given client.
+
+    Returns a dict with score, factors breakdown, and recorded_at timestamp.
+    """
+    now = datetime.now(timezone.utc)
+    aggregate = await db.get(ClientHealthAggregate, client_id)
+    # Rebuild a missing row, or one whose window the daily sweep has not
+    # moved on, so old feedback ages out as in a from-scratch calculation
+    if aggregate is None or aggregate.window_start < _window_start(now):
+        await refresh_aggregates(db, [client_id])
+        aggregate = await db.get(
+            ClientHealthAggregate, client_id, populate_existing=True
+        )
+    if aggregate is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Client {client_id} not found.",
+        )
+    score, factors = _score(aggregate, now)
 
     # Save to history
     history_entry = HealthScoreHistory(
@@ -206,7 +428,9 @@ async def calculate_health_score(
     db.add(history_entry)
 
     # Update client
-    client.health_score = score
+    await db.execute(
+        update(Client).where(Client.id == client_id).values(health_score=score)
+    )
     await db.flush()
     await db.refresh(history_entry)
 
@@ -218,6 +442,67 @@ async def calculate_health_score(
     }
 
 
+async def recalculate_all_health_scores(
+    db: AsyncSession, *, record_history: bool = True
+) -> dict[str, Any]:
+    """Rebuild every client's aggregates and persist the changed scores.
+
+    The aggregates are rebuilt with one grouped ``INSERT ... SELECT`` and
+    read back with one join; history rows are written with a multi-row
+    INSERT and scores with an ``UPDATE ... FROM (VALUES ...)`` (per
+    ``_WRITE_BATCH_SIZE`` clients), so the cost does not grow in round
+    trips with the number of clients.
+    """
+    now = datetime.now(timezone.utc)
+    await refresh_aggregates(db)
+    rows = (
+        await db.execute(
+            select(
+                Client.id,
+                Client.health_score,
+                *(getattr(ClientHealthAggregate, name) for name in _AGGREGATE_COLUMNS),
+            )
+            .join(ClientHealthAggregate, ClientHealthAggregate.client_id == Client.id)
+            .where(Client.deleted_at.is_(None))
+        )
+    ).all()
+    scored = [(row, *_score(row, now)) for row in rows]
+
+    changed = 0
+    for start in range(0, len(scored), _WRITE_BATCH_SIZE):
+        batch = scored[start:start + _WRITE_BATCH_SIZE]
+        if record_history:
+            await db.execute(
+                insert(HealthScoreHistory).values([
+                    {"client_id": row.id, "score": score, "factors": factors, "recorded_at": now}
+                    for row, score, factors in batch
+                ])
+            )
+        updates = [(row.id, score) for row, score, _ in batch if row.health_score != score]
+        await _write_scores(db, updates)
+        changed += len(updates)
+
+    logger.info(f"Recalculated {len(scored)} health scores ({changed} changed)")
+    return {"client_count": len(scored), "changed_count": changed, "recorded_at": now}
+
+
+async def run_recalculation_job() -> dict[str, Any]:
+    """Background-job entry point: recalculate every score and commit."""
+    async with async_session_factory() as db:
+        result = await recalculate_all_health_scores(db)
+        await db.commit()
+    return result
+
+
+async def run_sweep_job() -> dict[str, Any]:
+    """Background-job entry point for the daily aggregate sweep: rebuild
+    every aggregate and update changed scores without recording history."""
+    async with async_session_factory() as db:
+        result = await recalculate_all_health_scores(db, record_history=False)
+        await db.commit()
+    return result
+
+
 async def get_health_history(
     db: AsyncSession,
     client_id: UUID,
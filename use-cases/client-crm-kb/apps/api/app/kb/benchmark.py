@@ -0,0 +1,114 @@
+"""
+Benchmark indexed KB search against the old ``ILIKE`` scan.
+
+Seeds synthetic patterns (1M by default) inside a transaction, times both
+queries with ``EXPLAIN ANALYZE`` and rolls everything back, so it can be
+pointed at a development database without leaving data behind.  Requires
+the ``8b4e6d2a9f15`` migration (search columns and indexes).
+
+Usage::
+
+    DATABASE_URL=postgresql+asyncpg://... python -m app.kb.benchmark --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+
+from sqlalchemy import or_, select, text
+
+from app.database import engine
+from app.kb.search import pattern_search
+from app.models import Pattern
+
+_WORDS = (
+    "brand tone headline visual layout colour logo copy campaign launch "
+    "social video banner email newsletter legal claim pricing offer "
+    "audience persona feedback revision deadline approval photography"
+).split()
+
+_WORD_ARRAY = "ARRAY[" + ", ".join(f"'{w}'" for w in _WORDS) + "]"
+
+_SEED_SQL = text(
+    f"""
+    INSERT INTO patterns (id, scope, name, description, category, usage_count)
+    SELECT
+        gen_random_uuid(),
+        'global',
+        'Pattern ' || g || ' ' || w[1 + g % {len(_WORDS)}],
+        w[1 + (g * 7) % {len(_WORDS)}] || ' ' || w[1 + (g * 13) % {len(_WORDS)}]
+            || ' ' || w[1 + (g * 31) % {len(_WORDS)}] || ' guidance for item ' || g,
+        'best_practice',
+        g % 100
+    FROM generate_series(1, :rows) AS g, (SELECT {_WORD_ARRAY} AS w) AS words
+    """
+)
+
+
+def _ilike_query(q: str):
+    term = f"%{q}%"
+    return (
+        select(Pattern.id)
+        .where(or_(Pattern.name.ilike(term), Pattern.description.ilike(term)))
+        .order_by(Pattern.usage_count.desc())
+        .limit(50)
+    )
+
+
+def _indexed_query(q: str):
+    match, score = pattern_search(q)
+    return select(Pattern.id).where(match).order_by(score.desc()).limit(50)
+
+
+async def _time(conn, stmt, repeat: int) -> float:
+    """Median server-side execution time of ``stmt`` in milliseconds."""
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    timings = []
+    for _ in range(repeat):
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}", params
+        )
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        timings.append(plan[0]["Execution Time"])
+    return statistics.median(timings)
+
+
+async def run(rows: int, queries: list[str], repeat: int) -> None:
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            print(f"Seeding {rows} patterns...")
+            await conn.execute(_SEED_SQL, {"rows": rows})
+            await conn.execute(text("ANALYZE patterns"))
+
+            print(f"{'query':<20}{'ilike ms':>12}{'indexed ms':>12}")
+            for q in queries:
+                ilike_ms = await _time(conn, _ilike_query(q), repeat)
+                indexed_ms = await _time(conn, _indexed_query(q), repeat)
+                print(f"{q:<20}{ilike_ms:>12.1f}{indexed_ms:>12.1f}")
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "queries",
+        nargs="*",
+        default=["headline", "legal claim", "item 4242", "colo"],
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, args.queries, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Cached, versioned KB context bundles.
+
+Debug modules, chatbot tools and the KB export all need a client's brand
+profile, rules and applicable patterns.  :func:`get_kb_context` serves
+them from precomputed bundles instead of reloading the tables each call.
+
+A client's KB is split into two bundles:
+
+- ``client:{client_id}`` -- brand profile, rules and client-scoped
+  patterns;
+- ``shared`` -- global and segment patterns, built once and shared by
+  every client.
+
+Each bundle is keyed by its ``kb_versions`` counter, which database
+triggers bump on any write to brand_profiles, client_rules or patterns,
+so a cached bundle is never served after its data has changed.  Bundles
+are stored serialized in Redis (``kb_context:{key}:{version}``) and kept
+parsed in a small in-process LRU.
+
+Usage counts change on every use (see :mod:`app.kb.usage`) and the
+version triggers ignore them, so bundles leave them out.  Callers that
+need them ask for ``with_usage``, which reads the live counts in one
+small query and orders patterns most used first.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import BrandProfile, ClientRule, KBVersion, Pattern
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+SHARED_KEY = "shared"
+
+_REDIS_PREFIX = "kb_context:"
+
+# (bundle key, version) -> parsed bundle
+_local: OrderedDict[tuple[str, int], dict[str, Any]] = OrderedDict()
+
+
+# ---------------------------------------------------------------------------
+# Bundle builders
+# ---------------------------------------------------------------------------
+
+
+_BRAND_PROFILE_COLUMNS = (
+    BrandProfile.id,
+    BrandProfile.brand_tone,
+    BrandProfile.brand_values,
+    BrandProfile.key_messages,
+    BrandProfile.do_list,
+    BrandProfile.dont_list,
+    BrandProfile.legal_sensitivities,
+    BrandProfile.visual_rules,
+    BrandProfile.version,
+    BrandProfile.status,
+)
+
+_RULE_COLUMNS = (
+    ClientRule.id,
+    ClientRule.description,
+    ClientRule.rule_type,
+    ClientRule.applies_to,
+    ClientRule.priority,
+    ClientRule.status,
+)
+
+_PATTERN_COLUMNS = (
+    Pattern.id,
+    Pattern.scope,
+    Pattern.name,
+    Pattern.description,
+    Pattern.category,
+    Pattern.trigger_conditions,
+    Pattern.recommended_actions,
+    Pattern.applicable_channels,
+)
+
+
+async def _rows(db: AsyncSession, stmt: Any) -> list[dict[str, Any]]:
+    return [dict(row) for row in (await db.execute(stmt)).mappings()]
+
+
+async def _build_client_bundle(db: AsyncSession, client_id: UUID) -> dict[str, Any]:
+    brand_profiles = await _rows(
+        db,
+        select(*_BRAND_PROFILE_COLUMNS)
+        .where(BrandProfile.client_id == client_id)
+        .limit(1),
+    )
+    return {
+        "brand_profile": brand_profiles[0] if brand_profiles else None,
+        "rules": await _rows(
+            db,
+            select(*_RULE_COLUMNS)
+            .where(ClientRule.client_id == client_id)
+            .order_by(ClientRule.priority, ClientRule.created_at),
+        ),
+        "patterns": await _rows(
+            db,
+            select(*_PATTERN_COLUMNS)
+            .where(
+                Pattern.client_id == client_id,
+                Pattern.scope.notin_(["global", "segment"]),
+            )
+            .order_by(Pattern.created_at),
+        ),
+    }
+
+
+async def _build_shared_bundle(db: AsyncSession) -> dict[str, Any]:
+    return {
+        "patterns": await _rows(
+            db,
+            select(*_PATTERN_COLUMNS)
+            .where(Pattern.scope.in_(["global", "segment"]))
+            .order_by(Pattern.created_at),
+        ),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+
+def _remember(key: tuple[str, int], bundle: dict[str, Any]) -> None:
+    _local[key] = bundle
+    _local.move_to_end(key)
+    while len(_local) > settings.KB_CONTEXT_LOCAL_MAX_ENTRIES:
+        _local.popitem(last=False)
+
+
+async def _bundle(
+    db: AsyncSession, bundle_key: str, version: int, client_id: Optional[UUID]
+) -> dict[str, Any]:
+    """Return one bundle from the local LRU, Redis, or by building it."""
+    key = (bundle_key, version)
+    bundle = _local.get(key)
+    if bundle is not None:
+        _local.move_to_end(key)
+        return bundle
+
+    redis_key = f"{_REDIS_PREFIX}{bundle_key}:{version}"
+    try:
+        raw = await get_redis().get(redis_key)
+    except Exception:
+        logger.warning("KB context cache unavailable; loading from the database.")
+        raw = None
+
+    if raw is not None:
+        bundle = json.loads(raw)
+    else:
+        if client_id is None:
+            bundle = await _build_shared_bundle(db)
+        else:
+            bundle = await _build_client_bundle(db, client_id)
+        # Round-trip through JSON so fresh and cached bundles look the same
+        serialized = json.dumps(bundle, default=str, ensure_ascii=False)
+        bundle = json.loads(serialized)
+        try:
+            await get_redis().set(
+                redis_key, serialized, ex=settings.KB_CONTEXT_CACHE_TTL_SECONDS
+            )
+        except Exception:
+            logger.warning(f"Failed to cache KB context {bundle_key}")
+
+    _remember(key, bundle)
+    return bundle
+
+
+async def _versions(db: AsyncSession, client_key: str) -> dict[str, int]:
+    result = await db.execute(
+        select(KBVersion.key, KBVersion.version).where(
+            KBVersion.key.in_([client_key, SHARED_KEY])
+        )
+    )
+    return {key: version for key, version in result.all()}
+
+
+async def _usage_counts(db: AsyncSession, client_id: UUID) -> dict[str, int]:
+    """Live ``usage_count`` of the client's rules and applicable patterns,
+    by id (as the string bundles carry)."""
+    result = await db.execute(
+        union_all(
+            select(ClientRule.id, ClientRule.usage_count).where(
+                ClientRule.client_id == client_id
+            ),
+            select(Pattern.id, Pattern.usage_count).where(
+                or_(
+                    Pattern.client_id == client_id,
+                    Pattern.scope.in_(["global", "segment"]),
+                )
+            ),
+        )
+    )
+    return {str(entity_id): count or 0 for entity_id, count in result.all()}
+
+
+class KBContext:
+    """A client's KB context.  Treat the contents as read-only -- bundles
+    are shared between requests."""
+
+    __slots__ = ("client_id", "version", "brand_profile", "rules", "patterns")
+
+    def __init__(
+        self,
+        client_id: UUID,
+        version: tuple[int, int],
+        client_bundle: dict[str, Any],
+        shared_bundle: dict[str, Any],
+        usage: Optional[dict[str, int]] = None,
+    ) -> None:
+        self.client_id = client_id
+        self.version = version  # (client, shared)
+        self.brand_profile: Optional[dict[str, Any]] = client_bundle["brand_profile"]
+        self.rules: list[dict[str, Any]] = client_bundle["rules"]
+        # Client, segment and global patterns
+        self.patterns: list[dict[str, Any]] = (
+            client_bundle["patterns"] + shared_bundle["patterns"]
+        )
+        if usage is not None:
+            # Copies, so the shared bundles stay count-free
+            self.rules = [
+                {**r, "usage_count": usage.get(r["id"], 0)} for r in self.rules
+            ]
+            self.patterns = sorted(
+                ({**p, "usage_count": usage.get(p["id"], 0)} for p in self.patterns),
+                key=lambda p: p["usage_count"],
+                reverse=True,
+            )
+
+    @property
+    def active_rules(self) -> list[dict[str, Any]]:
+        return [r for r in self.rules if r["status"] == "active"]
+
+
+async def get_kb_context(
+    db: AsyncSession, client_id: UUID, *, with_usage: bool = False
+) -> KBContext:
+    """Return the KB context for ``client_id``, building bundles on a miss.
+
+    With ``with_usage``, rules and patterns carry their live
+    ``usage_count`` and patterns are ordered most used first.
+    """
+    client_key = str(client_id)
+    versions = await _versions(db, client_key)
+    client_version = versions.get(client_key, 0)
+    shared_version = versions.get(SHARED_KEY, 0)
+
+    shared = await _bundle(db, SHARED_KEY, shared_version, None)
+    client = await _bundle(db, f"client:{client_key}", client_version, client_id)
+    usage = await _usage_counts(db, client_id) if with_usage else None
+    return KBContext(
+        client_id, (client_version, shared_version), client, shared, usage
+    )
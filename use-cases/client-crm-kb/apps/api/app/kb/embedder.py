@@ -0,0 +1,63 @@
+"""
+Local CPU text embedder for knowledge-base retrieval.
+
+A feature-hashing embedder: word unigrams, word bigrams and character
+trigrams are hashed (with a stable hash, so vectors are reproducible
+across processes) into ``EMBEDDING_DIM`` signed buckets, weighted by
+sublinear term frequency and L2-normalised.  It needs no model download
+or network access and embeds a typical rule in well under a millisecond.
+
+Character trigrams make the vectors robust to inflection, typos and CJK
+text (which has no spaces to split words on); bigrams add a little word
+order.  It captures lexical overlap rather than deep semantics, which is
+the trade-off for running anywhere with no extra dependencies.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from collections import Counter
+
+EMBEDDING_DIM = 256
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Relative weight of each feature family, keyed by feature prefix
+_FAMILY_WEIGHTS = {"w": 1.0, "b": 0.5, "c": 0.3}
+
+
+def _features(text: str) -> Counter[str]:
+    """Feature counts: ``w:`` words, ``b:`` word bigrams, ``c:`` char trigrams."""
+    words = _TOKEN_RE.findall(text.lower())
+    features: Counter[str] = Counter()
+    for word in words:
+        features["w:" + word] += 1
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            features["c:" + padded[i:i + 3]] += 1
+    for first, second in zip(words, words[1:]):
+        features[f"b:{first} {second}"] += 1
+    return features
+
+
+def _bucket(feature: str) -> tuple[int, float]:
+    """Stable (index, sign) for a feature."""
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % EMBEDDING_DIM, 1.0 if value >> 63 else -1.0
+
+
+def embed(text: str) -> list[float]:
+    """Embed ``text`` as a unit-length vector (all zeros for empty text)."""
+    vector = [0.0] * EMBEDDING_DIM
+    for feature, count in _features(text).items():
+        index, sign = _bucket(feature)
+        weight = _FAMILY_WEIGHTS[feature[0]] * (1.0 + math.log(count))
+        vector[index] += sign * weight
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0.0:
+        return vector
+    return [v / norm for v in vector]
+
@@ -0,0 +1,445 @@
+"""
+Embedding store for hybrid KB retrieval.
+
+Rules, patterns, taste examples and feedback events are embedded with the
+local :mod:`app.kb.embedder` into the ``kb_embeddings`` table.  With
+pgvector installed the column is a ``VECTOR`` with an HNSW cosine index
+and searched in SQL; without it the embeddings are stored as ``REAL[]``
+and searched in process with numpy, from a copy of the searchable rows.
+That copy is (re)built off the request path: by a background task started
+from the FastAPI lifespan, which checks every
+``KB_LOCAL_INDEX_REFRESH_SECONDS`` whether embeddings or rules changed,
+and right after a sync.
+
+:func:`sync_embeddings` is incremental: each row's embedded text is
+hashed in SQL (``md5``), and only rows whose hash differs from the stored
+one -- new or changed rows -- are fetched and embedded.  Embeddings of
+deleted rows are removed.  The ``kb_embedding_sync`` scheduled job runs
+it; it can also be run after bulk imports::
+
+    python -m app.kb.embeddings
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import (
+    Float,
+    String,
+    and_,
+    bindparam,
+    cast,
+    delete,
+    exists,
+    func,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, REAL, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.types import UserDefinedType
+
+from app.config import settings
+from app.database import async_session_factory
+from app.kb.embedder import EMBEDDING_DIM, embed
+from app.models import (
+    ClientRule,
+    FeedbackEvent,
+    KBEmbedding,
+    Pattern,
+    RuleStatus,
+    TasteExample,
+)
+
+logger = logging.getLogger(__name__)
+
+# Feedback is long-form; only its opening is embedded
+_FEEDBACK_EMBED_CHARS = 4000
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+
+class _Source:
+    """How one entity type maps onto ``kb_embeddings``."""
+
+    __slots__ = ("entity_type", "model", "text")
+
+    def __init__(self, entity_type: str, model: Any, text: ColumnElement[str]) -> None:
+        self.entity_type = entity_type
+        self.model = model
+        self.text = text
+
+    @property
+    def content_hash(self) -> ColumnElement[str]:
+        # Includes client_id so re-assigned rows are re-indexed too
+        return func.md5(
+            func.coalesce(self.model.client_id.cast(String), "") + ":" + self.text
+        )
+
+
+SOURCES: dict[str, _Source] = {
+    "rule": _Source("rule", ClientRule, ClientRule.description),
+    "pattern": _Source(
+        "pattern",
+        Pattern,
+        func.concat_ws(" ", Pattern.name, Pattern.description),
+    ),
+    "taste_example": _Source(
+        "taste_example",
+        TasteExample,
+        func.concat_ws(
+            " ",
+            TasteExample.category,
+            TasteExample.description,
+            TasteExample.why_client_likes_or_dislikes,
+            func.array_to_string(TasteExample.tags, " "),
+        ),
+    ),
+    "feedback": _Source(
+        "feedback",
+        FeedbackEvent,
+        func.left(FeedbackEvent.raw_text, _FEEDBACK_EMBED_CHARS),
+    ),
+}
+
+
+# ---------------------------------------------------------------------------
+# Incremental sync
+# ---------------------------------------------------------------------------
+
+
+async def _sync_source(db: AsyncSession, source: _Source, batch_size: int) -> int:
+    """Embed the new and changed rows of one source; returns rows embedded."""
+    model = source.model
+    stale = (
+        select(model.id, model.client_id, source.text, source.content_hash)
+        .outerjoin(
+            KBEmbedding,
+            and_(
+                KBEmbedding.entity_type == source.entity_type,
+                KBEmbedding.entity_id == model.id,
+            ),
+        )
+        .where(
+            source.text != "",
+            KBEmbedding.content_hash.is_distinct_from(source.content_hash),
+        )
+        .limit(batch_size)
+    )
+
+    embedded = 0
+    while True:
+        rows = (await db.execute(stale)).all()
+        if not rows:
+            break
+        # Embedding is CPU-bound; keep it off the event loop
+        vectors = await asyncio.to_thread(lambda: [embed(row[2]) for row in rows])
+        stmt = insert(KBEmbedding).values([
+            {
+                "entity_type": source.entity_type,
+                "entity_id": row[0],
+                "client_id": row[1],
+                "content_hash": row[3],
+                "embedding": vector,
+            }
+            for row, vector in zip(rows, vectors)
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[KBEmbedding.entity_type, KBEmbedding.entity_id],
+            set_={
+                "client_id": stmt.excluded.client_id,
+                "content_hash": stmt.excluded.content_hash,
+                "embedding": stmt.excluded.embedding,
+                "embedded_at": func.now(),
+            },
+        )
+        await db.execute(stmt)
+        await db.commit()
+        embedded += len(rows)
+
+    # Drop embeddings of deleted rows
+    await db.execute(
+        delete(KBEmbedding).where(
+            KBEmbedding.entity_type == source.entity_type,
+            ~exists().where(model.id == KBEmbedding.entity_id),
+        )
+    )
+    await db.commit()
+    return embedded
+
+
+async def sync_embeddings(
+    db: AsyncSession,
+    *,
+    entity_types: Optional[list[str]] = None,
+    batch_size: Optional[int] = None,
+) -> dict[str, int]:
+    """Embed new and changed KB rows.  Returns rows embedded per type."""
+    batch = batch_size or settings.KB_EMBEDDING_BATCH_SIZE
+    counts: dict[str, int] = {}
+    for entity_type in entity_types or list(SOURCES):
+        counts[entity_type] = await _sync_source(db, SOURCES[entity_type], batch)
+        if counts[entity_type]:
+            logger.info(f"Embedded {counts[entity_type]} {entity_type} rows")
+    # Pick the changes up now in a process that serves searches
+    if _local_index is not None:
+        await refresh_local_index(db)
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Vector search
+# ---------------------------------------------------------------------------
+
+
+class Vector(UserDefinedType):
+    """pgvector ``VECTOR(dim)``, the cast target for query vectors."""
+
+    cache_ok = True
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+
+    def get_col_spec(self, **kw) -> str:
+        return f"VECTOR({self.dim})"
+
+
+_pgvector: Optional[bool] = None
+
+
+async def _has_pgvector(db: AsyncSession) -> bool:
+    """True if ``kb_embeddings.embedding`` is a pgvector column (checked once)."""
+    global _pgvector
+    if _pgvector is None:
+        udt = await db.scalar(
+            text(
+                "SELECT udt_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() "
+                "AND table_name = 'kb_embeddings' AND column_name = 'embedding'"
+            )
+        )
+        _pgvector = udt == "vector"
+    return _pgvector
+
+
+def _searchable() -> ColumnElement[bool]:
+    """Embeddings search may return: everything but inactive rules, which
+    keep their embedding in case they are reactivated."""
+    return or_(
+        KBEmbedding.entity_type != "rule",
+        exists().where(
+            ClientRule.id == KBEmbedding.entity_id,
+            ClientRule.status == RuleStatus.active,
+        ),
+    )
+
+
+# Entity type -> small integer code used by the local index
+_TYPE_CODES = {entity_type: code for code, entity_type in enumerate(SOURCES)}
+
+
+class _LocalIndex:
+    """In-process copy of the searchable ``kb_embeddings`` rows, scored with
+    numpy, for databases without pgvector."""
+
+    __slots__ = ("signature", "keys", "types", "clients", "client_codes", "matrix")
+
+    def __init__(
+        self,
+        signature: tuple[Any, ...],
+        rows: list[tuple[str, UUID, Optional[UUID], list[float]]],
+    ) -> None:
+        self.signature = signature
+        self.keys = [(row[0], row[1]) for row in rows]
+        self.types = np.array([_TYPE_CODES[row[0]] for row in rows], dtype=np.int8)
+        # Client codes start at 1; 0 marks client-less (shared) entries
+        self.client_codes: dict[UUID, int] = {}
+        for row in rows:
+            if row[2] is not None:
+                self.client_codes.setdefault(row[2], len(self.client_codes) + 1)
+        self.clients = np.array(
+            [self.client_codes.get(row[2], 0) for row in rows], dtype=np.int32
+        )
+        self.matrix = np.array(
+            [row[3] for row in rows], dtype=np.float32
+        ).reshape(len(rows), EMBEDDING_DIM)
+
+    def search(
+        self,
+        vector: list[float],
+        *,
+        entity_types: list[str],
+        client_id: Optional[UUID],
+        limit: int,
+    ) -> list[tuple[str, UUID, float]]:
+        mask = np.isin(self.types, [_TYPE_CODES[t] for t in entity_types])
+        if client_id is not None:
+            mask &= (self.clients == 0) | (
+                self.clients == self.client_codes.get(client_id, -1)
+            )
+        candidates = np.flatnonzero(mask)
+        if not len(candidates) or limit <= 0:
+            return []
+        # Embeddings are unit length, so the dot product is the cosine
+        scores = (self.matrix @ np.asarray(vector, dtype=np.float32))[candidates]
+        if len(scores) > limit:
+            top = np.argpartition(scores, -limit)[-limit:]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(*self.keys[candidates[i]], float(scores[i])) for i in top]
+
+
+_local_index: Optional[_LocalIndex] = None
+_local_lock = asyncio.Lock()
+_refresher: Optional[asyncio.Task[None]] = None
+
+
+async def refresh_local_index(db: AsyncSession) -> None:
+    """Rebuild the in-process index if embeddings or rules changed since it
+    was built.  A no-op with pgvector.
+
+    Runs off the request path -- from the periodic refresher, and after
+    :func:`sync_embeddings` -- so searches never wait for a load.
+    """
+    global _local_index
+    if await _has_pgvector(db):
+        return
+    signature = tuple(
+        (
+            await db.execute(
+                select(
+                    func.count(),
+                    func.max(KBEmbedding.embedded_at),
+                    select(func.max(ClientRule.updated_at)).scalar_subquery(),
+                ).select_from(KBEmbedding)
+            )
+        ).one()
+    )
+    async with _local_lock:
+        if _local_index is not None and _local_index.signature == signature:
+            return
+        rows = (
+            await db.execute(
+                select(
+                    KBEmbedding.entity_type,
+                    KBEmbedding.entity_id,
+                    KBEmbedding.client_id,
+                    KBEmbedding.embedding,
+                ).where(_searchable())
+            )
+        ).all()
+        _local_index = await asyncio.to_thread(_LocalIndex, signature, rows)
+    logger.info(f"Loaded {len(rows)} KB embeddings into the local index")
+
+
+async def vector_search(
+    db: AsyncSession,
+    q: str,
+    *,
+    entity_types: list[str],
+    client_id: Optional[UUID] = None,
+    limit: int = 25,
+) -> list[tuple[str, UUID, float]]:
+    """Nearest KB entries to ``q`` as ``(entity_type, entity_id, similarity)``.
+
+    With ``client_id``, entries of that client plus client-less ones
+    (global and segment patterns) are searched.  Inactive rules are left
+    out.  Without pgvector this searches the local index, and raises
+    ``RuntimeError`` until that has been built.
+    """
+    vector = embed(q)
+    if not any(vector):
+        return []
+
+    if not await _has_pgvector(db):
+        index = _local_index
+        if index is None:
+            raise RuntimeError("The local KB vector index has not been built yet")
+        return await asyncio.to_thread(
+            index.search, vector, entity_types=entity_types, client_id=client_id, limit=limit
+        )
+
+    query_vector = cast(
+        bindparam("query_vector", vector, type_=ARRAY(REAL)), Vector(EMBEDDING_DIM)
+    )
+    distance = KBEmbedding.embedding.op("<=>", return_type=Float)(query_vector)
+    stmt = (
+        select(KBEmbedding.entity_type, KBEmbedding.entity_id, distance)
+        .where(KBEmbedding.entity_type.in_(entity_types), _searchable())
+        .order_by(distance)
+        .limit(limit)
+    )
+    if client_id:
+        stmt = stmt.where(
+            or_(KBEmbedding.client_id == client_id, KBEmbedding.client_id.is_(None))
+        )
+    rows = (await db.execute(stmt)).all()
+    return [(row[0], row[1], 1.0 - row[2]) for row in rows]
+
+
+# ---------------------------------------------------------------------------
+# Background refresh and scheduled sync
+# ---------------------------------------------------------------------------
+
+
+async def _refresh_periodically() -> None:
+    while True:
+        try:
+            async with async_session_factory() as db:
+                if await _has_pgvector(db):
+                    return
+                await refresh_local_index(db)
+        except Exception:
+            logger.exception("Failed to refresh the local KB vector index")
+        await asyncio.sleep(settings.KB_LOCAL_INDEX_REFRESH_SECONDS)
+
+
+def start() -> None:
+    """Build the local index and keep it fresh (without pgvector).  Called
+    from the FastAPI lifespan."""
+    global _refresher
+    if _refresher is None:
+        _refresher = asyncio.create_task(_refresh_periodically())
+
+
+async def stop() -> None:
+    """Stop the refresh task."""
+    global _refresher
+    if _refresher is not None:
+        _refresher.cancel()
+        try:
+            await _refresher
+        except asyncio.CancelledError:
+            pass
+        _refresher = None
+
+
+async def run_sync_job() -> dict[str, int]:
+    """Background-job entry point for the scheduled embedding sync."""
+    async with async_session_factory() as db:
+        return await sync_embeddings(db)
+
+
+async def _main() -> None:
+    from app.database import async_session_factory, engine
+
+    logging.basicConfig(level=logging.INFO)
+    async with async_session_factory() as db:
+        counts = await sync_embeddings(db)
+    await engine.dispose()
+    print(", ".join(f"{k}: {v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
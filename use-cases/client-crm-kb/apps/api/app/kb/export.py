@@ -0,0 +1,164 @@
+"""
+Streaming NDJSON export of a client's knowledge base.
+
+Each section is read through a server-side cursor (``AsyncSession.stream``
+with ``yield_per``) and written out row by row, so memory use stays flat
+however large the client's KB is.  The output is newline-delimited JSON::
+
+    {"type": "header", "client_id": ..., "client_name": ..., "sections": [...]}
+    {"type": "rules", "data": {...}}
+    ...
+    {"type": "footer", "counts": {"rules": 120, ...}}
+
+with an optional gzip encoding applied on the fly.
+"""
+
+from __future__ import annotations
+
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable
+from uuid import UUID
+
+from sqlalchemy import Select, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import async_session_factory
+from app.models import (
+    BrandProfile,
+    ClientRule,
+    FeedbackEvent,
+    Pattern,
+    TasteExample,
+)
+
+# Rows fetched per server-side cursor round trip
+_YIELD_PER = 500
+
+# Bytes buffered before a chunk is sent
+_CHUNK_BYTES = 64 * 1024
+
+# Columns never exported (derived search data)
+_EXCLUDED_COLUMNS = {"search_vector"}
+
+
+def _all_columns(model: Any) -> Select:
+    return select(
+        *[c for c in model.__table__.columns if c.key not in _EXCLUDED_COLUMNS]
+    )
+
+
+def _brand_profile(client_id: UUID) -> Select:
+    return _all_columns(BrandProfile).where(BrandProfile.client_id == client_id)
+
+
+def _taste_examples(client_id: UUID) -> Select:
+    return (
+        _all_columns(TasteExample)
+        .where(TasteExample.client_id == client_id)
+        .order_by(TasteExample.added_at.desc())
+    )
+
+
+def _rules(client_id: UUID) -> Select:
+    return (
+        _all_columns(ClientRule)
+        .where(ClientRule.client_id == client_id)
+        .order_by(ClientRule.priority, ClientRule.created_at)
+    )
+
+
+def _patterns(client_id: UUID) -> Select:
+    # Client-scoped patterns plus global and segment ones
+    return (
+        _all_columns(Pattern)
+        .where(
+            or_(
+                Pattern.client_id == client_id,
+                Pattern.scope.in_(["global", "segment"]),
+            )
+        )
+        .order_by(Pattern.usage_count.desc())
+    )
+
+
+def _feedback(client_id: UUID) -> Select:
+    return (
+        _all_columns(FeedbackEvent)
+        .where(FeedbackEvent.client_id == client_id)
+        .order_by(FeedbackEvent.created_at.desc())
+    )
+
+
+SECTIONS: dict[str, Callable[[UUID], Select]] = {
+    "brand_profile": _brand_profile,
+    "taste_examples": _taste_examples,
+    "rules": _rules,
+    "patterns": _patterns,
+    "feedback": _feedback,
+}
+
+
+def _line(record: dict[str, Any]) -> bytes:
+    return (
+        json.dumps(record, default=str, ensure_ascii=False, separators=(",", ":"))
+        + "\n"
+    ).encode("utf-8")
+
+
+async def _records(
+    db: AsyncSession,
+    client_id: UUID,
+    client_name: str,
+    sections: list[str],
+) -> AsyncIterator[bytes]:
+    yield _line({
+        "type": "header",
+        "client_id": client_id,
+        "client_name": client_name,
+        "exported_at": datetime.now(timezone.utc),
+        "sections": sections,
+    })
+    counts: dict[str, int] = {}
+    for section in sections:
+        stmt = SECTIONS[section](client_id).execution_options(yield_per=_YIELD_PER)
+        result = await db.stream(stmt)
+        count = 0
+        async for row in result.mappings():
+            yield _line({"type": section, "data": dict(row)})
+            count += 1
+        counts[section] = count
+    yield _line({"type": "footer", "counts": counts})
+
+
+async def stream_export(
+    client_id: UUID,
+    client_name: str,
+    sections: list[str],
+    *,
+    compress: bool = False,
+) -> AsyncIterator[bytes]:
+    """Yield the NDJSON export in ~64 KiB chunks, gzipped if ``compress``.
+
+    Opens its own database session so the cursors stay valid until the
+    response has been sent.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # gzip framing
+    buffer = bytearray()
+
+    async with async_session_factory() as db:
+        async for line in _records(db, client_id, client_name, sections):
+            buffer += line
+            if len(buffer) < _CHUNK_BYTES:
+                continue
+            chunk = compressor.compress(bytes(buffer)) if compressor else bytes(buffer)
+            buffer.clear()
+            if chunk:
+                yield chunk
+
+    tail = bytes(buffer)
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
@@ -0,0 +1,149 @@
+"""
+Hybrid full-text + vector KB retrieval.
+
+Runs the indexed full-text search (:mod:`app.kb.search`) and the
+embedding search (:mod:`app.kb.embeddings`) concurrently and merges them
+with Reciprocal Rank Fusion: every result scores ``sum(1 / (RRF_K + rank))``
+over the ranked lists it appears in, so entries found by both rank first
+without having to calibrate ts_rank against cosine similarity.
+
+Both halves are lexical.  The embeddings come from the feature-hashing
+:mod:`app.kb.embedder`, not a semantic model, so the vector half adds
+fuzzy matching (character trigrams catch typos, inflections and CJK text
+that the English tsvector misses) rather than matching by meaning.
+
+The vector half runs on its own session under a latency budget
+(``KB_HYBRID_LATENCY_BUDGET_MS``).  If it misses the budget or fails
+(without pgvector, also before the in-process index is first built),
+the full-text results are returned alone and the result is flagged as
+partial.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_factory
+from app.kb.embeddings import vector_search
+from app.kb.search import pattern_search, rule_search
+from app.models import ClientRule, Pattern
+
+logger = logging.getLogger(__name__)
+
+RRF_K = 60
+
+# ``types`` query values -> entity types
+TYPE_NAMES = {
+    "rules": "rule",
+    "patterns": "pattern",
+    "taste_examples": "taste_example",
+    "feedback": "feedback",
+}
+
+Ranked = list[tuple[str, UUID]]
+
+
+async def _lexical(
+    db: AsyncSession,
+    q: str,
+    *,
+    entity_types: list[str],
+    client_id: Optional[UUID],
+    limit: int,
+) -> list[Ranked]:
+    """Ranked full-text hits, one list per searchable entity type."""
+    lists: list[Ranked] = []
+    if "rule" in entity_types:
+        match, score = rule_search(q)
+        stmt = select(ClientRule.id).where(match)
+        if client_id:
+            stmt = stmt.where(ClientRule.client_id == client_id)
+        result = await db.execute(stmt.order_by(score.desc()).limit(limit))
+        lists.append([("rule", rule_id) for rule_id in result.scalars()])
+    if "pattern" in entity_types:
+        match, score = pattern_search(q)
+        stmt = select(Pattern.id).where(match)
+        if client_id:
+            stmt = stmt.where(
+                or_(
+                    Pattern.client_id == client_id,
+                    Pattern.scope.in_(["global", "segment"]),
+                )
+            )
+        result = await db.execute(stmt.order_by(score.desc()).limit(limit))
+        lists.append([("pattern", pattern_id) for pattern_id in result.scalars()])
+    return lists
+
+
+async def _vector(
+    q: str,
+    *,
+    entity_types: list[str],
+    client_id: Optional[UUID],
+    limit: int,
+) -> Ranked:
+    async with async_session_factory() as db:
+        hits = await vector_search(
+            db, q, entity_types=entity_types, client_id=client_id, limit=limit
+        )
+    return [(entity_type, entity_id) for entity_type, entity_id, _ in hits]
+
+
+def fuse(lists: list[Ranked], limit: int) -> list[tuple[str, UUID, float]]:
+    """Reciprocal Rank Fusion of ranked lists, best first."""
+    scores: dict[tuple[str, UUID], float] = {}
+    for ranked in lists:
+        for rank, key in enumerate(ranked, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank)
+    best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [(entity_type, entity_id, score) for (entity_type, entity_id), score in best]
+
+
+async def hybrid_search(
+    db: AsyncSession,
+    q: str,
+    *,
+    entity_types: list[str],
+    client_id: Optional[UUID] = None,
+    limit: int = 25,
+    budget_ms: Optional[int] = None,
+) -> tuple[list[tuple[str, UUID, float]], bool]:
+    """Top ``limit`` entries for ``q`` as ``(entity_type, entity_id, score)``.
+
+    Returns ``(results, partial)``; ``partial`` is True when the vector
+    search did not contribute (timed out or failed).
+    """
+    budget = (budget_ms or settings.KB_HYBRID_LATENCY_BUDGET_MS) / 1000
+    started = time.monotonic()
+
+    vector_task = asyncio.create_task(
+        _vector(q, entity_types=entity_types, client_id=client_id, limit=limit)
+    )
+    try:
+        lists = await _lexical(
+            db, q, entity_types=entity_types, client_id=client_id, limit=limit
+        )
+    except BaseException:
+        vector_task.cancel()
+        raise
+
+    partial = False
+    remaining = budget - (time.monotonic() - started)
+    try:
+        lists.append(await asyncio.wait_for(vector_task, timeout=max(remaining, 0)))
+    except asyncio.TimeoutError:
+        logger.warning(f"KB vector search exceeded {budget * 1000:.0f}ms; returning lexical results")
+        partial = True
+    except Exception:
+        logger.warning("KB vector search failed; returning lexical results", exc_info=True)
+        partial = True
+
+    return fuse(lists, limit), partial
@@ -0,0 +1,86 @@
+"""
+Indexed full-text search over the knowledge base.
+
+Rules and patterns carry a generated ``search_vector`` tsvector column
+(GIN-indexed) and trigram GIN indexes on their text columns.  A row
+matches a query when either:
+
+- its ``search_vector`` matches ``websearch_to_tsquery(q)`` -- stemmed,
+  word-level matching with quoted phrases, ``or`` and ``-exclusions``; or
+- its text contains ``q`` as a substring (``ILIKE``, served by the
+  trigram index) -- for partial words and CJK text, which the english
+  parser does not split into words.
+
+Matches are scored by ``ts_rank`` plus trigram word similarity, scaled by
+``1 + ln(1 + usage_count)`` so frequently used entries rank higher among
+equally relevant ones.
+
+Usage::
+
+    match, score = pattern_search(q)
+    stmt = select(Pattern, score).where(match).order_by(score.desc())
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import Float, func, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models import ClientRule, Pattern
+
+TS_CONFIG = "english"
+
+
+def _like_pattern(q: str) -> str:
+    """``%q%`` with LIKE wildcards in ``q`` escaped."""
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _usage_boost(usage_count: ColumnElement[Any]) -> ColumnElement[float]:
+    return 1 + func.ln(1 + func.greatest(usage_count, 0))
+
+
+def _search(
+    q: str,
+    search_vector: ColumnElement[Any],
+    text_columns: tuple[ColumnElement[Any], ...],
+    usage_count: ColumnElement[Any],
+) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    query = func.websearch_to_tsquery(TS_CONFIG, q)
+    like = _like_pattern(q)
+
+    match = or_(
+        search_vector.op("@@")(query),
+        *[column.ilike(like) for column in text_columns],
+    )
+    similarity = func.greatest(
+        *[func.word_similarity(q, column) for column in text_columns]
+    )
+    score = (
+        (func.ts_rank(search_vector, query) + similarity)
+        * _usage_boost(usage_count)
+    )
+    return match, score.cast(Float).label("score")
+
+
+def rule_search(q: str) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    """``(match condition, score)`` for searching client rules."""
+    return _search(
+        q,
+        ClientRule.search_vector,
+        (ClientRule.description,),
+        ClientRule.usage_count,
+    )
+
+
+def pattern_search(q: str) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    """``(match condition, score)`` for searching patterns."""
+    return _search(
+        q,
+        Pattern.search_vector,
+        (Pattern.name, Pattern.description),
+        Pattern.usage_count,
+    )
@@ -0,0 +1,147 @@
+"""
+Buffered usage counting for rules and patterns.
+
+Incrementing ``usage_count`` with one ``UPDATE`` per use would serialise
+every request that touches a popular global pattern on its row lock.
+Instead, uses are recorded in memory with :func:`record_kb_use` (no I/O)
+and a background task flushes the aggregated deltas every
+``KB_USAGE_FLUSH_INTERVAL_SECONDS``: one statement per table, adding each
+row's count and advancing ``last_used_at``.  Rows are locked in id order
+so concurrent flushes from several workers cannot deadlock.
+
+Started and stopped (with a final flush) from the FastAPI lifespan.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import async_session_factory
+
+logger = logging.getLogger(__name__)
+
+# entity type -> table with usage_count / last_used_at
+_TABLES = {
+    "rule": "client_rules",
+    "pattern": "patterns",
+}
+
+_FLUSH_SQL = """
+WITH delta AS (
+    SELECT *
+    FROM unnest(
+        CAST(:ids AS uuid[]),
+        CAST(:counts AS integer[]),
+        CAST(:last_used AS timestamptz[])
+    ) AS d(id, n, last_used)
+),
+locked AS (
+    SELECT t.id FROM {table} t JOIN delta USING (id)
+    ORDER BY t.id
+    FOR UPDATE OF t
+)
+UPDATE {table} t
+SET usage_count = t.usage_count + delta.n,
+    last_used_at = GREATEST(t.last_used_at, delta.last_used)
+FROM delta
+WHERE t.id = delta.id AND t.id IN (SELECT id FROM locked)
+"""
+
+# (entity type, id) -> [count, last used]
+_pending: dict[tuple[str, UUID], list] = {}
+_task: Optional[asyncio.Task[None]] = None
+
+
+def record_kb_use(entity_type: str, entity_id: UUID | str, count: int = 1) -> None:
+    """Count ``count`` uses of a rule or pattern.  Other types are ignored."""
+    if entity_type not in _TABLES:
+        return
+    try:
+        key = (entity_type, entity_id if isinstance(entity_id, UUID) else UUID(entity_id))
+    except ValueError:
+        return
+    now = datetime.now(timezone.utc)
+    entry = _pending.get(key)
+    if entry is None:
+        _pending[key] = [count, now]
+    else:
+        entry[0] += count
+        entry[1] = now
+
+
+def record_kb_uses(entries: Iterable[tuple[str, UUID | str]]) -> None:
+    """Count one use of each ``(entity_type, entity_id)``."""
+    for entity_type, entity_id in entries:
+        record_kb_use(entity_type, entity_id)
+
+
+async def flush() -> int:
+    """Write the buffered deltas.  Returns the number of rows updated."""
+    global _pending
+    if not _pending:
+        return 0
+    batch, _pending = _pending, {}
+
+    by_table: dict[str, list[tuple[UUID, int, datetime]]] = {}
+    for (entity_type, entity_id), (count, last_used) in batch.items():
+        by_table.setdefault(_TABLES[entity_type], []).append((entity_id, count, last_used))
+
+    try:
+        async with async_session_factory() as session:
+            for table, rows in by_table.items():
+                await session.execute(
+                    text(_FLUSH_SQL.format(table=table)),
+                    {
+                        "ids": [row[0] for row in rows],
+                        "counts": [row[1] for row in rows],
+                        "last_used": [row[2] for row in rows],
+                    },
+                )
+            await session.commit()
+    except BaseException as e:
+        # Put the deltas back, merged with anything recorded meanwhile
+        for key, (count, last_used) in batch.items():
+            entry = _pending.get(key)
+            if entry is None:
+                _pending[key] = [count, last_used]
+            else:
+                entry[0] += count
+                entry[1] = max(entry[1], last_used)
+        if isinstance(e, asyncio.CancelledError):
+            raise
+        logger.exception("Failed to flush KB usage counts; will retry.")
+        return 0
+    return len(batch)
+
+
+async def _flush_periodically() -> None:
+    while True:
+        await asyncio.sleep(settings.KB_USAGE_FLUSH_INTERVAL_SECONDS)
+        await flush()
+
+
+def start() -> None:
+    """Start the periodic flush task.  Called from the FastAPI lifespan."""
+    global _task
+    if _task is None:
+        _task = asyncio.create_task(_flush_periodically())
+
+
+async def stop() -> None:
+    """Stop the flush task and write what is still buffered."""
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    await flush()
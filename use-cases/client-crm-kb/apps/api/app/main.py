@@ -6,11 +6,20 @@ Registers all routers, configures CORS, and exposes health/root endpoints.
 
 from __future__ import annotations
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.config import settings
+from app.kb import embeddings as kb_embeddings
+from app.kb import usage as kb_usage
+from app.orchestration import jobs
 from app.orchestration.middleware import OrchestrationMiddleware
+from app.utils.ai import AIBudgetExceededError
+from app.utils.anthropic_client import close_client, init_client
+from app.utils.redis_client import close_redis
 
 # ---------------------------------------------------------------------------
 # Router imports
@@ -31,6 +40,27 @@ from app.gmail.router import router as gmail_router
 from app.orchestration.router import router as orchestration_router
 from app.debug.router import router as debug_router
 
+# ---------------------------------------------------------------------------
+# Lifespan
+# ---------------------------------------------------------------------------
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared clients on startup and release them on shutdown."""
+    init_client()
+    kb_usage.start()
+    kb_embeddings.start()
+    if settings.JOB_SCHEDULER_ENABLED:
+        jobs.start()
+    yield
+    await jobs.stop()
+    await kb_embeddings.stop()
+    await kb_usage.stop()
+    await close_client()
+    await close_redis()
+
+
 # ---------------------------------------------------------------------------
 # Application
 # ---------------------------------------------------------------------------
@@ -45,6 +75,7 @@ app = FastAPI(
     version="0.1.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # ---------------------------------------------------------------------------
@@ -63,6 +94,23 @@ app.add_middleware(
 # AI orchestration middleware (token monitoring, circuit breaker, model downgrade)
 app.add_middleware(OrchestrationMiddleware)
 
+# ---------------------------------------------------------------------------
+# Exception handlers
+# ---------------------------------------------------------------------------
+
+
+@app.exception_handler(AIBudgetExceededError)
+async def ai_budget_exceeded_handler(
+    request: Request, exc: AIBudgetExceededError
+) -> JSONResponse:
+    """Map a Claude call refused by the orchestration engine to HTTP 429."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "60"},
+    )
+
+
 # ---------------------------------------------------------------------------
 # Include routers
 # ---------------------------------------------------------------------------
@@ -14,11 +14,14 @@ from decimal import Decimal
 from typing import TYPE_CHECKING, List, Optional
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     CheckConstraint,
+    Computed,
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -26,7 +29,7 @@ from sqlalchemy import (
     UniqueConstraint,
     func,
 )
-from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, REAL, TSVECTOR, UUID
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -635,6 +638,47 @@ class HealthScoreHistory(Base):
         return f"<HealthScoreHistory client={self.client_id} score={self.score}>"
 
 
+class ClientHealthAggregate(Base):
+    """Running health score inputs for one client.
+
+    Kept up to date by the feedback, project and milestone write paths (see
+    :mod:`app.health.service`) and rebuilt from the source tables by the
+    daily ``health_aggregate_sweep`` job, which also moves the feedback
+    window forward.
+    """
+
+    __tablename__ = "client_health_aggregates"
+
+    client_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("clients.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # Sentiment counts cover analysed feedback dated on or after this day
+    window_start: Mapped[date] = mapped_column(Date, nullable=False)
+    positive: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    negative: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    neutral: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Feedback still 'new' with critical/major severity, regardless of date
+    critical: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    major: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    delayed_milestones: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+    latest_feedback: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
+    latest_project: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<ClientHealthAggregate client={self.client_id}>"
+
+
 class Project(Base):
     """A project executed for a client."""
 
@@ -924,6 +968,10 @@ class FeedbackEvent(Base):
     topics: Mapped[Optional[list]] = mapped_column(ARRAY(Text))
     severity: Mapped[Optional[FeedbackSeverity]] = mapped_column(String(10))
     extracted_requirements: Mapped[Optional[dict]] = mapped_column(JSONB)
+    # 'local' for the pre-classifier, 'claude' (or NULL) otherwise
+    analysis_source: Mapped[Optional[str]] = mapped_column(String(10))
+    # Rule suggestions from the last analysis; NULL until generated
+    suggested_rules: Mapped[Optional[list]] = mapped_column(JSONB)
     status: Mapped[FeedbackStatus] = mapped_column(
         String(30), nullable=False, default=FeedbackStatus.new
     )
@@ -1012,11 +1060,27 @@ class ClientRule(Base):
         nullable=False,
     )
 
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('english', coalesce(description, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
     __table_args__ = (
         CheckConstraint(
             "priority >= 1 AND priority <= 5",
             name="ck_client_rules_priority_range",
         ),
+        Index("idx_rules_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "idx_rules_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
     )
 
     # Relationships
@@ -1076,6 +1140,32 @@ class Pattern(Base):
         nullable=False,
     )
 
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
+    __table_args__ = (
+        Index("idx_patterns_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "idx_patterns_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "idx_patterns_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+    )
+
     # Relationships
     client: Mapped[Optional["Client"]] = relationship(
         back_populates="patterns"
@@ -1088,6 +1178,56 @@ class Pattern(Base):
         return f"<Pattern {self.name} ({self.scope})>"
 
 
+class KBEmbedding(Base):
+    """Embedding of a rule, pattern, taste example or feedback event.
+
+    Kept in one table (rather than a column per entity table) so the
+    vector index covers every entity type and embedding state can change
+    without touching the source rows.
+
+    ``embedding`` is a pgvector ``VECTOR`` column with an HNSW index when
+    the extension is installed, and a plain ``REAL[]`` otherwise.  It is
+    always bound as ``REAL[]``, which pgvector casts on assignment.
+    """
+
+    __tablename__ = "kb_embeddings"
+
+    entity_type: Mapped[str] = mapped_column(String(20), primary_key=True)
+    entity_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True
+    )
+    client_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), index=True
+    )
+    content_hash: Mapped[str] = mapped_column(String(32), nullable=False)
+    embedding: Mapped[list] = mapped_column(ARRAY(REAL), nullable=False)
+    embedded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<KBEmbedding {self.entity_type} {self.entity_id}>"
+
+
+class KBVersion(Base):
+    """Change counter for a client's KB (or the shared global/segment patterns).
+
+    Bumped by database triggers on brand_profiles, client_rules and
+    patterns; used to key the KB context cache.
+    """
+
+    __tablename__ = "kb_versions"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<KBVersion {self.key} v{self.version}>"
+
+
 class AuditLog(Base):
     """Immutable audit trail for all user actions."""
 
@@ -1472,3 +1612,88 @@ class ChatMessage(Base):
 
     def __repr__(self) -> str:
         return f"<ChatMessage {self.role} ({self.session_id})>"
+
+
+# ---------------------------------------------------------------------------
+# Gmail Sync Models
+# ---------------------------------------------------------------------------
+
+
+class GmailSyncState(Base):
+    """Incremental sync cursor and counters for a connected Gmail account."""
+
+    __tablename__ = "gmail_sync_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    email: Mapped[Optional[str]] = mapped_column(String(255))
+    history_id: Mapped[Optional[int]] = mapped_column(BigInteger)
+    # When history_id was last advanced: everything received before it
+    # has been ingested.  Bounds the inbox listing if Gmail expires the cursor
+    cursor_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
+    watch_expires_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
+    last_sync_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
+    total_synced: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return f"<GmailSyncState {self.email} @{self.history_id}>"
+
+
+class GmailProcessedMessage(Base):
+    """A Gmail message that has been ingested (analysed at most once).
+
+    A message that failed to fetch or analyse has ``error`` set and is
+    retried by later syncs until ``GMAIL_SYNC_MAX_ATTEMPTS``.
+    """
+
+    __tablename__ = "gmail_processed_messages"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    gmail_message_id: Mapped[str] = mapped_column(
+        String(64), nullable=False, unique=True
+    )
+    thread_id: Mapped[Optional[str]] = mapped_column(String(64))
+    subject: Mapped[Optional[str]] = mapped_column(Text)
+    from_email: Mapped[Optional[str]] = mapped_column(String(255))
+    email_date: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
+    client_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("clients.id", ondelete="SET NULL"),
+        index=True,
+    )
+    feedback_event_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("feedback_events.id", ondelete="SET NULL"),
+    )
+    sentiment: Mapped[Optional[str]] = mapped_column(String(10))
+    topics: Mapped[Optional[list]] = mapped_column(ARRAY(Text))
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    failed_attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    processed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True,
+    )
+
+    def __repr__(self) -> str:
+        return f"<GmailProcessedMessage {self.gmail_message_id}>"
@@ -39,6 +39,8 @@ from .schemas import (
     AlertsResponse,
     BatchSuggestion,
     BudgetStatus,
+    CacheMetrics,
+    LocalClassifierMetrics,
     CircuitBreakerState,
     CronJob,
     EndpointUsage,
@@ -98,7 +100,7 @@ class _CallRecord:
 
     __slots__ = (
         "timestamp", "caller", "model", "input_tokens", "output_tokens",
-        "total_tokens", "cost_usd", "session_id", "priority",
+        "total_tokens", "cost_usd", "session_id", "priority", "tokens_saved",
     )
 
     def __init__(
@@ -109,6 +111,7 @@ class _CallRecord:
         output_tokens: int,
         session_id: Optional[str],
         priority: str,
+        tokens_saved: int = 0,
     ) -> None:
         self.timestamp = datetime.now(timezone.utc)
         self.caller = caller
@@ -119,6 +122,7 @@ class _CallRecord:
         self.cost_usd = _estimate_cost(model, input_tokens, output_tokens)
         self.session_id = session_id
         self.priority = priority
+        self.tokens_saved = tokens_saved
 
 
 # ---------------------------------------------------------------------------
@@ -174,6 +178,19 @@ class OrchestrationEngine:
         # Call-pattern tracking: caller -> list of timestamps
         self._call_patterns: Dict[str, List[float]] = defaultdict(list)
 
+        # AI response cache counters
+        self._cache_hits: int = 0
+        self._cache_misses: int = 0
+        self._cache_tokens_saved: int = 0
+        self._cache_only_requests: int = 0
+
+        # Local feedback pre-classifier counters
+        self._local_classified: int = 0
+        self._local_escalated: int = 0
+        self._local_audited: int = 0
+        self._local_audit_agreed: int = 0
+        self._local_tokens_saved: int = 0
+
         # Alerts
         self._alerts: List[Alert] = []
         self._max_alerts: int = 200
@@ -191,9 +208,13 @@ class OrchestrationEngine:
         output_tokens: int,
         session_id: Optional[str] = None,
         priority: str = "MEDIUM",
+        tokens_saved: int = 0,
     ) -> Tuple[bool, Optional[str]]:
         """Record a Claude API call.
 
+        ``tokens_saved`` is the caller's estimate of tokens avoided by
+        caching or compaction; it is logged but not charged to the budget.
+
         Returns:
             (allowed, message) -- ``allowed`` is False if the circuit breaker
             blocked the call.  ``message`` contains a human-readable reason
@@ -223,6 +244,7 @@ class OrchestrationEngine:
                 output_tokens=output_tokens,
                 session_id=session_id,
                 priority=priority,
+                tokens_saved=tokens_saved,
             )
             self._buffer.append(record)
 
@@ -312,6 +334,53 @@ class OrchestrationEngine:
 
             return True, None
 
+    async def record_cache_lookup(self, hit: bool, tokens_saved: int = 0) -> None:
+        """Record an AI response cache lookup.
+
+        Hits consume no tokens and are never written to the usage buffer;
+        ``tokens_saved`` is the usage of the original call being replayed.
+        """
+        async with self._lock:
+            if hit:
+                self._cache_hits += 1
+                self._cache_tokens_saved += tokens_saved
+            else:
+                self._cache_misses += 1
+
+    async def record_cache_only_request(self, caller: str, tokens_saved: int) -> None:
+        """Record a request (or job) whose Claude calls were all answered
+        from the response cache.
+
+        Counted on its own rather than as a zero-token call, so cache-only
+        traffic does not dilute call metrics or trip loop detection.  The
+        hits and their savings were already counted by
+        :meth:`record_cache_lookup`.
+        """
+        async with self._lock:
+            self._cache_only_requests += 1
+        logger.debug(f"{caller} answered from the AI cache ({tokens_saved} tokens saved)")
+
+    async def record_local_classification(
+        self,
+        escalated: bool,
+        tokens_saved: int = 0,
+        agreed: Optional[bool] = None,
+    ) -> None:
+        """Record one item seen by the local feedback pre-classifier.
+
+        ``escalated`` items went to Claude.  ``agreed`` is set for audited
+        local decisions: whether Claude's analysis matched.
+        """
+        async with self._lock:
+            if escalated:
+                self._local_escalated += 1
+            else:
+                self._local_classified += 1
+                self._local_tokens_saved += tokens_saved
+            if agreed is not None:
+                self._local_audited += 1
+                self._local_audit_agreed += int(agreed)
+
     def get_recommended_model(self, priority: str = "MEDIUM") -> str:
         """Return the model to use given current budget status.
 
@@ -344,10 +413,35 @@ class OrchestrationEngine:
                     2,
                 ),
             )
+            lookups = self._cache_hits + self._cache_misses
+            cache = CacheMetrics(
+                hits=self._cache_hits,
+                misses=self._cache_misses,
+                hit_rate_pct=round(
+                    self._cache_hits / lookups * 100, 2
+                ) if lookups else 0.0,
+                tokens_saved=self._cache_tokens_saved,
+                cache_only_requests=self._cache_only_requests,
+            )
+            seen = self._local_classified + self._local_escalated
+            local_classifier = LocalClassifierMetrics(
+                classified=self._local_classified,
+                escalated=self._local_escalated,
+                escalation_rate_pct=round(
+                    self._local_escalated / seen * 100, 2
+                ) if seen else 0.0,
+                audited=self._local_audited,
+                audit_agreement_pct=round(
+                    self._local_audit_agreed / self._local_audited * 100, 2
+                ) if self._local_audited else None,
+                tokens_saved=self._local_tokens_saved,
+            )
             return EngineStatusResponse(
                 circuit_breaker_state=self._cb_state,
                 budget=budget,
                 metrics=metrics,
+                cache=cache,
+                local_classifier=local_classifier,
                 active_model=self._active_model,
                 downgraded=self._downgraded,
                 engine_uptime_seconds=round(
@@ -438,6 +532,7 @@ class OrchestrationEngine:
                     estimated_cost_usd=round(r.cost_usd, 6),
                     session_id=r.session_id,
                     priority=r.priority,
+                    tokens_saved=r.tokens_saved,
                     circuit_breaker_state=self._cb_state.value,
                     created_at=r.timestamp,
                 )
@@ -504,6 +599,30 @@ class OrchestrationEngine:
                 estimated_tokens_per_run=8000,
                 estimated_daily_cost_usd=0.38,
             ),
+            CronJob(
+                name="health_aggregate_sweep",
+                description=(
+                    "Rebuild per-client health aggregates daily so feedback "
+                    "leaves the 90-day window, and update changed scores."
+                ),
+                cron_expression="0 2 * * *",
+                timezone="Asia/Hong_Kong",
+                priority=OperationPriority.LOW,
+                estimated_tokens_per_run=0,
+                estimated_daily_cost_usd=0.0,
+            ),
+            CronJob(
+                name="kb_embedding_sync",
+                description=(
+                    "Embed new and changed rules, patterns, taste examples "
+                    "and feedback for hybrid KB search every 15 minutes."
+                ),
+                cron_expression="*/15 * * * *",
+                timezone="Asia/Hong_Kong",
+                priority=OperationPriority.LOW,
+                estimated_tokens_per_run=0,
+                estimated_daily_cost_usd=0.0,
+            ),
             CronJob(
                 name="pattern_detection_cross_client",
                 description=(
@@ -644,6 +763,15 @@ class OrchestrationEngine:
 
             if clear_usage_buffer:
                 self._buffer.clear()
+                self._cache_hits = 0
+                self._cache_misses = 0
+                self._cache_tokens_saved = 0
+                self._cache_only_requests = 0
+                self._local_classified = 0
+                self._local_escalated = 0
+                self._local_audited = 0
+                self._local_audit_agreed = 0
+                self._local_tokens_saved = 0
                 buffer_cleared = True
                 logger.info("Usage ring buffer cleared.")
 
@@ -856,6 +984,7 @@ class OrchestrationEngine:
                     estimated_cost_usd=record.cost_usd,
                     session_id=record.session_id,
                     priority=record.priority,
+                    tokens_saved=record.tokens_saved,
                     circuit_breaker_state=self._cb_state.value,
                 )
                 session.add(log_entry)
@@ -0,0 +1,411 @@
+"""
+Background jobs and the cron scheduler for recommended AI operations.
+
+Long-running work such as a Gmail sync runs as a background job instead
+of inside the HTTP request.  :func:`submit` starts a job and returns its
+record straight away; clients poll :func:`get_job` with the job id.  Job
+records are written to Redis (``job:{id}``) so that any API process can
+answer a poll, with an in-process copy as a fallback.  Only one job of
+each kind runs at a time, and a second submit returns the running job.
+The claim on a kind (``job_active:{kind}``) is a short lease that the
+running job keeps renewing; if its process dies the lease lapses within
+``JOB_LEASE_SECONDS``, the job reads as failed and the kind can run again.
+
+The scheduler executes the jobs recommended by
+``OrchestrationEngine.suggest_schedule`` that have a handler in
+:func:`_scheduled_handlers`.  It ticks once a minute, and a Redis lock per
+job and minute stops two processes from running the same occurrence.
+Each job's Claude calls run in their own usage scope with the job's
+priority, so the engine's budget applies to them.
+
+The scheduler starts from the FastAPI lifespan when ``JOB_SCHEDULER_ENABLED``
+is set.  It can also run as a separate worker process::
+
+    python -m app.orchestration.jobs
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+from app.orchestration.engine import OrchestrationEngine
+from app.orchestration.usage import usage_scope
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[..., Awaitable[Any]]
+
+_JOB_PREFIX = "job:"
+_ACTIVE_PREFIX = "job_active:"
+_TICK_PREFIX = "job_tick:"
+
+# Finished job records kept in process
+_LOCAL_MAX_JOBS = 1000
+
+# job id -> record, for this process's jobs (and when Redis is down)
+_jobs: dict[str, "Job"] = {}
+# job kind -> running task in this process
+_running: dict[str, asyncio.Task[None]] = {}
+_scheduler: Optional[asyncio.Task[None]] = None
+
+
+# ---------------------------------------------------------------------------
+# Cron expressions
+# ---------------------------------------------------------------------------
+
+
+def _parse_field(spec: str, low: int, high: int) -> set[int]:
+    """Values matched by one cron field (``*``, ``a-b``, ``*/n``, lists)."""
+    values: set[int] = set()
+    for part in spec.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = end = int(part)
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Invalid cron field: {spec!r}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """A five-field cron expression evaluated in a time zone."""
+
+    __slots__ = (
+        "minutes", "hours", "days", "months", "weekdays",
+        "any_day", "any_weekday", "tz",
+    )
+
+    def __init__(self, expression: str, tz: str = "UTC") -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected 5 cron fields: {expression!r}")
+        minute, hour, day, month, weekday = fields
+        self.minutes = _parse_field(minute, 0, 59)
+        self.hours = _parse_field(hour, 0, 23)
+        self.days = _parse_field(day, 1, 31)
+        self.months = _parse_field(month, 1, 12)
+        # 0 and 7 are both Sunday
+        self.weekdays = {d % 7 for d in _parse_field(weekday, 0, 7)}
+        self.any_day = day == "*"
+        self.any_weekday = weekday == "*"
+        self.tz = ZoneInfo(tz)
+
+    def matches(self, moment: datetime) -> bool:
+        local = moment.astimezone(self.tz)
+        if (
+            local.minute not in self.minutes
+            or local.hour not in self.hours
+            or local.month not in self.months
+        ):
+            return False
+        day_ok = local.day in self.days
+        weekday_ok = (local.weekday() + 1) % 7 in self.weekdays
+        # Standard cron: if both day fields are restricted, either may match
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+
+# ---------------------------------------------------------------------------
+# Job records
+# ---------------------------------------------------------------------------
+
+
+class Job:
+    """Status of one background job."""
+
+    __slots__ = (
+        "id", "kind", "status", "created_at", "started_at", "finished_at",
+        "result", "error",
+    )
+
+    def __init__(self, kind: str, job_id: Optional[str] = None) -> None:
+        self.id = job_id or str(uuid.uuid4())
+        self.kind = kind
+        self.status = "queued"  # queued | running | succeeded | failed
+        self.created_at: datetime = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Job":
+        job = cls(data["kind"], data["id"])
+        for name in ("status", "result", "error"):
+            setattr(job, name, data.get(name))
+        for name in ("created_at", "started_at", "finished_at"):
+            value = data.get(name)
+            setattr(job, name, datetime.fromisoformat(value) if value else None)
+        return job
+
+
+async def _save(job: Job) -> None:
+    _jobs[job.id] = job
+    if len(_jobs) > _LOCAL_MAX_JOBS:
+        # Oldest first (insertion order); keep unfinished ones
+        finished = [j.id for j in _jobs.values() if j.finished_at]
+        for job_id in finished[: len(_jobs) - _LOCAL_MAX_JOBS]:
+            del _jobs[job_id]
+    try:
+        await get_redis().set(
+            f"{_JOB_PREFIX}{job.id}",
+            json.dumps(job.to_dict(), default=str),
+            ex=settings.JOB_RESULT_TTL_SECONDS,
+        )
+    except Exception:
+        logger.warning(f"Failed to store job {job.id} in Redis")
+
+
+async def get_job(job_id: str) -> Optional[Job]:
+    """Return the job with ``job_id``, or None if unknown or expired.
+
+    Another process's unfinished job whose lease has lapsed is reported
+    as failed: its worker stopped without finishing it.
+    """
+    job = _jobs.get(job_id)
+    if job is not None:
+        return job
+    try:
+        redis = get_redis()
+        raw = await redis.get(f"{_JOB_PREFIX}{job_id}")
+        if not raw:
+            return None
+        job = Job.from_dict(json.loads(raw))
+        if (
+            job.status in ("queued", "running")
+            and await redis.get(f"{_ACTIVE_PREFIX}{job.kind}") != job.id
+        ):
+            job.status = "failed"
+            job.error = "The worker running this job stopped."
+    except Exception:
+        logger.warning("Job store unavailable; only local jobs are visible.")
+        return None
+    return job
+
+
+# ---------------------------------------------------------------------------
+# Running jobs
+# ---------------------------------------------------------------------------
+
+
+async def _renew_lease(job: Job) -> None:
+    """Keep this job's claim on its kind alive while it runs."""
+    key = f"{_ACTIVE_PREFIX}{job.kind}"
+    while True:
+        await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+        try:
+            redis = get_redis()
+            if await redis.get(key) == job.id:
+                await redis.expire(key, settings.JOB_LEASE_SECONDS)
+        except Exception:
+            logger.warning(f"Failed to renew the lease of job {job.id}")
+
+
+async def _execute(job: Job, handler: Handler, priority: str, kwargs: dict[str, Any]) -> None:
+    job.status = "running"
+    job.started_at = datetime.now(timezone.utc)
+    await _save(job)
+    engine = OrchestrationEngine.get_instance()
+    caller = f"job:{job.kind}"
+    lease = asyncio.create_task(_renew_lease(job))
+    try:
+        # A fresh scope: jobs submitted from a request must not add their
+        # usage to the request's scope
+        with usage_scope(caller=caller, priority=priority) as scope:
+            job.result = await handler(**kwargs)
+        job.status = "succeeded"
+    except asyncio.CancelledError:
+        job.status = "failed"
+        job.error = "Cancelled at shutdown."
+        raise
+    except Exception as exc:
+        logger.exception(f"Background job {job.kind} ({job.id}) failed")
+        job.status = "failed"
+        job.error = str(exc)
+    finally:
+        lease.cancel()
+        job.finished_at = datetime.now(timezone.utc)
+        _running.pop(job.kind, None)
+        await asyncio.shield(_finish(job))
+
+    if not (scope.input_tokens or scope.output_tokens) and scope.cache_hits:
+        await engine.record_cache_only_request(caller, scope.tokens_saved)
+    elif scope.input_tokens or scope.output_tokens or scope.tokens_saved:
+        await engine.record_call(
+            caller=caller,
+            model=scope.model or settings.AI_MODEL_DEFAULT,
+            input_tokens=scope.input_tokens,
+            output_tokens=scope.output_tokens,
+            priority=priority,
+            tokens_saved=scope.tokens_saved,
+        )
+
+
+async def _finish(job: Job) -> None:
+    await _save(job)
+    try:
+        redis = get_redis()
+        if await redis.get(f"{_ACTIVE_PREFIX}{job.kind}") == job.id:
+            await redis.delete(f"{_ACTIVE_PREFIX}{job.kind}")
+    except Exception:
+        pass
+
+
+async def submit(
+    kind: str, handler: Handler, *, priority: str = "MEDIUM", **kwargs: Any
+) -> Job:
+    """Start ``handler(**kwargs)`` in the background and return its job.
+
+    If a job of the same ``kind`` is already queued or running (in any
+    process), that job is returned instead of starting another.  A claim
+    left by a dead process lapses after ``JOB_LEASE_SECONDS``.
+    """
+    task = _running.get(kind)
+    if task is not None and not task.done():
+        for job in _jobs.values():
+            if job.kind == kind and job.status in ("queued", "running"):
+                return job
+
+    job = Job(kind)
+    try:
+        claimed = await get_redis().set(
+            f"{_ACTIVE_PREFIX}{kind}", job.id, nx=True, ex=settings.JOB_LEASE_SECONDS
+        )
+        if not claimed:
+            active = await get_job(await get_redis().get(f"{_ACTIVE_PREFIX}{kind}") or "")
+            if active is not None and active.status in ("queued", "running"):
+                return active
+            await get_redis().set(
+                f"{_ACTIVE_PREFIX}{kind}", job.id, ex=settings.JOB_LEASE_SECONDS
+            )
+    except Exception:
+        logger.warning(f"Job store unavailable; {kind} is only deduplicated locally.")
+
+    await _save(job)
+    _running[kind] = asyncio.create_task(_execute(job, handler, priority, kwargs))
+    return job
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+
+
+def _scheduled_handlers() -> dict[str, tuple[str, Handler]]:
+    """Recommended-schedule job name -> (job kind, handler) for the jobs
+    this scheduler executes.  Imported lazily to avoid import cycles."""
+    from app.feedback.service import run_analysis_job
+    from app.gmail.service import run_sync_job
+    from app.health.service import run_recalculation_job, run_sweep_job
+    from app.kb.embeddings import run_sync_job as run_embedding_sync_job
+
+    return {
+        "gmail_sync_business_hours": ("gmail_sync", run_sync_job),
+        "gmail_sync_off_hours": ("gmail_sync", run_sync_job),
+        "feedback_analysis_batch": ("feedback_analysis", run_analysis_job),
+        "health_score_recalculation": ("health_score_recalculation", run_recalculation_job),
+        "health_aggregate_sweep": ("health_aggregate_sweep", run_sweep_job),
+        "kb_embedding_sync": ("kb_embedding_sync", run_embedding_sync_job),
+    }
+
+
+async def _claim_tick(name: str, moment: datetime) -> bool:
+    """True if this process should run ``name``'s occurrence at ``moment``."""
+    try:
+        return bool(
+            await get_redis().set(
+                f"{_TICK_PREFIX}{name}:{moment:%Y%m%d%H%M}", "1", nx=True, ex=120
+            )
+        )
+    except Exception:
+        logger.warning(f"Job lock unavailable; running {name} without it.")
+        return True
+
+
+async def run_due_jobs(moment: datetime) -> list[Job]:
+    """Submit every scheduled job whose cron expression matches ``moment``."""
+    handlers = _scheduled_handlers()
+    schedule = OrchestrationEngine.get_instance().suggest_schedule()
+    started = []
+    for cron_job in schedule.recommended_jobs:
+        entry = handlers.get(cron_job.name)
+        if entry is None:
+            continue
+        try:
+            due = CronSchedule(cron_job.cron_expression, cron_job.timezone).matches(moment)
+        except ValueError:
+            logger.exception(f"Invalid schedule for {cron_job.name}")
+            continue
+        if due and await _claim_tick(cron_job.name, moment):
+            kind, handler = entry
+            logger.info(f"Running scheduled job {cron_job.name}")
+            started.append(await submit(kind, handler, priority=cron_job.priority.value))
+    return started
+
+
+async def _schedule_forever() -> None:
+    while True:
+        now = datetime.now(timezone.utc)
+        next_minute = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        await asyncio.sleep((next_minute - now).total_seconds())
+        try:
+            await run_due_jobs(next_minute)
+        except Exception:
+            logger.exception("Scheduler tick failed")
+
+
+def start() -> None:
+    """Start the scheduler.  Called from the FastAPI lifespan."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = asyncio.create_task(_schedule_forever())
+
+
+async def stop() -> None:
+    """Stop the scheduler and cancel jobs still running in this process."""
+    global _scheduler
+    tasks = list(_running.values())
+    if _scheduler is not None:
+        tasks.append(_scheduler)
+        _scheduler = None
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+
+    async def _run() -> None:
+        logger.info("Job scheduler started")
+        start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await stop()
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
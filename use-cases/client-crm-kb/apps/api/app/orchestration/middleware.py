@@ -15,7 +15,7 @@ from __future__ import annotations
 
 import logging
 import time
-from typing import Set
+from typing import AsyncIterator, Set
 
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.requests import Request
@@ -23,6 +23,7 @@ from starlette.responses import JSONResponse, Response
 
 from .engine import OrchestrationEngine
 from .schemas import CircuitBreakerState, OperationPriority
+from .usage import UsageScope, usage_scope
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +34,7 @@ logger = logging.getLogger(__name__)
 # Map URL path prefixes to operation priorities.  More specific paths
 # should appear first so the first match wins.
 _PRIORITY_MAP: list[tuple[str, str]] = [
-    ("/api/chatbot", "CRITICAL"),
+    ("/api/chat", "CRITICAL"),
     ("/api/feedback", "HIGH"),
     ("/api/gmail", "MEDIUM"),
     ("/api/patterns", "LOW"),
@@ -49,7 +50,7 @@ _PRIORITY_MAP: list[tuple[str, str]] = [
 # Endpoints that actually call the Claude API and therefore consume tokens.
 # Non-AI endpoints pass through without orchestration checks.
 _AI_ENDPOINT_PREFIXES: Set[str] = {
-    "/api/chatbot",
+    "/api/chat",
     "/api/feedback",
     "/api/patterns",
     "/api/brand",
@@ -79,8 +80,10 @@ class OrchestrationMiddleware(BaseHTTPMiddleware):
     For every request to an AI endpoint the middleware:
     1. Checks whether the circuit breaker allows the call.
     2. Determines the recommended model and stores it in ``request.state``.
-    3. After the response, records usage (token counts are expected to be
-       set on ``request.state`` by the endpoint handler).
+    3. After the response, records usage -- token counts accumulated in the
+       request's usage scope by ``app.utils.anthropic_client`` plus any
+       counts set on ``request.state`` by the endpoint handler.  For
+       Server-Sent Event responses this happens once the stream ends.
     4. Adds informational headers to the response.
     """
 
@@ -129,30 +132,30 @@ class OrchestrationMiddleware(BaseHTTPMiddleware):
 
         # --- Call the actual endpoint ----------------------------------------
         start = time.monotonic()
-        response: Response = await call_next(request)
-        elapsed_ms = round((time.monotonic() - start) * 1000, 2)
-
-        # --- Record usage (from values set by the endpoint handler) ----------
-        input_tokens: int = getattr(request.state, "ai_input_tokens", 0)
-        output_tokens: int = getattr(request.state, "ai_output_tokens", 0)
-        model_used: str = getattr(request.state, "ai_model_used", recommended_model)
-        session_id: str | None = getattr(request.state, "ai_session_id", None)
-
-        if input_tokens > 0 or output_tokens > 0:
-            await engine.record_call(
-                caller=path,
-                model=model_used,
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                session_id=session_id,
-                priority=priority,
+        with usage_scope(caller=path, priority=priority) as scope:
+            response: Response = await call_next(request)
+
+        # --- Streaming responses: record once the body has been sent ---------
+        # The endpoint keeps adding to ``scope`` while the body streams, so
+        # totals (and therefore usage headers) are only known at the end.
+        if response.headers.get("content-type", "").startswith("text/event-stream"):
+            response.body_iterator = self._record_after_stream(
+                response.body_iterator, request, scope, path, priority, recommended_model
             )
+            response.headers["X-AI-Circuit-Breaker"] = engine._cb_state.value
+            return response
+
+        elapsed_ms = round((time.monotonic() - start) * 1000, 2)
+        total_tokens, model_used = await self._record_usage(
+            request, scope, path, priority, recommended_model
+        )
 
         # --- Inject usage headers into response ------------------------------
-        total_tokens = input_tokens + output_tokens
         status = await engine.get_status()
 
         response.headers["X-AI-Tokens-Used"] = str(total_tokens)
+        response.headers["X-AI-Cache-Hits"] = str(scope.cache_hits)
+        response.headers["X-AI-Tokens-Saved"] = str(scope.tokens_saved)
         response.headers["X-AI-Budget-Remaining"] = (
             f"tokens={status.budget.tokens_remaining};"
             f"usd={status.budget.cost_remaining_usd:.4f}"
@@ -162,3 +165,54 @@ class OrchestrationMiddleware(BaseHTTPMiddleware):
         response.headers["X-AI-Response-Time-Ms"] = str(elapsed_ms)
 
         return response
+
+    @staticmethod
+    async def _record_usage(
+        request: Request,
+        scope: UsageScope,
+        path: str,
+        priority: str,
+        recommended_model: str,
+    ) -> tuple[int, str]:
+        """Record the request's usage; return (total tokens, model used)."""
+        engine = OrchestrationEngine.get_instance()
+        input_tokens: int = (
+            getattr(request.state, "ai_input_tokens", 0) + scope.input_tokens
+        )
+        output_tokens: int = (
+            getattr(request.state, "ai_output_tokens", 0) + scope.output_tokens
+        )
+        model_used: str = scope.model or getattr(
+            request.state, "ai_model_used", recommended_model
+        )
+        session_id: str | None = getattr(request.state, "ai_session_id", None)
+
+        if input_tokens == 0 and output_tokens == 0 and scope.cache_hits:
+            await engine.record_cache_only_request(path, scope.tokens_saved)
+        elif input_tokens > 0 or output_tokens > 0 or scope.tokens_saved > 0:
+            await engine.record_call(
+                caller=path,
+                model=model_used,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                session_id=session_id,
+                priority=priority,
+                tokens_saved=scope.tokens_saved,
+            )
+        return input_tokens + output_tokens, model_used
+
+    async def _record_after_stream(
+        self,
+        body: AsyncIterator[bytes],
+        request: Request,
+        scope: UsageScope,
+        path: str,
+        priority: str,
+        recommended_model: str,
+    ) -> AsyncIterator[bytes]:
+        """Pass a streamed body through, recording usage when it ends."""
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            await self._record_usage(request, scope, path, priority, recommended_model)
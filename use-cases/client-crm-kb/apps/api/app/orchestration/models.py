@@ -57,6 +57,10 @@ class AIUsageLog(Base):
         String(20), nullable=False, default="MEDIUM",
         comment="Operation priority: CRITICAL, HIGH, MEDIUM, LOW",
     )
+    tokens_saved: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0",
+        comment="Estimated tokens avoided by response caching or result compaction",
+    )
     circuit_breaker_state: Mapped[Optional[str]] = mapped_column(
         String(20), nullable=True,
         comment="Circuit breaker state at time of call: CLOSED, OPEN, HALF_OPEN",
@@ -55,6 +55,7 @@ class UsageLogEntry(BaseModel):
     estimated_cost_usd: float
     session_id: Optional[str] = None
     priority: str
+    tokens_saved: int = 0
     circuit_breaker_state: Optional[str] = None
     created_at: datetime
 
@@ -85,11 +86,33 @@ class BudgetStatus(BaseModel):
     utilisation_pct: float = 0.0
 
 
+class CacheMetrics(BaseModel):
+    """AI response cache effectiveness."""
+    hits: int = 0
+    misses: int = 0
+    hit_rate_pct: float = 0.0
+    tokens_saved: int = 0
+    # Requests and jobs answered entirely from the cache (no Claude call)
+    cache_only_requests: int = 0
+
+
+class LocalClassifierMetrics(BaseModel):
+    """Local feedback pre-classifier: how much it keeps away from Claude."""
+    classified: int = 0
+    escalated: int = 0
+    escalation_rate_pct: float = 0.0
+    audited: int = 0
+    audit_agreement_pct: Optional[float] = None
+    tokens_saved: int = 0
+
+
 class EngineStatusResponse(BaseModel):
     """Response for GET /api/orchestration/status."""
     circuit_breaker_state: CircuitBreakerState
     budget: BudgetStatus
     metrics: RollingMetrics
+    cache: CacheMetrics = CacheMetrics()
+    local_classifier: LocalClassifierMetrics = LocalClassifierMetrics()
     active_model: str
     downgraded: bool = False
     engine_uptime_seconds: float = 0.0
@@ -0,0 +1,71 @@
+"""
+Request-scoped AI usage accounting.
+
+The orchestration middleware opens a :class:`UsageScope` around every
+AI-powered request.  ``app.utils.anthropic_client`` adds the token counts
+of each Claude call to the active scope, and ``app.utils.ai`` its
+response-cache hits and misses, so the middleware can record a single
+usage entry per request without every endpoint handler having to
+populate ``request.state`` by hand.  Background jobs get a scope of their
+own (:mod:`app.orchestration.jobs`); calls made outside any scope are
+recorded by the client directly, one entry per call.
+
+Usage::
+
+    with usage_scope(caller="/api/feedback", priority="HIGH") as scope:
+        ...
+    scope.input_tokens, scope.output_tokens
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class UsageScope:
+    """Mutable token counters shared by every AI call within one scope."""
+
+    __slots__ = (
+        "caller", "priority", "model", "input_tokens", "output_tokens",
+        "cache_hits", "cache_misses", "tokens_saved",
+    )
+
+    def __init__(self, caller: str, priority: str = "MEDIUM") -> None:
+        self.caller = caller
+        self.priority = priority
+        self.model: Optional[str] = None
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Estimated tokens avoided (response cache hits, result compaction)
+        self.tokens_saved = 0
+
+    def add(self, model: str, input_tokens: int, output_tokens: int) -> None:
+        """Accumulate the usage of one Claude call."""
+        self.model = model
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+
+_current_scope: ContextVar[Optional[UsageScope]] = ContextVar(
+    "ai_usage_scope", default=None
+)
+
+
+def current_scope() -> Optional[UsageScope]:
+    """Return the active usage scope, or None outside of one."""
+    return _current_scope.get()
+
+
+@contextmanager
+def usage_scope(caller: str, priority: str = "MEDIUM") -> Iterator[UsageScope]:
+    """Open a usage scope for the duration of the ``with`` block."""
+    scope = UsageScope(caller=caller, priority=priority)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
@@ -9,9 +9,10 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException, status
-from sqlalchemy import or_, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.kb.search import pattern_search
 from app.models import Client, Pattern
 
 logger = logging.getLogger(__name__)
@@ -188,19 +189,18 @@ async def search_patterns(
     channels: Optional[list[str]] = None,
     scope: Optional[str] = None,
 ) -> list[Pattern]:
-    """Full-text-like search across pattern name and description."""
-    search_term = f"%{q}%"
-    stmt = select(Pattern).where(
-        or_(
-            Pattern.name.ilike(search_term),
-            Pattern.description.ilike(search_term),
-        )
-    )
+    """Full-text and substring search across pattern name and description.
+
+    Shares the indexes and ranking of the KB search endpoint
+    (:func:`app.kb.search.pattern_search`).
+    """
+    match, score = pattern_search(q)
+    stmt = select(Pattern).where(match)
     if scope:
         stmt = stmt.where(Pattern.scope == scope)
     if channels:
         stmt = stmt.where(Pattern.applicable_channels.overlap(channels))
 
-    stmt = stmt.order_by(Pattern.usage_count.desc()).limit(50)
+    stmt = stmt.order_by(score.desc()).limit(50)
     result = await db.execute(stmt)
     return list(result.scalars().all())
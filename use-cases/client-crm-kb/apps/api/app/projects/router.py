@@ -11,6 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.dependencies import get_current_user
+from app.health.service import projects_changed
 from app.models import (
     Client,
     Project,
@@ -88,6 +89,7 @@ async def create_project(
     project = Project(**data)
     db.add(project)
     await db.flush()
+    await projects_changed(db, [project.client_id])
     await db.refresh(project)
     return ProjectResponse.model_validate(project)
 
@@ -147,6 +149,7 @@ async def update_project(
         setattr(project, key, value)
 
     await db.flush()
+    await projects_changed(db, [project.client_id])
     await db.refresh(project)
     return ProjectResponse.model_validate(project)
 
@@ -160,8 +163,10 @@ async def delete_project(
     current_user: User = Depends(get_current_user),
 ) -> None:
     project = await _get_project_or_404(db, project_id)
+    client_id = project.client_id
     await db.delete(project)
     await db.flush()
+    await projects_changed(db, [client_id])
 
 
 # ---------------------------------------------------------------------------
@@ -267,12 +272,13 @@ async def create_milestone(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> MilestoneResponse:
-    await _get_project_or_404(db, project_id)
+    project = await _get_project_or_404(db, project_id)
 
     data = payload.model_dump(exclude_unset=True)
     milestone = ProjectMilestone(project_id=project_id, **data)
     db.add(milestone)
     await db.flush()
+    await projects_changed(db, [project.client_id])
     await db.refresh(milestone)
     return MilestoneResponse.model_validate(milestone)
 
@@ -334,6 +340,8 @@ async def update_milestone(
         setattr(milestone, key, value)
 
     await db.flush()
+    client_id = await db.scalar(select(Project.client_id).where(Project.id == project_id))
+    await projects_changed(db, [client_id])
     await db.refresh(milestone)
     return MilestoneResponse.model_validate(milestone)
 
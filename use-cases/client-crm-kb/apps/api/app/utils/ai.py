@@ -1,7 +1,14 @@
 """
 Claude API wrapper for general AI operations.
 
-Provides a thin async interface around the Anthropic Python SDK.
+Provides a thin async interface around the shared Anthropic client in
+:mod:`app.utils.anthropic_client` (pooled connections, per-model
+concurrency limits, retry on 429/529).
+
+Every call is gated by the orchestration engine's budget check and its
+token usage is added to the active :mod:`app.orchestration.usage` scope.
+Deterministic (temperature 0) tool_use calls are served from the
+response cache in :mod:`app.utils.ai_cache` when possible.
 """
 
 from __future__ import annotations
@@ -10,21 +17,28 @@ import json
 import logging
 from typing import Any, Optional
 
-import anthropic
-
-from app.config import settings
+from app.orchestration.engine import OrchestrationEngine
+from app.orchestration.usage import current_scope
+from app.utils import ai_cache
+from app.utils.anthropic_client import create_message
 
 logger = logging.getLogger(__name__)
 
-_client: Optional[anthropic.AsyncAnthropic] = None
+
+class AIBudgetExceededError(RuntimeError):
+    """Raised when the orchestration engine refuses a Claude call."""
 
 
-def _get_client() -> anthropic.AsyncAnthropic:
-    """Lazy-initialise a shared async Anthropic client."""
-    global _client
-    if _client is None:
-        _client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
-    return _client
+async def _check_budget() -> None:
+    """Raise AIBudgetExceededError if the engine blocks a new Claude call."""
+    scope = current_scope()
+    engine = OrchestrationEngine.get_instance()
+    allowed, reason = await engine.check_allowed(
+        caller=scope.caller if scope else "ai",
+        priority=scope.priority if scope else "MEDIUM",
+    )
+    if not allowed:
+        raise AIBudgetExceededError(reason or "AI call blocked by budget.")
 
 
 async def chat(
@@ -36,8 +50,8 @@ async def chat(
     temperature: float = 0.3,
 ) -> str:
     """Simple text-in / text-out Claude call."""
-    client = _get_client()
-    response = await client.messages.create(
+    await _check_budget()
+    response = await create_message(
         model=model,
         max_tokens=max_tokens,
         temperature=temperature,
@@ -55,6 +69,7 @@ async def chat_with_tools(
     model: str = "claude-sonnet-4-20250514",
     max_tokens: int = 16384,
     temperature: float = 0.0,
+    use_cache: bool = True,
 ) -> dict[str, Any]:
     """Call Claude with tool_use and return the first tool call result as a dict.
 
@@ -62,9 +77,42 @@ async def chat_with_tools(
     ----------
     tools:
         List of Anthropic tool definitions (name, description, input_schema).
+    use_cache:
+        Serve temperature-0 calls from the response cache.  A cache hit
+        records zero tokens and bypasses the budget check.
     """
-    client = _get_client()
-    response = await client.messages.create(
+    cacheable = use_cache and temperature == 0.0
+    cache_key: Optional[str] = None
+    if cacheable:
+        cache_key = ai_cache.make_cache_key(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system,
+            tools=tools,
+            user_message=user_message,
+        )
+        cached = await ai_cache.get_cached_response(cache_key)
+        engine = OrchestrationEngine.get_instance()
+        scope = current_scope()
+        if cached is not None:
+            await engine.record_cache_lookup(
+                hit=True,
+                tokens_saved=cached.get("input_tokens", 0)
+                + cached.get("output_tokens", 0),
+            )
+            if scope is not None:
+                scope.cache_hits += 1
+                scope.tokens_saved += cached.get("input_tokens", 0) + cached.get(
+                    "output_tokens", 0
+                )
+            return cached["result"]
+        await engine.record_cache_lookup(hit=False)
+        if scope is not None:
+            scope.cache_misses += 1
+
+    await _check_budget()
+    response = await create_message(
         model=model,
         max_tokens=max_tokens,
         temperature=temperature,
@@ -72,6 +120,21 @@ async def chat_with_tools(
         messages=[{"role": "user", "content": user_message}],
         tools=tools,
     )
+
+    result = _parse_tool_result(response)
+    # A truncated tool call is not worth replaying
+    if cache_key is not None and result and response.stop_reason != "max_tokens":
+        await ai_cache.store_response(
+            cache_key,
+            result,
+            input_tokens=response.usage.input_tokens,
+            output_tokens=response.usage.output_tokens,
+        )
+    return result
+
+
+def _parse_tool_result(response: Any) -> dict[str, Any]:
+    """Return the first tool_use input, falling back to JSON text."""
     # Extract the first tool_use block
     for block in response.content:
         if block.type == "tool_use":
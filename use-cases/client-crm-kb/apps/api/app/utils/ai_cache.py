@@ -0,0 +1,131 @@
+"""
+Content-addressed response cache for deterministic Claude calls.
+
+Temperature-0 tool_use results are stored in Redis under a SHA-256 of
+(model, generation parameters, system prompt, tool schema hash,
+normalised user message), so a
+re-synced email or re-analysed feedback item is answered without another
+API round trip.  Entries expire after ``AI_CACHE_TTL_SECONDS`` and the
+cache is bounded to ``AI_CACHE_MAX_ENTRIES`` by evicting the oldest keys.
+
+Redis being unavailable never fails a call -- lookups degrade to misses.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import time
+from typing import Any, Optional
+
+from app.config import settings
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "ai_cache:"
+_INDEX_KEY = "ai_cache:index"  # sorted set of keys scored by insert time
+
+
+def _normalise(text: str) -> str:
+    """Collapse whitespace so formatting-only differences share a key."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def tools_hash(tools: list[dict[str, Any]]) -> str:
+    """Return a stable hash of a list of tool definitions."""
+    canonical = json.dumps(tools, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def make_cache_key(
+    *,
+    model: str,
+    max_tokens: int,
+    temperature: float,
+    system: str,
+    tools: list[dict[str, Any]],
+    user_message: str,
+) -> str:
+    """Build the content-addressed cache key for a tool_use call.
+
+    ``max_tokens`` is part of the key: a response cut short by a small
+    budget must not be replayed to a caller that allowed a larger one.
+    """
+    digest = hashlib.sha256()
+    for part in (
+        model,
+        str(max_tokens),
+        repr(float(temperature)),
+        system,
+        tools_hash(tools),
+        _normalise(user_message),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return _KEY_PREFIX + digest.hexdigest()
+
+
+async def get_cached_response(key: str) -> Optional[dict[str, Any]]:
+    """Return the cached entry for ``key`` or None on a miss.
+
+    The entry is a dict with ``result``, ``input_tokens`` and
+    ``output_tokens`` (the usage the original call consumed).
+    """
+    if not settings.AI_CACHE_ENABLED:
+        return None
+    try:
+        raw = await get_redis().get(key)
+    except Exception:
+        logger.warning("AI response cache unavailable; treating as miss.")
+        return None
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return None
+
+
+async def store_response(
+    key: str,
+    result: dict[str, Any],
+    *,
+    input_tokens: int,
+    output_tokens: int,
+) -> None:
+    """Store a response and evict the oldest entries beyond the size bound."""
+    if not settings.AI_CACHE_ENABLED:
+        return
+    entry = {
+        "result": result,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+    }
+    now = time.time()
+    try:
+        client = get_redis()
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.set(
+                key,
+                json.dumps(entry, default=str, ensure_ascii=False),
+                ex=settings.AI_CACHE_TTL_SECONDS,
+            )
+            pipe.zadd(_INDEX_KEY, {key: now})
+            # Drop index entries whose keys have already expired
+            pipe.zremrangebyscore(
+                _INDEX_KEY, 0, now - settings.AI_CACHE_TTL_SECONDS
+            )
+            pipe.zcard(_INDEX_KEY)
+            results = await pipe.execute()
+
+        overflow = results[-1] - settings.AI_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            evicted = await client.zpopmin(_INDEX_KEY, overflow)
+            if evicted:
+                await client.delete(*[k for k, _score in evicted])
+    except Exception:
+        logger.warning("Failed to store AI response in cache.")
+
@@ -0,0 +1,249 @@
+"""
+Application-scoped Anthropic client.
+
+One ``AsyncAnthropic`` instance (and therefore one pooled, keep-alive
+HTTP connection pool) is shared by every router and service.  It is
+created in the FastAPI lifespan by :func:`init_client` and closed by
+:func:`close_client`; code outside a request (scripts, background jobs)
+gets it lazily from :func:`get_client`.
+
+All Claude calls should go through :func:`create_message` (or
+:func:`open_stream` for streaming), which adds:
+
+- a per-model concurrency semaphore, so a burst of Sonnet calls cannot
+  starve Haiku callers or trip the account's concurrency limit;
+- retry with full-jitter exponential backoff on 429 (rate limited) and
+  529 (overloaded), honouring ``Retry-After`` when the API sends one;
+- a per-call timeout, defaulting to ``ANTHROPIC_TIMEOUT_SECONDS``;
+- token usage accounting into the active :mod:`app.orchestration.usage`
+  scope -- or, for a call made outside any scope (a script, a route the
+  orchestration middleware does not wrap), straight to the orchestration
+  engine as its own call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+import anthropic
+import httpx
+
+from app.config import settings
+from app.orchestration.engine import OrchestrationEngine
+from app.orchestration.usage import current_scope
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes worth retrying: rate limited and overloaded
+_RETRYABLE_STATUS = {429, 529}
+
+_client: Optional[anthropic.AsyncAnthropic] = None
+_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+# ---------------------------------------------------------------------------
+# Lifecycle
+# ---------------------------------------------------------------------------
+
+
+def _build_client() -> anthropic.AsyncAnthropic:
+    """Create an Anthropic client with a tuned connection pool."""
+    http_client = anthropic.DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.ANTHROPIC_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.ANTHROPIC_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.ANTHROPIC_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(
+            settings.ANTHROPIC_TIMEOUT_SECONDS,
+            connect=settings.ANTHROPIC_CONNECT_TIMEOUT_SECONDS,
+        ),
+    )
+    # Retries are handled here (with jitter and per-model slots), not by the SDK
+    return anthropic.AsyncAnthropic(
+        api_key=settings.ANTHROPIC_API_KEY,
+        http_client=http_client,
+        max_retries=0,
+    )
+
+
+def init_client() -> anthropic.AsyncAnthropic:
+    """Create the shared client.  Called once from the FastAPI lifespan."""
+    global _client
+    if _client is None:
+        _client = _build_client()
+    return _client
+
+
+def get_client() -> anthropic.AsyncAnthropic:
+    """Return the shared client, creating it on first use."""
+    return init_client()
+
+
+async def close_client() -> None:
+    """Close the shared client and its connection pool."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+    _semaphores.clear()
+
+
+# ---------------------------------------------------------------------------
+# Concurrency and retry
+# ---------------------------------------------------------------------------
+
+
+def _get_semaphore(model: str) -> asyncio.Semaphore:
+    """Return the concurrency semaphore for ``model``."""
+    sem = _semaphores.get(model)
+    if sem is None:
+        sem = asyncio.Semaphore(settings.ANTHROPIC_MAX_CONCURRENCY_PER_MODEL)
+        _semaphores[model] = sem
+    return sem
+
+
+@asynccontextmanager
+async def model_slot(model: str) -> AsyncIterator[None]:
+    """Hold one of ``model``'s concurrency slots for the ``with`` block."""
+    async with _get_semaphore(model):
+        yield
+
+
+def _retry_delay(attempt: int, error: anthropic.APIStatusError) -> float:
+    """Seconds to wait before retry ``attempt`` (0-based)."""
+    retry_after = error.response.headers.get("retry-after")
+    if retry_after:
+        try:
+            return min(float(retry_after), settings.ANTHROPIC_RETRY_MAX_DELAY_SECONDS)
+        except ValueError:
+            pass
+    # Full jitter: uniform over [0, base * 2^attempt], capped
+    ceiling = min(
+        settings.ANTHROPIC_RETRY_BASE_DELAY_SECONDS * (2 ** attempt),
+        settings.ANTHROPIC_RETRY_MAX_DELAY_SECONDS,
+    )
+    return random.uniform(0, ceiling)
+
+
+def _should_retry(error: anthropic.APIStatusError, attempt: int) -> bool:
+    """Return True if ``error`` is retryable and retries remain."""
+    return (
+        error.status_code in _RETRYABLE_STATUS
+        and attempt < settings.ANTHROPIC_MAX_RETRIES
+    )
+
+
+async def _backoff(model: str, attempt: int, error: anthropic.APIStatusError) -> None:
+    """Log and sleep before retry ``attempt``."""
+    delay = _retry_delay(attempt, error)
+    logger.warning(
+        "Anthropic %s on %s (attempt %d/%d); retrying in %.2fs.",
+        error.status_code,
+        model,
+        attempt + 1,
+        settings.ANTHROPIC_MAX_RETRIES,
+        delay,
+    )
+    await asyncio.sleep(delay)
+
+
+def record_usage(model: str, response: Any) -> None:
+    """Add a response's token usage to the active usage scope, or record it
+    with the orchestration engine when there is none."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    scope = current_scope()
+    if scope is not None:
+        scope.add(model, usage.input_tokens, usage.output_tokens)
+        return
+    asyncio.get_running_loop().create_task(
+        OrchestrationEngine.get_instance().record_call(
+            caller="unscoped",
+            model=model,
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+        )
+    )
+
+
+async def create_message(
+    *,
+    model: str,
+    timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> Any:
+    """Call ``messages.create`` with concurrency limits, retry and timeout.
+
+    Keyword arguments other than ``timeout`` are passed straight to the
+    SDK.  Errors other than 429/529 -- and a 429/529 that is still failing
+    after ``ANTHROPIC_MAX_RETRIES`` retries -- propagate unchanged.
+    """
+    client = get_client()
+    call_timeout = timeout or settings.ANTHROPIC_TIMEOUT_SECONDS
+
+    attempt = 0
+    while True:
+        try:
+            async with model_slot(model):
+                response = await client.messages.create(
+                    model=model, timeout=call_timeout, **kwargs
+                )
+            break
+        except anthropic.APIStatusError as e:
+            if not _should_retry(e, attempt):
+                raise
+            # Sleep outside the semaphore so waiting retries free their slot
+            await _backoff(model, attempt, e)
+            attempt += 1
+
+    record_usage(model, response)
+    return response
+
+
+@asynccontextmanager
+async def open_stream(
+    *,
+    model: str,
+    timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> AsyncIterator[Any]:
+    """Open a ``messages.stream`` with the same limits as :func:`create_message`.
+
+    The model slot is held for the lifetime of the stream.  Only opening
+    the stream is retried -- once events have been handed to the caller a
+    failure propagates, since the partial output cannot be taken back.
+    Usage of the final message is recorded when the block exits.
+    """
+    client = get_client()
+    call_timeout = timeout or settings.ANTHROPIC_TIMEOUT_SECONDS
+
+    attempt = 0
+    while True:
+        async with model_slot(model):
+            manager = client.messages.stream(
+                model=model, timeout=call_timeout, **kwargs
+            )
+            try:
+                stream = await manager.__aenter__()
+            except anthropic.APIStatusError as e:
+                if not _should_retry(e, attempt):
+                    raise
+                error = e
+            else:
+                try:
+                    yield stream
+                finally:
+                    await manager.__aexit__(None, None, None)
+                    # Also counts the partial usage of an interrupted stream
+                    record_usage(
+                        model, getattr(stream, "current_message_snapshot", None)
+                    )
+                return
+        await _backoff(model, attempt, error)
+        attempt += 1
@@ -1,8 +1,10 @@
 """
 Unified Knowledge Base search and export router.
 
-Provides cross-entity search across rules and patterns, plus a full
-client KB export endpoint.
+Provides cross-entity search across rules and patterns (lexical, or
+hybrid lexical + vector over taste examples and feedback too), plus
+client KB export endpoints (a JSON document, or streaming NDJSON for
+large clients).
 """
 
 from __future__ import annotations
@@ -12,15 +14,22 @@ from decimal import Decimal
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.clients.snapshot import KB_EXPORT_SECTIONS, load_client_snapshot
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, require_role
+from app.kb.context import get_kb_context
+from app.kb.embeddings import sync_embeddings
+from app.kb.export import SECTIONS as EXPORT_SECTIONS, stream_export
+from app.kb.hybrid import TYPE_NAMES, hybrid_search
+from app.kb.search import pattern_search, rule_search
+from app.kb.usage import record_kb_uses
 from app.models import (
-    BrandProfile,
     Client,
     ClientRule,
     FeedbackEvent,
@@ -41,7 +50,7 @@ class KBSearchItem(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     id: UUID
-    type: str  # "rule" | "pattern"
+    type: str  # "rule" | "pattern" | "taste_example" | "feedback"
     title: str
     description: str
     scope: Optional[str] = None
@@ -49,12 +58,19 @@ class KBSearchItem(BaseModel):
     status: Optional[str] = None
     priority: Optional[int] = None
     usage_count: int = 0
+    score: Optional[float] = None
     created_at: datetime
 
 
 class KBSearchResponse(BaseModel):
     items: list[KBSearchItem]
     total: int
+    mode: str = "lexical"
+    partial: bool = False  # hybrid only: vector search missed the latency budget
+
+
+class KBEmbeddingSyncResponse(BaseModel):
+    embedded: dict[str, int]
 
 
 class KBExportResponse(BaseModel):
@@ -68,6 +84,94 @@ class KBExportResponse(BaseModel):
     recent_feedback: list[dict]
 
 
+# ---------------------------------------------------------------------------
+# Search result builders
+# ---------------------------------------------------------------------------
+
+
+def _rule_item(rule: ClientRule, score: Optional[float]) -> KBSearchItem:
+    return KBSearchItem(
+        id=rule.id,
+        type="rule",
+        title=f"Rule: {rule.description[:80]}",
+        description=rule.description,
+        status=rule.status,
+        priority=rule.priority,
+        usage_count=rule.usage_count,
+        score=score,
+        created_at=rule.created_at,
+    )
+
+
+def _pattern_item(pattern: Pattern, score: Optional[float]) -> KBSearchItem:
+    return KBSearchItem(
+        id=pattern.id,
+        type="pattern",
+        title=pattern.name,
+        description=pattern.description,
+        scope=pattern.scope,
+        category=pattern.category,
+        usage_count=pattern.usage_count,
+        score=score,
+        created_at=pattern.created_at,
+    )
+
+
+def _taste_example_item(example: TasteExample, score: Optional[float]) -> KBSearchItem:
+    return KBSearchItem(
+        id=example.id,
+        type="taste_example",
+        title=f"Taste ({example.type}): {example.category}",
+        description=example.description or example.why_client_likes_or_dislikes or "",
+        category=example.category,
+        score=score,
+        created_at=example.added_at,
+    )
+
+
+def _feedback_item(feedback: FeedbackEvent, score: Optional[float]) -> KBSearchItem:
+    return KBSearchItem(
+        id=feedback.id,
+        type="feedback",
+        title=f"Feedback ({feedback.source}, {feedback.date})",
+        description=feedback.raw_text[:500],
+        status=feedback.status,
+        score=score,
+        created_at=feedback.created_at,
+    )
+
+
+_ITEM_BUILDERS = {
+    "rule": (ClientRule, _rule_item),
+    "pattern": (Pattern, _pattern_item),
+    "taste_example": (TasteExample, _taste_example_item),
+    "feedback": (FeedbackEvent, _feedback_item),
+}
+
+
+async def _load_items(
+    db: AsyncSession, ranked: list[tuple[str, UUID, float]]
+) -> list[KBSearchItem]:
+    """Load ranked ``(entity_type, entity_id, score)`` hits, one query per type."""
+    ids_by_type: dict[str, list[UUID]] = {}
+    for entity_type, entity_id, _ in ranked:
+        ids_by_type.setdefault(entity_type, []).append(entity_id)
+
+    rows: dict[tuple[str, UUID], object] = {}
+    for entity_type, ids in ids_by_type.items():
+        model, _ = _ITEM_BUILDERS[entity_type]
+        result = await db.execute(select(model).where(model.id.in_(ids)))
+        for row in result.scalars():
+            rows[(entity_type, row.id)] = row
+
+    items = []
+    for entity_type, entity_id, score in ranked:
+        row = rows.get((entity_type, entity_id))
+        if row is not None:  # deleted since it was embedded
+            items.append(_ITEM_BUILDERS[entity_type][1](row, score))
+    return items
+
+
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
@@ -77,49 +181,64 @@ class KBExportResponse(BaseModel):
 async def kb_search(
     q: str = Query(..., min_length=1),
     client_id: Optional[UUID] = Query(default=None),
-    types: str = Query(
-        default="rules,patterns",
-        description="Comma-separated types to search: rules, patterns",
+    types: Optional[str] = Query(
+        default=None,
+        description=(
+            "Comma-separated types to search: rules, patterns, and in hybrid "
+            "mode also taste_examples, feedback. Defaults to all searchable types."
+        ),
     ),
+    mode: str = Query(default="lexical", pattern="^(lexical|hybrid)$"),
+    limit: int = Query(default=25, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Search across rules and patterns with a single query."""
-    search_term = f"%{q}%"
-    type_list = [t.strip() for t in types.split(",")]
+    """Search the knowledge base.
+
+    ``lexical`` uses the full-text and trigram indexes (see
+    :mod:`app.kb.search`), ranked by relevance weighted by usage, with up
+    to ``limit`` results per type.  ``hybrid`` fuses that with embedding
+    search (see :mod:`app.kb.hybrid`) and returns the top ``limit``
+    overall within the configured latency budget.
+    """
+    if mode == "hybrid":
+        names = types.split(",") if types else list(TYPE_NAMES)
+    else:
+        names = types.split(",") if types else ["rules", "patterns"]
+    # Types not searchable in this mode are ignored, as they always were
+    searchable = TYPE_NAMES if mode == "hybrid" else ("rules", "patterns")
+    entity_types = [
+        TYPE_NAMES[name]
+        for name in (name.strip() for name in names)
+        if name in searchable
+    ]
+
+    if mode == "hybrid":
+        ranked, partial = await hybrid_search(
+            db, q, entity_types=entity_types, client_id=client_id, limit=limit
+        )
+        items = await _load_items(db, ranked)
+        record_kb_uses((item.type, item.id) for item in items)
+        return KBSearchResponse(
+            items=items, total=len(items), mode=mode, partial=partial
+        )
+
     items: list[KBSearchItem] = []
 
     # Search rules
-    if "rules" in type_list:
-        stmt = select(ClientRule).where(
-            ClientRule.description.ilike(search_term)
-        )
+    if "rule" in entity_types:
+        match, score = rule_search(q)
+        stmt = select(ClientRule, score).where(match)
         if client_id:
             stmt = stmt.where(ClientRule.client_id == client_id)
-        stmt = stmt.order_by(ClientRule.priority.asc()).limit(25)
+        stmt = stmt.order_by(score.desc(), ClientRule.priority.asc()).limit(limit)
         result = await db.execute(stmt)
-        for rule in result.scalars().all():
-            items.append(
-                KBSearchItem(
-                    id=rule.id,
-                    type="rule",
-                    title=f"Rule: {rule.description[:80]}",
-                    description=rule.description,
-                    status=rule.status,
-                    priority=rule.priority,
-                    usage_count=rule.usage_count,
-                    created_at=rule.created_at,
-                )
-            )
+        items.extend(_rule_item(rule, rank) for rule, rank in result.all())
 
     # Search patterns
-    if "patterns" in type_list:
-        stmt = select(Pattern).where(
-            or_(
-                Pattern.name.ilike(search_term),
-                Pattern.description.ilike(search_term),
-            )
-        )
+    if "pattern" in entity_types:
+        match, score = pattern_search(q)
+        stmt = select(Pattern, score).where(match)
         if client_id:
             # Include global/segment patterns plus client-specific
             stmt = stmt.where(
@@ -128,28 +247,26 @@ async def kb_search(
                     Pattern.scope.in_(["global", "segment"]),
                 )
             )
-        stmt = stmt.order_by(Pattern.usage_count.desc()).limit(25)
+        stmt = stmt.order_by(score.desc()).limit(limit)
         result = await db.execute(stmt)
-        for pattern in result.scalars().all():
-            items.append(
-                KBSearchItem(
-                    id=pattern.id,
-                    type="pattern",
-                    title=pattern.name,
-                    description=pattern.description,
-                    scope=pattern.scope,
-                    category=pattern.category,
-                    usage_count=pattern.usage_count,
-                    created_at=pattern.created_at,
-                )
-            )
+        items.extend(_pattern_item(pattern, rank) for pattern, rank in result.all())
 
-    # Sort combined results by usage_count descending
-    items.sort(key=lambda x: x.usage_count, reverse=True)
+    # Merge both types by score
+    items.sort(key=lambda x: x.score or 0.0, reverse=True)
+    record_kb_uses((item.type, item.id) for item in items)
 
     return KBSearchResponse(items=items, total=len(items))
 
 
+@router.post("/embeddings/sync", response_model=KBEmbeddingSyncResponse)
+async def kb_sync_embeddings(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role(["admin"])),
+):
+    """Embed new and changed KB entries for hybrid search."""
+    return KBEmbeddingSyncResponse(embedded=await sync_embeddings(db))
+
+
 @router.get("/client/{client_id}/export", response_model=KBExportResponse)
 async def kb_export(
     client_id: UUID,
@@ -157,127 +274,76 @@ async def kb_export(
     current_user: User = Depends(get_current_user),
 ):
     """Export the full knowledge base for a client as JSON."""
-    from fastapi import HTTPException, status as http_status
-
-    # Verify client exists
-    result = await db.execute(select(Client).where(Client.id == client_id))
-    client = result.scalars().first()
-    if client is None:
+    snapshot = await load_client_snapshot(
+        db, client_id, sections=KB_EXPORT_SECTIONS, include_deleted=True
+    )
+    if snapshot is None:
         raise HTTPException(
-            status_code=http_status.HTTP_404_NOT_FOUND,
+            status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Client {client_id} not found.",
         )
 
-    # Brand profile
-    bp_result = await db.execute(
-        select(BrandProfile).where(BrandProfile.client_id == client_id)
-    )
-    brand = bp_result.scalars().first()
-    brand_data = None
-    if brand:
-        brand_data = {
-            "id": str(brand.id),
-            "brand_tone": brand.brand_tone,
-            "brand_values": brand.brand_values,
-            "key_messages": brand.key_messages,
-            "do_list": brand.do_list,
-            "dont_list": brand.dont_list,
-            "legal_sensitivities": brand.legal_sensitivities,
-            "visual_rules": brand.visual_rules,
-            "version": brand.version,
-            "status": brand.status,
-        }
-
-    # Taste examples
-    te_result = await db.execute(
-        select(TasteExample)
-        .where(TasteExample.client_id == client_id)
-        .order_by(TasteExample.added_at.desc())
-    )
-    taste_data = [
-        {
-            "id": str(t.id),
-            "type": t.type,
-            "category": t.category,
-            "description": t.description,
-            "why_client_likes_or_dislikes": t.why_client_likes_or_dislikes,
-            "tags": t.tags,
-            "media_ref": t.media_ref,
-        }
-        for t in te_result.scalars().all()
-    ]
+    context = await get_kb_context(db, client_id, with_usage=True)
 
-    # Rules
-    rules_result = await db.execute(
-        select(ClientRule)
-        .where(ClientRule.client_id == client_id)
-        .order_by(ClientRule.priority.asc())
+    return KBExportResponse(
+        client_id=client_id,
+        client_name=snapshot["client"].name,
+        exported_at=datetime.utcnow(),
+        brand_profile=context.brand_profile,
+        taste_examples=snapshot["taste_examples"],
+        rules=context.rules,
+        patterns=context.patterns,
+        recent_feedback=snapshot["recent_feedback"],
     )
-    rules_data = [
-        {
-            "id": str(r.id),
-            "description": r.description,
-            "rule_type": r.rule_type,
-            "applies_to": r.applies_to,
-            "priority": r.priority,
-            "status": r.status,
-            "usage_count": r.usage_count,
-        }
-        for r in rules_result.scalars().all()
-    ]
 
-    # Patterns (client-scoped + global + segment)
-    patterns_result = await db.execute(
-        select(Pattern)
-        .where(
-            or_(
-                Pattern.client_id == client_id,
-                Pattern.scope.in_(["global", "segment"]),
-            )
-        )
-        .order_by(Pattern.usage_count.desc())
-    )
-    patterns_data = [
-        {
-            "id": str(p.id),
-            "scope": p.scope,
-            "name": p.name,
-            "description": p.description,
-            "category": p.category,
-            "applicable_channels": p.applicable_channels,
-            "usage_count": p.usage_count,
-        }
-        for p in patterns_result.scalars().all()
-    ]
 
-    # Recent feedback (last 20)
-    fb_result = await db.execute(
-        select(FeedbackEvent)
-        .where(FeedbackEvent.client_id == client_id)
-        .order_by(FeedbackEvent.created_at.desc())
-        .limit(20)
+@router.get("/client/{client_id}/export/stream")
+async def kb_export_stream(
+    client_id: UUID,
+    sections: Optional[str] = Query(
+        default=None,
+        description=(
+            "Comma-separated sections: brand_profile, taste_examples, rules, "
+            "patterns, feedback. Defaults to all."
+        ),
+    ),
+    gzip: bool = Query(default=False, description="gzip the response body"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Stream a client's knowledge base as NDJSON.
+
+    Unlike the JSON export, every row is included (all feedback, not just
+    the most recent) and rows are streamed from server-side cursors, so
+    memory use does not grow with the size of the KB.
+    """
+    names = (
+        [name.strip() for name in sections.split(",")]
+        if sections else list(EXPORT_SECTIONS)
     )
-    feedback_data = [
-        {
-            "id": str(f.id),
-            "source": f.source,
-            "date": str(f.date),
-            "sentiment": f.sentiment,
-            "severity": f.severity,
-            "topics": f.topics,
-            "status": f.status,
-            "raw_text": f.raw_text[:500] if f.raw_text else None,
-        }
-        for f in fb_result.scalars().all()
-    ]
+    unknown = [name for name in names if name not in EXPORT_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown export sections: {', '.join(unknown)}",
+        )
 
-    return KBExportResponse(
-        client_id=client_id,
-        client_name=client.name,
-        exported_at=datetime.utcnow(),
-        brand_profile=brand_data,
-        taste_examples=taste_data,
-        rules=rules_data,
-        patterns=patterns_data,
-        recent_feedback=feedback_data,
+    client_name = (
+        await db.execute(select(Client.name).where(Client.id == client_id))
+    ).scalar_one_or_none()
+    if client_name is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Client {client_id} not found.",
+        )
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="kb-{client_id}.ndjson"',
+    }
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        stream_export(client_id, client_name, names, compress=gzip),
+        media_type="application/x-ndjson",
+        headers=headers,
     )
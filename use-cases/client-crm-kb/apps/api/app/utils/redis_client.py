@@ -0,0 +1,32 @@
+"""
+Shared async Redis client.
+
+A single connection pool for every Redis consumer in the API (AI response
+cache, chatbot session store, ...), closed from the FastAPI lifespan.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import redis.asyncio as aioredis
+
+from app.config import settings
+
+_redis: Optional[aioredis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Lazy-initialise the shared async Redis client."""
+    global _redis
+    if _redis is None:
+        _redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+async def close_redis() -> None:
+    """Close the shared Redis connection pool."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
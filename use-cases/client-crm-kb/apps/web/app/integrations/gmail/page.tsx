@@ -94,6 +94,20 @@ interface SyncResult {
   errors: string[];
 }
 
+interface SyncJob {
+  job_id: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  result: {
+    synced_count: number;
+    new_feedback_count: number;
+    matched_clients: string[];
+    errors: string[];
+  } | null;
+  error: string | null;
+}
+
+const SYNC_POLL_INTERVAL_MS = 2000;
+
 interface GmailEmail {
   id: string;
   subject: string;
@@ -166,12 +180,26 @@ export default function GmailIntegrationPage() {
     },
   });
 
-  // Sync now
+  // Sync now (runs as a background job; poll until it finishes)
   const syncMutation = useMutation({
-    mutationFn: () =>
-      gmailRequest<SyncResult>("/gmail/sync", { method: "POST" }),
+    mutationFn: async () => {
+      let job = await gmailRequest<SyncJob>("/gmail/sync", { method: "POST" });
+      while (job.status === "queued" || job.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, SYNC_POLL_INTERVAL_MS));
+        job = await gmailRequest<SyncJob>(`/gmail/sync/${job.job_id}`);
+      }
+      if (job.status === "failed" || !job.result) {
+        throw new Error(job.error ?? "Gmail sync failed");
+      }
+      return job.result;
+    },
     onSuccess: (data) => {
-      setSyncResult(data);
+      setSyncResult({
+        emails_processed: data.synced_count,
+        matched_clients: data.matched_clients.length,
+        new_feedback_count: data.new_feedback_count,
+        errors: data.errors,
+      });
       queryClient.invalidateQueries({ queryKey: ["gmail"] });
     },
   });
@@ -34,7 +34,7 @@ import type {
   ChatResponse,
   GmailAuthResponse,
   GmailSyncRequest,
-  GmailSyncResponse,
+  GmailSyncJob,
   GmailStatus,
   SyncedEmail,
   OrchestrationStatus,
@@ -631,13 +631,17 @@ export const gmail = {
     return request("/gmail/auth");
   },
 
-  sync(data?: GmailSyncRequest): Promise<GmailSyncResponse> {
+  sync(data?: GmailSyncRequest): Promise<GmailSyncJob> {
     return request("/gmail/sync", {
       method: "POST",
       body: JSON.stringify(data ?? {}),
     });
   },
 
+  syncJob(jobId: string): Promise<GmailSyncJob> {
+    return request(`/gmail/sync/${jobId}`);
+  },
+
   emails(): Promise<SyncedEmail[]> {
     return request("/gmail/emails");
   },
@@ -414,6 +414,7 @@ export interface FeedbackEvent {
   topics: string[] | null;
   severity: FeedbackSeverity | null;
   extracted_requirements: Record<string, unknown> | null;
+  analysis_source: "local" | "claude" | null;
   status: FeedbackStatus;
   processed_by: string | null;
   processed_at: string | null;
@@ -593,11 +594,22 @@ export interface GmailSyncRequest {
 
 export interface GmailSyncResponse {
   synced_count: number;
+  skipped_count: number;
   new_feedback_count: number;
   matched_clients: string[];
   errors: string[];
 }
 
+export interface GmailSyncJob {
+  job_id: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+  result: GmailSyncResponse | null;
+  error: string | null;
+}
+
 export interface GmailStatus {
   connected: boolean;
   email: string | null;